@@ -0,0 +1,65 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_threads(apps, schema_editor):
+    # Existing comments become top-level comments of their own threads
+    Comments = apps.get_model("Comments", "Comments")
+    batch = []
+    for comment in Comments.objects.only("pk", "created_at").iterator():
+        micros = int(comment.created_at.timestamp() * 1_000_000)
+        comment.root_id = comment.pk
+        comment.path = f"{micros:014x}{comment.pk.hex[:6]}"
+        batch.append(comment)
+        if len(batch) >= 1000:
+            Comments.objects.bulk_update(batch, ["root", "path"])
+            batch = []
+    Comments.objects.bulk_update(batch, ["root", "path"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0002_keyset_indexes'),
+        ('Posts', '0006_trending_scores'),
+        ('Profile', '0005_profile_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comments',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comments',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='Comments.comments'),
+        ),
+        migrations.AddField(
+            model_name='comments',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='comments',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comments',
+            name='root',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='Comments.comments'),
+        ),
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['post', 'depth', '-created_at', '-id'], name='comments_post_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['root', 'path'], name='comments_root_path_idx'),
+        ),
+        migrations.RunPython(backfill_threads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0003_comment_threads'),
+        ('Posts', '0006_trending_scores'),
+        ('Profile', '0005_profile_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['post', '-created_at', '-id'], name='comments_post_created_idx'),
+        ),
+    ]
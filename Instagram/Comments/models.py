@@ -11,6 +11,18 @@ from Posts.models import Posts
 class Comments(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
     post = models.ForeignKey(Posts, on_delete=models.CASCADE)
+    parent = models.ForeignKey(
+        "self", on_delete=models.CASCADE, null=True, blank=True, related_name="replies"
+    )
+    # The top-level comment of the thread, the comment itself for top-level ones
+    root = models.ForeignKey(
+        "self", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    # Fixed-width, time-ordered segments from the root down, "/"-separated
+    path = models.CharField(max_length=500, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Replies below the comment, at any depth
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
     comment = models.CharField(null=False, blank=False, max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -20,6 +32,17 @@ class Comments(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="comments_created_id_idx"),
+            models.Index(
+                fields=["post", "-created_at", "-id"], name="comments_post_created_idx"
+            ),
+            models.Index(
+                fields=["post", "depth", "-created_at", "-id"],
+                name="comments_post_thread_idx",
+            ),
+            models.Index(fields=["root", "path"], name="comments_root_path_idx"),
+        ]
 
     def __str__(self):
         return self.comment
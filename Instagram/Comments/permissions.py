@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from Profile.authentication import requestProfileId
+
 
 class IsCommentOwnerOrPostOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -13,7 +15,6 @@ class IsCommentOwnerOrPostOwnerOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the owner of the profile.
-        return (
-            obj.post.profile == request.user.Profile
-            or obj.profile == request.user.Profile
-        )
+        # The viewset joins the post, see CommentsViewsets.get_queryset
+        profile_id = requestProfileId(request)
+        return obj.profile_id == profile_id or obj.post.profile_id == profile_id
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from Posts.models import Posts
+
 from . import models
 
 # Serializers goes here
@@ -9,8 +11,62 @@ from . import models
 class CommentsSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Comments
-        fields = ["url", "id", "profile", "post", "comment", "created_at"]
+        fields = [
+            "url",
+            "id",
+            "profile",
+            "post",
+            "parent",
+            "comment",
+            "depth",
+            "reply_count",
+            "created_at",
+        ]
         extra_kwargs = {
             "profile": {"read_only": True},
+            "post": {"required": False, "queryset": Posts.objects.visible()},
+            "parent": {
+                "queryset": models.Comments.objects.select_related("post").filter(
+                    post__profile__deactivated_at__isnull=True
+                )
+            },
             "created_at": {"read_only": True},
         }
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            # Comments can be edited, not moved to another post or thread
+            attrs.pop("post", None)
+            attrs.pop("parent", None)
+            return attrs
+
+        parent = attrs.get("parent")
+        post = attrs.get("post")
+        if parent is not None:
+            if post is not None and post.pk != parent.post_id:
+                raise serializers.ValidationError(
+                    {"parent": "The parent comment belongs to another post."}
+                )
+            attrs["post"] = parent.post
+        elif post is None:
+            raise serializers.ValidationError({"post": "This field is required."})
+        return attrs
+
+
+# Comment Tree Serializer
+class CommentTreeSerializer(CommentsSerializer):
+    """
+    A top-level comment with its first replies inlined.
+
+    The replies are loaded for the whole page beforehand and passed in the
+    ``replies`` context, mapping comment IDs to their replies.
+    """
+
+    replies = serializers.SerializerMethodField()
+
+    class Meta(CommentsSerializer.Meta):
+        fields = CommentsSerializer.Meta.fields + ["replies"]
+
+    def get_replies(self, instance):
+        replies = self.context.get("replies", {}).get(instance.pk, [])
+        return CommentsSerializer(replies, many=True, context=self.context).data
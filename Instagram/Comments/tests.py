@@ -1,3 +1,259 @@
-from django.test import TestCase
+from django.test import override_settings
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APITestCase
+
+from Instagram.testing import QueryCountTestCase, makeProfile
+from Posts.models import Posts
+
+from . import models
+from . import utils
+from .permissions import IsCommentOwnerOrPostOwnerOrReadOnly
 
 # Create your tests here.
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class CommentsWriteQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("author")
+        self.owner_user, self.owner, self.owner_client = makeProfile("owner")
+        self.other_user, self.other_profile, self.other_client = makeProfile("other")
+        self.post = Posts.objects.create(profile=self.owner, description="hi")
+        self.comment = utils.createComment(self.profile, self.post, "first")
+        self.permission = IsCommentOwnerOrPostOwnerOrReadOnly()
+
+    def assertCommentText(self, text):
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.comment, text)
+
+    def test_create(self):
+        response = self.assertQueries(
+            4,
+            self.client,
+            "post",
+            "/api/comments/",
+            {"post": str(self.post.pk), "comment": "second"},
+            201,
+        )
+        self.assertEqual(response.data, "Comment added.")
+        comment = models.Comments.objects.get(comment="second")
+        self.assertEqual((comment.profile, comment.post), (self.profile, self.post))
+        self.assertEqual(comment.depth, 0)
+
+    def test_reply(self):
+        response = self.assertQueries(
+            5,
+            self.owner_client,
+            "post",
+            "/api/comments/",
+            {"parent": str(self.comment.pk), "comment": "reply"},
+            201,
+        )
+        self.assertEqual(response.data, "Comment added.")
+        reply = models.Comments.objects.get(comment="reply")
+        self.assertEqual((reply.parent, reply.root), (self.comment, self.comment))
+        self.assertEqual((reply.post, reply.depth), (self.post, 1))
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, 1)
+
+    def test_update_by_author(self):
+        self.assertObjectPermission(
+            self.permission, self.user, "patch", self.comment, True
+        )
+        response = self.assertQueries(
+            2,
+            self.client,
+            "patch",
+            f"/api/comments/{self.comment.pk}/",
+            {"comment": "edited"},
+            200,
+        )
+        self.assertEqual(response.data["comment"], "edited")
+        self.assertCommentText("edited")
+
+    def test_update_by_post_owner(self):
+        self.assertObjectPermission(
+            self.permission, self.owner_user, "patch", self.comment, True
+        )
+        response = self.assertQueries(
+            2,
+            self.owner_client,
+            "patch",
+            f"/api/comments/{self.comment.pk}/",
+            {"comment": "edited"},
+            200,
+        )
+        self.assertEqual(response.data["comment"], "edited")
+        self.assertCommentText("edited")
+
+    def test_update_by_other_profile(self):
+        self.assertObjectPermission(
+            self.permission, self.other_user, "patch", self.comment, False
+        )
+        self.assertObjectPermission(
+            self.permission, self.other_user, "get", self.comment, True
+        )
+        response = self.assertQueries(
+            1,
+            self.other_client,
+            "patch",
+            f"/api/comments/{self.comment.pk}/",
+            {"comment": "edited"},
+            403,
+        )
+        self.assertEqual(response.data["detail"], PermissionDenied.default_detail)
+        self.assertCommentText("first")
+
+    def test_destroy(self):
+        self.assertQueries(
+            7,
+            self.client,
+            "delete",
+            f"/api/comments/{self.comment.pk}/",
+            status_code=204,
+        )
+        self.assertFalse(models.Comments.objects.filter(pk=self.comment.pk).exists())
+
+    def test_destroy_by_other_profile(self):
+        response = self.other_client.delete(f"/api/comments/{self.comment.pk}/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["detail"], PermissionDenied.default_detail)
+        self.assertTrue(models.Comments.objects.filter(pk=self.comment.pk).exists())
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class CommentsReadQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("author")
+        self.post = Posts.objects.create(profile=self.profile, description="hi")
+        self.threads = []
+        for index in range(5):
+            comment = utils.createComment(self.profile, self.post, f"comment {index}")
+            thread = [comment]
+            for depth in range(1, 4):
+                comment = utils.createComment(
+                    self.profile, self.post, f"reply {index}.{depth}", comment
+                )
+                thread.append(comment)
+            self.threads.append(thread)
+        self.comment = comment
+
+    def test_list_by_post(self):
+        response = self.assertQueries(
+            1, self.client, "get", f"/api/comments/?post={self.post.pk}", status_code=200
+        )
+        self.assertEqual(
+            {comment["post"] for comment in response.data["results"]}, {self.post.pk}
+        )
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_tree(self):
+        response = self.assertQueries(
+            2,
+            self.client,
+            "get",
+            f"/api/comments/tree/?post={self.post.pk}",
+            status_code=200,
+        )
+        results = response.data["results"]
+        self.assertEqual(
+            sorted(comment["comment"] for comment in results),
+            [f"comment {index}" for index in range(5)],
+        )
+        for comment in results:
+            self.assertEqual(comment["depth"], 0)
+            self.assertEqual(comment["reply_count"], 3)
+            self.assertTrue(comment["replies"])
+
+    def test_replies(self):
+        response = self.assertQueries(
+            2,
+            self.client,
+            "get",
+            f"/api/comments/{self.comment.root_id}/replies/",
+            status_code=200,
+        )
+        self.assertEqual(
+            [reply["id"] for reply in response.data["results"]],
+            [str(reply.pk) for reply in self.threads[-1][1:]],
+        )
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class CommentThreadTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("author")
+        self.post = Posts.objects.create(profile=self.profile, description="hi")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.root = utils.createComment(self.profile, self.post, "root")
+            self.child = utils.createComment(
+                self.profile, self.post, "child", self.root
+            )
+            self.grandchild = utils.createComment(
+                self.profile, self.post, "grandchild", self.child
+            )
+            self.sibling = utils.createComment(
+                self.profile, self.post, "sibling", self.root
+            )
+
+    def replies(self, comment):
+        response = self.client.get(f"/api/comments/{comment.pk}/replies/")
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        return [(reply["comment"], reply["depth"]) for reply in results]
+
+    def test_replies_are_depth_first(self):
+        self.assertEqual(
+            self.replies(self.root), [("child", 1), ("grandchild", 2), ("sibling", 1)]
+        )
+        self.assertEqual(self.replies(self.child), [("grandchild", 2)])
+        self.assertEqual(self.replies(self.sibling), [])
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.reply_count, 3)
+
+    def test_deleting_a_reply_deletes_its_replies(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/comments/{self.child.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(
+            models.Comments.objects.filter(
+                pk__in=[self.child.pk, self.grandchild.pk]
+            ).exists()
+        )
+        self.assertEqual(self.replies(self.root), [("sibling", 1)])
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.reply_count, 1)
+        self.assertEqual(Posts.objects.get(pk=self.post.pk).comment_count, 2)
+
+    def test_replies_stay_on_the_parents_post(self):
+        other_post = Posts.objects.create(profile=self.profile, description="other")
+        response = self.client.post(
+            "/api/comments/",
+            {"post": str(other_post.pk), "parent": str(self.root.pk), "comment": "x"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("parent", response.data)
+
+        # Edits never move a comment
+        self.client.patch(
+            f"/api/comments/{self.child.pk}/",
+            {"post": str(other_post.pk), "parent": None, "comment": "edited"},
+            format="json",
+        )
+        self.child.refresh_from_db()
+        self.assertEqual(self.child.comment, "edited")
+        self.assertEqual(self.child.post_id, self.post.pk)
+        self.assertEqual(self.child.parent_id, self.root.pk)
+
+    @override_settings(COMMENTS_INLINE_REPLIES=2)
+    def test_tree_inlines_the_first_replies(self):
+        response = self.client.get(f"/api/comments/tree/?post={self.post.pk}")
+        self.assertEqual(response.status_code, 200)
+        (root,) = response.data["results"]
+        self.assertEqual(root["comment"], "root")
+        self.assertEqual(
+            [reply["comment"] for reply in root["replies"]], ["child", "grandchild"]
+        )
+
+        response = self.client.get("/api/comments/tree/?post=invalid")
+        self.assertEqual(response.status_code, 400)
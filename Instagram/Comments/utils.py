@@ -0,0 +1,195 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import RowNumber
+from django.db.models.expressions import Window
+from django.utils import timezone
+
+from Posts.counters import addComment
+
+from . import models
+
+# Comment threads
+
+MAX_DEPTH = 20
+
+
+def pathSegment(comment):
+    """
+    Builds the path segment of a comment.
+
+    Segments are fixed-width and start with the creation time in
+    microseconds, so sorting paths lists a thread depth-first with siblings
+    oldest first.
+
+    Args:
+        comment (Comments): The comment being created, timed now unless its
+            ``created_at`` is already set.
+
+    Returns:
+        str: 14 hex digits of time followed by 6 of the comment ID.
+    """
+    created_at = comment.created_at or timezone.now()
+    micros = int(created_at.timestamp() * 1_000_000)
+    return f"{micros:014x}{comment.pk.hex[:6]}"
+
+
+def ancestorPaths(path):
+    """
+    Lists the paths of the ancestors of a comment, root first.
+
+    Args:
+        path (str): The path of the comment.
+
+    Returns:
+        list of str: One path per ancestor.
+    """
+    segments = path.split("/")
+    return ["/".join(segments[:depth]) for depth in range(1, len(segments))]
+
+
+def createComment(profile, post, comment, parent=None):
+    """
+    Creates a comment or a reply and updates the counters above it.
+
+    Replies deeper than ``MAX_DEPTH`` are attached to the parent's parent.
+
+    Args:
+        profile (Profile): The author.
+        post (Posts): The commented post.
+        comment (str): The text.
+        parent (Comments): The comment replied to, None for a top-level comment.
+
+    Returns:
+        Comments: The created comment.
+    """
+    if parent is not None and parent.depth >= MAX_DEPTH:
+        parent = parent.parent
+
+    instance = models.Comments(profile=profile, post=post, comment=comment)
+    segment = pathSegment(instance)
+    if parent is None:
+        instance.root_id = instance.pk
+        instance.path = segment
+    else:
+        instance.parent = parent
+        instance.root_id = parent.root_id
+        instance.path = f"{parent.path}/{segment}"
+        instance.depth = parent.depth + 1
+
+    with transaction.atomic():
+        instance.save()
+        if parent is not None:
+            models.Comments.objects.filter(
+                root_id=parent.root_id, path__in=ancestorPaths(instance.path)
+            ).update(reply_count=F("reply_count") + 1)
+    addComment(post.pk)
+    return instance
+
+
+def releaseComments(rows):
+    """
+    Updates the counters above comments about to be deleted with their replies.
+
+    Comments below another comment of ``rows`` are skipped: their parent's
+    ``reply_count`` already covers them.
+
+    Args:
+        rows (list of tuple): ``(post_id, root_id, path, reply_count)`` of the comments.
+    """
+    paths = {(root_id, path) for _, root_id, path, _ in rows}
+    for post_id, root_id, path, reply_count in rows:
+        ancestors = ancestorPaths(path)
+        if any((root_id, ancestor) in paths for ancestor in ancestors):
+            continue
+        removed = 1 + reply_count
+        addComment(post_id, -removed)
+        if ancestors:
+            models.Comments.objects.filter(root_id=root_id, path__in=ancestors).update(
+                reply_count=F("reply_count") - removed
+            )
+
+
+releaseComments.fields = ("post_id", "root_id", "path", "reply_count")
+
+
+def deleteComment(comment):
+    """
+    Deletes a comment with its replies.
+
+    Args:
+        comment (Comments): The comment to delete.
+    """
+    with transaction.atomic():
+        comment = models.Comments.objects.select_for_update().get(pk=comment.pk)
+        releaseComments(
+            [(comment.post_id, comment.root_id, comment.path, comment.reply_count)]
+        )
+        comment.delete()
+
+
+def firstReplies(comments, limit):
+    """
+    Loads the first replies of each thread in a single query.
+
+    Args:
+        comments (list of Comments): Top-level comments.
+        limit (int): The number of replies to load per thread.
+
+    Returns:
+        dict: Top-level comment ID to its first replies, depth-first.
+    """
+    replies = defaultdict(list)
+    if not comments or limit <= 0:
+        return replies
+
+    rows = (
+        models.Comments.objects.filter(
+            root_id__in=[comment.pk for comment in comments], depth__gt=0
+        )
+        .annotate(
+            position=Window(
+                RowNumber(), partition_by=[F("root_id")], order_by=F("path").asc()
+            )
+        )
+        .filter(position__lte=limit)
+        .order_by("root_id", "path")
+    )
+    for reply in rows:
+        replies[reply.root_id].append(reply)
+    return replies
+
+
+def firstComments(post_ids, limit):
+    """
+    Loads the newest top-level comments of each post in a single query.
+
+    Used to inline comment previews on pages of posts.
+
+    Args:
+        post_ids (list of UUID): The posts of the page.
+        limit (int): The number of comments to load per post.
+
+    Returns:
+        dict: Post ID to its newest top-level comments, newest first.
+    """
+    comments = defaultdict(list)
+    if not post_ids or limit <= 0:
+        return comments
+
+    rows = (
+        models.Comments.objects.filter(post_id__in=post_ids, depth=0)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("post_id")],
+                order_by=[F("created_at").desc(), F("id").desc()],
+            )
+        )
+        .filter(position__lte=limit)
+        .order_by("post_id", "-created_at", "-id")
+    )
+    for comment in rows:
+        comments[comment.post_id].append(comment)
+    return comments
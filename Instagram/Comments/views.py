@@ -1,26 +1,101 @@
+import uuid
+
+from django.conf import settings
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from Instagram.mixins import ConditionalGetMixin
+from Instagram.pagination import ThreadCursorPagination
+
 from . import models
 from . import serializers
+from . import utils
 from .permissions import IsCommentOwnerOrPostOwnerOrReadOnly
 
 # Create your views here.
 
 
 # Comments Viewsets
-class CommentsViewsets(viewsets.ModelViewSet):
+class CommentsViewsets(ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [IsCommentOwnerOrPostOwnerOrReadOnly, IsAuthenticated]
     queryset = models.Comments.objects.all()
     serializer_class = serializers.CommentsSerializer
+    etag_fields = ("updated_at", "reply_count")
+    query_budget = {
+        "list": 2,
+        "retrieve": 2,
+        "tree": 3,
+        "replies": 3,
+        "create": 7,
+        "update": 3,
+        "partial_update": 3,
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("update", "partial_update", "destroy"):
+            # The permission checks the owner of the post
+            queryset = queryset.select_related("post")
+        # ?post=<id> lists one post's comments off its index
+        post = self.request.query_params.get("post")
+        if post is not None and self.action == "list":
+            try:
+                queryset = queryset.filter(post_id=uuid.UUID(post))
+            except ValueError:
+                return queryset.none()
+        return queryset
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            profile=request.user.Profile,
-            post=serializer.validated_data.get("post"),
-            comment=serializer.validated_data.get("comment"),
+        utils.createComment(
+            request.user.Profile,
+            serializer.validated_data.get("post"),
+            serializer.validated_data.get("comment"),
+            parent=serializer.validated_data.get("parent"),
         )
         return Response("Comment added.", status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        utils.deleteComment(instance)
+
+    @action(detail=False, methods=["get"])
+    def tree(self, request):
+        """
+        Lists the top-level comments of a post with their first replies inlined.
+
+        Takes the post from ``?post=``. Costs one query for the page and one
+        for the replies of the whole page, however deep or long the threads.
+        """
+        try:
+            post_id = uuid.UUID(request.query_params.get("post", ""))
+        except ValueError:
+            raise ValidationError({"post": "A valid post ID is required."})
+        comments = models.Comments.objects.filter(post_id=post_id, depth=0)
+        page = self.paginate_queryset(comments)
+
+        context = self.get_serializer_context()
+        context["replies"] = utils.firstReplies(page, settings.COMMENTS_INLINE_REPLIES)
+        serializer = serializers.CommentTreeSerializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], pagination_class=ThreadCursorPagination)
+    def replies(self, request, pk=None):
+        """
+        Lists every reply below a comment, depth-first.
+
+        The replies are one range scan on the ``(root, path)`` index.
+        """
+        comment = self.get_object()
+        # "0" sorts right after "/", so this is every path below the comment
+        replies = models.Comments.objects.filter(
+            root_id=comment.root_id,
+            path__gt=f"{comment.path}/",
+            path__lt=f"{comment.path}0",
+        )
+        page = self.paginate_queryset(replies)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
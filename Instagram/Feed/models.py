@@ -0,0 +1,45 @@
+import uuid
+from django.db import models
+
+from Profile.models import Profile
+from Posts.models import Posts
+
+# Create your models here.
+
+
+# Timeline Model
+class Timeline(models.Model):
+    """
+    A precomputed home-timeline entry: one row per (follower, post).
+
+    Rows are written when a post is fanned out to the followers of its author,
+    so reading a feed is a range scan on ``(owner, created_at, post)``.
+
+    Attributes:
+        owner (ForeignKey): The profile whose feed this entry belongs to.
+        post (ForeignKey): The post shown in the feed.
+        author (ForeignKey): The author of the post, kept to retract entries on unfollow.
+        created_at (DateTimeField): Copy of the post creation time, used for ordering.
+        id (UUIDField): The universally unique identifier for the entry.
+    """
+
+    owner = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="timeline")
+    post = models.ForeignKey(Posts, on_delete=models.CASCADE, related_name="+")
+    author = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField()
+    id = models.UUIDField(
+        default=uuid.uuid4, unique=True, primary_key=True, editable=False
+    )
+
+    class Meta:
+        unique_together = ["owner", "post"]
+        indexes = [
+            models.Index(
+                fields=["owner", "created_at", "post"],
+                name="timeline_owner_created_idx",
+            ),
+            models.Index(fields=["owner", "author"], name="timeline_owner_author_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.post} in {self.owner}'s feed"
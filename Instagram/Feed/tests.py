@@ -0,0 +1,213 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from Comments.utils import createComment
+from Instagram.testing import makeProfile
+from Posts.models import Posts
+from Profile.models import Profile, Relation
+
+from . import models, utils
+
+# Create your tests here.
+
+
+@override_settings(FEED_FANOUT_FOLLOWER_THRESHOLD=0)
+class FeedPageTests(APITestCase):
+    def setUp(self):
+        utils.feedCache().clear()
+        self.user, self.profile, self.client = makeProfile("viewer")
+        _, self.author, _ = makeProfile("author")
+        _, self.celebrity, self.celebrity_client = makeProfile("celebrity")
+        Relation.objects.create(follower=self.profile, following=self.author)
+        Relation.objects.create(follower=self.profile, following=self.celebrity)
+
+        # The celebrity's posts were fanned out before crossing the threshold,
+        # so they are both in the timeline and in the celebrity's recent posts
+        self.posts = []
+        for index in range(3):
+            for author in (self.author, self.celebrity):
+                post = Posts.objects.create(profile=author, description=str(index))
+                utils.fanOutPost(post)
+                self.posts.append(post)
+        Profile.objects.filter(pk=self.celebrity.pk).update(followers_count=1)
+
+    def readFeed(self):
+        pages = []
+        url = "/api/feed/?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([post["id"] for post in response.data["results"]])
+            url = response.data["next"]
+        return pages
+
+    def newestFirst(self, posts):
+        return [str(post.pk) for post in reversed(posts)]
+
+    def test_repeated_entries_still_fill_pages(self):
+        self.assertEqual(len(utils.readFeed(self.profile, None, 4)), 4)
+        pages = self.readFeed()
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(sum(pages, []), self.newestFirst(self.posts))
+
+    def test_deleted_posts_are_replaced(self):
+        # Prime the celebrity's recent posts, then delete one behind the
+        # cache's back, as another worker would
+        self.readFeed()
+        deleted = self.posts[-1]
+        Posts.objects.filter(pk=deleted.pk).delete()
+
+        pages = self.readFeed()
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), self.newestFirst(self.posts[:-1]))
+
+    def test_deleting_a_post_clears_every_worker(self):
+        key = utils.recentPostsKey(self.celebrity.pk)
+        utils.recentPosts(self.celebrity.pk)
+        # A second handler on the same backend, as in another worker
+        other_worker = caches.create_connection(settings.FEED_CACHE)
+        self.assertEqual(len(other_worker.get(key)), 3)
+
+        deleted = self.posts[-1]
+        response = self.celebrity_client.delete(f"/api/posts/{deleted.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(other_worker.get(key))
+        self.assertNotIn(str(deleted.pk), sum(self.readFeed(), []))
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        utils.feedCache().clear()
+        _, self.author, self.author_client = makeProfile("author")
+        self.fans = [makeProfile(f"fan{index}") for index in range(5)]
+        _, self.stranger, _ = makeProfile("stranger")
+
+    def follow(self, client, profile):
+        response = client.post("/api/profile/followings/", {"following": str(profile.pk)})
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def createPost(self, client, description="hi"):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/posts/", {"description": description})
+        self.assertEqual(response.status_code, 201)
+        return Posts.objects.latest("created_at")
+
+    def timeline(self, profile):
+        return list(
+            models.Timeline.objects.filter(owner=profile)
+            .order_by("-created_at")
+            .values_list("post_id", flat=True)
+        )
+
+    def feed(self, client):
+        response = client.get("/api/feed/")
+        self.assertEqual(response.status_code, 200)
+        return [post["id"] for post in response.data["results"]]
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        for _, _, client in self.fans:
+            self.follow(client, self.author)
+        post = self.createPost(self.author_client)
+
+        self.assertEqual(self.timeline(self.author), [post.pk])
+        for _, fan, client in self.fans:
+            self.assertEqual(self.timeline(fan), [post.pk])
+            self.assertEqual(self.feed(client), [str(post.pk)])
+        self.assertEqual(self.timeline(self.stranger), [])
+
+    def test_followers_are_written_in_batches(self):
+        for _, _, client in self.fans:
+            self.follow(client, self.author)
+        bulk_create = models.Timeline.objects.bulk_create
+
+        # The author's own entry and five followers
+        for batch_size, expected in ((4, [4, 2]), (3, [3, 3]), (1000, [6])):
+            with self.subTest(batch_size=batch_size):
+                post = Posts.objects.create(profile=self.author, description="hi")
+                with override_settings(FEED_FANOUT_BATCH_SIZE=batch_size):
+                    with mock.patch.object(
+                        models.Timeline.objects, "bulk_create", wraps=bulk_create
+                    ) as create:
+                        utils.fanOutPost(post)
+                self.assertEqual([len(call.args[0]) for call in create.call_args_list], expected)
+                self.assertEqual(models.Timeline.objects.filter(post=post).count(), 6)
+
+    @override_settings(FEED_BACKFILL_LIMIT=2)
+    def test_follow_backfills_recent_posts(self):
+        posts = [self.createPost(self.author_client, str(index)) for index in range(3)]
+        _, fan, client = self.fans[0]
+        self.follow(client, self.author)
+        self.assertEqual(self.timeline(fan), [posts[2].pk, posts[1].pk])
+
+    def test_unfollow_retracts_the_author_posts(self):
+        _, fan, client = self.fans[0]
+        _, other, other_client = self.fans[1]
+        self.follow(client, self.author)
+        self.follow(client, other)
+        post = self.createPost(self.author_client)
+        kept = self.createPost(other_client)
+        self.assertEqual(self.timeline(fan), [kept.pk, post.pk])
+
+        response = self.follow(client, self.author)
+        self.assertEqual(response.data, f"Unfollowed {self.author.pk}")
+        self.assertEqual(self.timeline(fan), [kept.pk])
+        self.assertEqual(self.feed(client), [str(kept.pk)])
+
+    @override_settings(FEED_FANOUT_FOLLOWER_THRESHOLD=2)
+    def test_high_follower_posts_are_merged_at_read_time(self):
+        for _, _, client in self.fans[:3]:
+            self.follow(client, self.author)
+        post = self.createPost(self.author_client)
+        owners = models.Timeline.objects.filter(post=post).values_list("owner", flat=True)
+        self.assertEqual(list(owners), [self.author.pk])
+
+        _, fan, client = self.fans[0]
+        _, other, other_client = self.fans[4]
+        self.follow(client, other)
+        newer = self.createPost(other_client)
+        self.assertEqual(self.timeline(fan), [newer.pk])
+        self.assertEqual(self.feed(client), [str(newer.pk), str(post.pk)])
+
+        # A new follower gets no backfill, the posts are read from the author
+        _, late_fan, late_client = self.fans[3]
+        self.follow(late_client, self.author)
+        self.assertEqual(self.timeline(late_fan), [])
+        self.assertEqual(self.feed(late_client), [str(post.pk)])
+
+
+class CommentPreviewTests(APITestCase):
+    def setUp(self):
+        utils.feedCache().clear()
+        _, self.profile, self.client = makeProfile("viewer")
+        _, self.author, _ = makeProfile("author")
+        Relation.objects.create(follower=self.profile, following=self.author)
+        self.post = Posts.objects.create(profile=self.author, description="hi")
+        quiet = Posts.objects.create(profile=self.author, description="quiet")
+        for post in (self.post, quiet):
+            utils.fanOutPost(post)
+
+        comments = [
+            createComment(self.profile, self.post, f"comment {index}")
+            for index in range(4)
+        ]
+        createComment(self.author, self.post, "reply", comments[-1])
+
+    @override_settings(COMMENTS_PREVIEW_COUNT=3)
+    def test_feed_inlines_the_newest_top_level_comments(self):
+        response = self.client.get("/api/feed/")
+        self.assertEqual(response.status_code, 200)
+        previews = {
+            post["description"]: [
+                comment["comment"] for comment in post["comment_previews"]
+            ]
+            for post in response.data["results"]
+        }
+        self.assertEqual(
+            previews,
+            {"hi": ["comment 3", "comment 2", "comment 1"], "quiet": []},
+        )
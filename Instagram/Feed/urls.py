@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+# Feed URL ( endpoints )
+
+router = DefaultRouter()
+router.register("", views.FeedViewsets, basename="feed")
+
+urlpatterns = [
+    path("feed/", include(router.urls)),
+]
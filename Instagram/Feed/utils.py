@@ -0,0 +1,306 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from Posts.models import Posts
+from Profile.models import Profile, Relation
+
+from . import models
+
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+
+# Fan-out on write
+
+
+def timelineEntry(owner_id, post):
+    """
+    Builds an unsaved timeline entry for a post.
+
+    Args:
+        owner_id (UUID): The profile whose feed receives the post.
+        post (Posts): The post to add.
+
+    Returns:
+        Timeline: The unsaved entry.
+    """
+    return models.Timeline(
+        owner_id=owner_id,
+        post_id=post.pk,
+        author_id=post.profile_id,
+        created_at=post.created_at,
+    )
+
+
+def followersCount(profile_id):
+    """
+    Reads the current follower counter of a profile.
+
+    Args:
+        profile_id (UUID): The profile to look up.
+
+    Returns:
+        int: The follower counter, 0 if the profile does not exist.
+    """
+    return (
+        Profile.objects.filter(pk=profile_id)
+        .values_list("followers_count", flat=True)
+        .first()
+        or 0
+    )
+
+
+def isHighFollowerProfile(followers_count):
+    """
+    Tells whether a profile is above the fan-out threshold.
+
+    Posts of such profiles are not fanned out; they are merged into the feeds
+    of their followers at read time instead.
+
+    Args:
+        followers_count (int): The follower counter of the profile.
+
+    Returns:
+        bool: True if the profile is served through the fan-out-on-read path.
+    """
+    return followers_count > settings.FEED_FANOUT_FOLLOWER_THRESHOLD
+
+
+def fanOutPost(post):
+    """
+    Writes a newly created post into the timelines of its author and followers.
+
+    Follower IDs are streamed from the Relation table and inserted in batches
+    of ``FEED_FANOUT_BATCH_SIZE`` rows. Authors above the fan-out threshold
+    only get their own entry; followers pick the post up at read time.
+
+    Args:
+        post (Posts): The post that was created.
+    """
+    forgetRecentPosts(post.profile_id)
+
+    if isHighFollowerProfile(followersCount(post.profile_id)):
+        timelineEntry(post.profile_id, post).save()
+        return
+
+    batch_size = settings.FEED_FANOUT_BATCH_SIZE
+    follower_ids = (
+        Relation.objects.filter(following_id=post.profile_id)
+        .values_list("follower_id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+
+    batch = [timelineEntry(post.profile_id, post)]
+    for follower_id in follower_ids:
+        batch.append(timelineEntry(follower_id, post))
+        if len(batch) >= batch_size:
+            models.Timeline.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        models.Timeline.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def backfillTimeline(follower_id, following_id):
+    """
+    Copies the recent posts of a newly followed profile into the follower's timeline.
+
+    Args:
+        follower_id (UUID): The profile that started following.
+        following_id (UUID): The profile being followed.
+    """
+    if isHighFollowerProfile(followersCount(following_id)):
+        return
+
+    recent_posts = Posts.objects.filter(profile_id=following_id).only(
+        "pk", "profile_id", "created_at"
+    )[: settings.FEED_BACKFILL_LIMIT]
+
+    models.Timeline.objects.bulk_create(
+        [timelineEntry(follower_id, post) for post in recent_posts],
+        ignore_conflicts=True,
+    )
+
+
+def retractTimeline(follower_id, following_id):
+    """
+    Removes the posts of an unfollowed profile from the follower's timeline.
+
+    Args:
+        follower_id (UUID): The profile that stopped following.
+        following_id (UUID): The profile that was unfollowed.
+    """
+    models.Timeline.objects.filter(owner_id=follower_id, author_id=following_id).delete()
+
+
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+
+# Fan-out on read
+
+
+def before(position, id_field="post_id"):
+    """
+    Builds the keyset filter for entries strictly older than a feed position.
+
+    Args:
+        position (tuple): A ``(created_at, post_id)`` pair, or None for the first page.
+        id_field (str): The field holding the post ID in the filtered queryset.
+
+    Returns:
+        Q: The filter to apply to a queryset with ``created_at`` and ``id_field``.
+    """
+    if position is None:
+        return Q()
+    created_at, post_id = position
+    return Q(created_at__lt=created_at) | Q(
+        created_at=created_at, **{f"{id_field}__lt": post_id}
+    )
+
+
+def recentPostsKey(author_id):
+    return f"feed:recent-posts:{author_id}"
+
+
+def feedCache():
+    return caches[settings.FEED_CACHE]
+
+
+def forgetRecentPosts(author_id):
+    """
+    Drops the cached recent-post list of an author.
+
+    Args:
+        author_id (UUID): The author whose posts changed.
+    """
+    feedCache().delete(recentPostsKey(author_id))
+
+
+def recentPosts(author_id):
+    """
+    Returns the newest ``FEED_RECENT_POSTS_LIMIT`` posts of an author.
+
+    The list is served from the ``FEED_CACHE`` cache, shared by every worker,
+    and rebuilt from the ``(profile, created_at)`` ordering of Posts on a miss.
+
+    Args:
+        author_id (UUID): The author of the posts.
+
+    Returns:
+        list of tuple: ``(created_at, post_id)`` pairs, newest first.
+    """
+    cache = feedCache()
+    key = recentPostsKey(author_id)
+    entries = cache.get(key)
+    if entries is None:
+        entries = list(
+            Posts.objects.filter(profile_id=author_id)
+            .order_by("-created_at", "-id")
+            .values_list("created_at", "id")[: settings.FEED_RECENT_POSTS_LIMIT]
+        )
+        cache.set(key, entries, settings.FEED_RECENT_POSTS_TIMEOUT)
+    return entries
+
+
+def authorPostsBefore(author_id, position, limit):
+    """
+    Returns up to ``limit`` posts of an author older than a feed position.
+
+    Pages inside the cached recent-post list never touch the database; deeper
+    pages fall back to a keyset query on Posts.
+
+    Args:
+        author_id (UUID): The author of the posts.
+        position (tuple): The feed position, or None for the first page.
+        limit (int): The maximum number of entries to return.
+
+    Returns:
+        list of tuple: ``(created_at, post_id)`` pairs, newest first.
+    """
+    entries = recentPosts(author_id)
+    older = [entry for entry in entries if position is None or entry < position]
+    if len(older) >= limit or len(entries) < settings.FEED_RECENT_POSTS_LIMIT:
+        return older[:limit]
+
+    return list(
+        Posts.objects.filter(before(position, "id"), profile_id=author_id)
+        .order_by("-created_at", "-id")
+        .values_list("created_at", "id")[:limit]
+    )
+
+
+def readFeed(profile, position, limit):
+    """
+    Returns one page of a home timeline as ``(created_at, post_id)`` pairs.
+
+    Materialized timeline entries are k-way merged with the recent posts of
+    every followed profile above the fan-out threshold.
+
+    Args:
+        profile (Profile): The owner of the feed.
+        position (tuple): The feed position, or None for the first page.
+        limit (int): The maximum number of entries to return.
+
+    Returns:
+        list of tuple: ``(created_at, post_id)`` pairs, newest first.
+    """
+    streams = [
+        list(
+            models.Timeline.objects.filter(before(position), owner=profile)
+            .order_by("-created_at", "-post")
+            .values_list("created_at", "post_id")[:limit]
+        )
+    ]
+
+    high_follower_ids = Relation.objects.filter(
+        follower=profile,
+        following__followers_count__gt=settings.FEED_FANOUT_FOLLOWER_THRESHOLD,
+    ).values_list("following_id", flat=True)
+    for author_id in high_follower_ids:
+        streams.append(authorPostsBefore(author_id, position, limit))
+
+    # Posts fanned out before their author crossed the threshold show up in
+    # both the timeline and the author's list. Every stream holds ``limit``
+    # entries, so dropping repeats before slicing still leaves a full page.
+    seen = set()
+    merged = (
+        entry
+        for entry in heapq.merge(*streams, reverse=True)
+        if not (entry[1] in seen or seen.add(entry[1]))
+    )
+    return list(islice(merged, limit))
+
+
+def readFeedPosts(profile, position, limit):
+    """
+    Returns one page of a home timeline with its posts loaded.
+
+    Entries whose post is gone, e.g. deleted while still cached in another
+    worker, or whose author deactivated their account are skipped and the page
+    is topped up from further entries, so it only comes back short when the
+    feed is exhausted.
+
+    Args:
+        profile (Profile): The owner of the feed.
+        position (tuple): The feed position, or None for the first page.
+        limit (int): The maximum number of entries to return.
+
+    Returns:
+        list of tuple: ``((created_at, post_id), post)`` pairs, newest first.
+    """
+    page = []
+    while len(page) < limit:
+        wanted = limit - len(page)
+        entries = readFeed(profile, position, wanted)
+        if not entries:
+            break
+        posts = Posts.objects.visible().in_bulk([post_id for _, post_id in entries])
+        page.extend(
+            (entry, posts[entry[1]]) for entry in entries if entry[1] in posts
+        )
+        if len(entries) < wanted:
+            break
+        position = entries[-1]
+    return page
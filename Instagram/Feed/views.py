@@ -0,0 +1,112 @@
+import uuid
+from datetime import datetime
+
+from rest_framework import mixins, viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor
+
+from Instagram.pagination import CreatedAtCursorPagination
+from Posts.serializers import PostsWithCommentsSerializer
+
+from . import utils
+
+# Create your views here.
+
+
+# Feed Cursor Pagination
+class FeedCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over ``(created_at, post_id)`` feed positions.
+
+    The feed is a merge of several sources rather than a single queryset, so
+    the page is produced by a reader callable and the cursor carries the
+    position of the last entry of the page.
+    """
+
+    def paginate_feed(self, request, read_page):
+        """
+        Reads one page of the feed.
+
+        Args:
+            request (Request): The HTTP request object.
+            read_page (callable): Called as ``read_page(position, limit)``, returns
+                ``((created_at, post_id), post)`` pairs newest first.
+
+        Returns:
+            list of Posts: The posts of the current page.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        position = None if cursor is None else self.decode_position(cursor.position)
+
+        entries = read_page(position, self.page_size + 1)
+        self.has_next = len(entries) > self.page_size
+        entries = entries[: self.page_size]
+        self.next_position = entries[-1][0] if entries else None
+        return [post for _, post in entries]
+
+    def decode_position(self, position):
+        try:
+            created_at, post_id = position.split("|")
+            return datetime.fromisoformat(created_at), uuid.UUID(post_id)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        created_at, post_id = self.next_position
+        position = f"{created_at.isoformat()}|{post_id}"
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        return None
+
+
+# Feed Viewsets
+class FeedViewsets(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    A viewset serving the home timeline of the current user.
+
+    Attributes:
+        serializer_class (Serializer): The serializer class for serializing Posts
+            objects with their comment previews.
+        pagination_class (Pagination): Keyset pagination over feed positions.
+        query_budget (int): The most queries a page of the feed may run.
+
+    Methods:
+        list(self, request, *args, **kwargs):
+            Returns one page of the home timeline.
+    """
+
+    serializer_class = PostsWithCommentsSerializer
+    pagination_class = FeedCursorPagination
+    query_budget = 6
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns one page of the home timeline.
+
+        Materialized timeline entries are merged with the recent posts of
+        high-follower profiles, then the page of posts is loaded in one query
+        and the comment previews of the whole page in another. Entries whose
+        post is gone are skipped and replaced by older ones.
+
+        Args:
+            request (Request): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: A paginated response of posts.
+        """
+        profile = request.user.Profile
+        page = self.paginator.paginate_feed(
+            request,
+            lambda position, limit: utils.readFeedPosts(profile, position, limit),
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,78 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:20
+
+import django.db.models.deletion
+import re
+import uuid
+from collections import Counter
+from django.db import migrations, models
+
+HASHTAG = re.compile(r"(?<![\w&#])#(\w{1,100})")
+
+
+def backfill_hashtags(apps, schema_editor):
+    Posts = apps.get_model("Posts", "Posts")
+    Hashtag = apps.get_model("Hashtags", "Hashtag")
+    PostHashtag = apps.get_model("Hashtags", "PostHashtag")
+
+    hashtags = {}
+    counts = Counter()
+    entries = []
+    posts = Posts.objects.exclude(description=None).values_list(
+        "pk", "description", "created_at"
+    )
+    for post_id, description, created_at in posts.iterator():
+        tags = list(dict.fromkeys(tag.lower() for tag in HASHTAG.findall(description)))
+        for name in tags[:30]:
+            if name not in hashtags:
+                hashtags[name] = Hashtag.objects.create(name=name)
+            counts[name] += 1
+            entries.append(
+                PostHashtag(
+                    hashtag=hashtags[name], post_id=post_id, created_at=created_at
+                )
+            )
+            if len(entries) >= 1000:
+                PostHashtag.objects.bulk_create(entries)
+                entries = []
+    PostHashtag.objects.bulk_create(entries)
+
+    for name, count in counts.items():
+        Hashtag.objects.filter(pk=hashtags[name].pk).update(post_count=count)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('Posts', '0005_profile_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('post_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'id'], name='hashtag_created_id_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostHashtag',
+            fields=[
+                ('created_at', models.DateTimeField()),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='Hashtags.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtags', to='Posts.posts')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', '-created_at', '-post'], name='posthashtag_tag_created_idx')],
+                'unique_together': {('hashtag', 'post')},
+            },
+        ),
+        migrations.RunPython(backfill_hashtags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+import uuid
+from django.db import models
+
+from Posts.models import Posts
+
+# Create your models here.
+
+
+# Hashtag Model
+class Hashtag(models.Model):
+    """
+    A hashtag used in post descriptions.
+
+    Attributes:
+        name (str): The tag without ``#``, lowercased.
+        post_count (int): The number of posts using the tag.
+        created_at (DateTimeField): When the tag was first used.
+        id (UUIDField): The universally unique identifier for the tag.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    id = models.UUIDField(
+        default=uuid.uuid4, editable=False, unique=True, primary_key=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="hashtag_created_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+# Post Hashtag Model
+class PostHashtag(models.Model):
+    """
+    A posting-list entry: one row per (hashtag, post).
+
+    Attributes:
+        hashtag (ForeignKey): The tag.
+        post (ForeignKey): The post using the tag.
+        created_at (DateTimeField): Copy of the post creation time, used for ordering.
+        id (UUIDField): The universally unique identifier for the entry.
+    """
+
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name="+")
+    post = models.ForeignKey(Posts, on_delete=models.CASCADE, related_name="hashtags")
+    created_at = models.DateTimeField()
+    id = models.UUIDField(
+        default=uuid.uuid4, editable=False, unique=True, primary_key=True
+    )
+
+    class Meta:
+        unique_together = ["hashtag", "post"]
+        indexes = [
+            models.Index(
+                fields=["hashtag", "-created_at", "-post"],
+                name="posthashtag_tag_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.post} tagged {self.hashtag}"
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from . import models
+
+# Serializers goes here
+
+
+# Hashtag Serializer
+class HashtagSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="hashtag-posts", lookup_field="name"
+    )
+
+    class Meta:
+        model = models.Hashtag
+        fields = ["name", "post_count", "url"]
@@ -0,0 +1,67 @@
+from rest_framework.test import APITestCase
+
+from Instagram.testing import makeProfile
+from Posts.models import Posts
+
+from . import models
+from .utils import extractHashtags
+
+# Create your tests here.
+
+
+class HashtagIndexTests(APITestCase):
+    def setUp(self):
+        _, self.profile, self.client = makeProfile("owner")
+
+    def createPost(self, description):
+        response = self.client.post("/api/posts/", {"description": description})
+        self.assertEqual(response.status_code, 201)
+        return Posts.objects.filter(profile=self.profile).latest("created_at")
+
+    def postCounts(self):
+        return dict(models.Hashtag.objects.values_list("name", "post_count"))
+
+    def taggedPosts(self, tag):
+        response = self.client.get(f"/api/tags/{tag}/posts/")
+        self.assertEqual(response.status_code, 200)
+        return [post["id"] for post in response.data["results"]]
+
+    def test_extracts_distinct_lowercased_tags(self):
+        self.assertEqual(
+            extractHashtags("#Sun and #sun, #beach_day! a#b &#39; ##x"),
+            ["sun", "beach_day"],
+        )
+        self.assertEqual(extractHashtags(None), [])
+        many = " ".join(f"#t{index}" for index in range(40))
+        self.assertEqual(len(extractHashtags(many)), 30)
+
+    def test_posts_are_listed_per_tag_newest_first(self):
+        first = self.createPost("#Sun at the #beach")
+        second = self.createPost("more #sun")
+        self.assertEqual(self.postCounts(), {"sun": 2, "beach": 1})
+        self.assertEqual(self.taggedPosts("sun"), [str(second.pk), str(first.pk)])
+        self.assertEqual(self.taggedPosts("%23SUN"), [str(second.pk), str(first.pk)])
+        self.assertEqual(self.taggedPosts("beach"), [str(first.pk)])
+
+        response = self.client.get("/api/tags/")
+        self.assertEqual(
+            {tag["name"]: tag["post_count"] for tag in response.data["results"]},
+            {"sun": 2, "beach": 1},
+        )
+
+    def test_edits_and_deletes_update_the_index(self):
+        post = self.createPost("#sun #beach")
+        response = self.client.patch(
+            f"/api/posts/{post.pk}/", {"description": "#sun #night"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.postCounts(), {"sun": 1, "beach": 0, "night": 1})
+        self.assertEqual(self.taggedPosts("night"), [str(post.pk)])
+
+        # Unused tags are not listed
+        response = self.client.get("/api/tags/beach/")
+        self.assertEqual(response.status_code, 404)
+
+        self.client.delete(f"/api/posts/{post.pk}/")
+        self.assertEqual(self.postCounts(), {"sun": 0, "beach": 0, "night": 0})
+        self.assertFalse(models.PostHashtag.objects.exists())
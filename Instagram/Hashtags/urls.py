@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+# Hashtags URL ( endpoints )
+
+router = DefaultRouter()
+router.register("", views.HashtagViewsets, basename="hashtag")
+
+urlpatterns = [
+    path("tags/", include(router.urls)),
+]
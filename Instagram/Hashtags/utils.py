@@ -0,0 +1,97 @@
+import re
+
+from django.db import transaction
+from django.db.models import F
+
+from . import models
+
+# Hashtag index
+
+HASHTAG = re.compile(r"(?<![\w&#])#(\w{1,100})")
+MAX_HASHTAGS = 30
+
+
+def extractHashtags(text):
+    """
+    Parses the hashtags of a post description.
+
+    Args:
+        text (str): The description, may be None.
+
+    Returns:
+        list of str: Distinct lowercased tags without ``#``, in order of
+        appearance, at most ``MAX_HASHTAGS``.
+    """
+    tags = dict.fromkeys(tag.lower() for tag in HASHTAG.findall(text or ""))
+    return list(tags)[:MAX_HASHTAGS]
+
+
+def adjustPostCounts(hashtag_ids, delta):
+    if hashtag_ids:
+        models.Hashtag.objects.filter(pk__in=hashtag_ids).update(
+            post_count=F("post_count") + delta
+        )
+
+
+def indexPost(post):
+    """
+    Brings the posting lists in line with the description of a post.
+
+    Only the difference to the tags already indexed is written, so editing a
+    description touches the rows of added and removed tags only.
+
+    Args:
+        post (Posts): The created or edited post.
+    """
+    tags = extractHashtags(post.description)
+
+    with transaction.atomic():
+        indexed = dict(
+            models.PostHashtag.objects.filter(post=post).values_list(
+                "hashtag__name", "hashtag_id"
+            )
+        )
+        removed = [indexed[name] for name in indexed if name not in tags]
+        added = [name for name in tags if name not in indexed]
+
+        if removed:
+            models.PostHashtag.objects.filter(
+                post=post, hashtag_id__in=removed
+            ).delete()
+            adjustPostCounts(removed, -1)
+
+        if added:
+            models.Hashtag.objects.bulk_create(
+                [models.Hashtag(name=name) for name in added], ignore_conflicts=True
+            )
+            hashtag_ids = list(
+                models.Hashtag.objects.filter(name__in=added).values_list(
+                    "pk", flat=True
+                )
+            )
+            models.PostHashtag.objects.bulk_create(
+                [
+                    models.PostHashtag(
+                        hashtag_id=hashtag_id, post=post, created_at=post.created_at
+                    )
+                    for hashtag_id in hashtag_ids
+                ]
+            )
+            adjustPostCounts(hashtag_ids, 1)
+
+
+def unindexPost(post):
+    """
+    Removes a post from the posting lists before it is deleted.
+
+    Args:
+        post (Posts): The post about to be deleted.
+    """
+    with transaction.atomic():
+        hashtag_ids = list(
+            models.PostHashtag.objects.filter(post=post).values_list(
+                "hashtag_id", flat=True
+            )
+        )
+        models.PostHashtag.objects.filter(post=post).delete()
+        adjustPostCounts(hashtag_ids, -1)
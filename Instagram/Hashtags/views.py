@@ -0,0 +1,63 @@
+from rest_framework import viewsets
+from rest_framework.decorators import action
+
+from Instagram.pagination import TaggedPostsCursorPagination
+from Posts.models import Posts
+from Posts.serializers import PostsSeriliazer
+
+from . import models
+from . import serializers
+
+# Create your views here.
+
+
+# Hashtag Viewsets
+class HashtagViewsets(viewsets.ReadOnlyModelViewSet):
+    """
+    A viewset listing hashtags with their post counts, and the posts of a tag.
+
+    Methods:
+        posts(self, request, name=None):
+            Returns one page of the posts using the tag, newest first.
+    """
+
+    queryset = models.Hashtag.objects.filter(post_count__gt=0)
+    serializer_class = serializers.HashtagSerializer
+    lookup_field = "name"
+    search_fields = ["name"]
+    query_budget = {"list": 2, "retrieve": 2, "posts": 5}
+
+    def get_object(self):
+        self.kwargs["name"] = self.kwargs["name"].lower().lstrip("#")
+        return super().get_object()
+
+    @action(
+        detail=True,
+        methods=["get"],
+        serializer_class=PostsSeriliazer,
+        pagination_class=TaggedPostsCursorPagination,
+    )
+    def posts(self, request, name=None):
+        """
+        Returns one page of the posts using the tag, newest first.
+
+        The page is a range scan on the ``(hashtag, created_at, post)`` posting
+        list, then the posts are loaded in one query.
+
+        Args:
+            request (Request): The HTTP request object.
+            name (str): The tag, with or without ``#``.
+
+        Returns:
+            Response: A paginated response of posts.
+        """
+        hashtag = self.get_object()
+        entries = self.paginate_queryset(
+            models.PostHashtag.objects.filter(hashtag=hashtag).only(
+                "post_id", "created_at"
+            )
+        )
+        posts = Posts.objects.visible().in_bulk([entry.post_id for entry in entries])
+        page = [posts[entry.post_id] for entry in entries if entry.post_id in posts]
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
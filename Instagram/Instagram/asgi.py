@@ -3,6 +3,11 @@ ASGI config for Instagram project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+``gunicorn_asgi_config.py`` serves it with uvicorn workers next to the WSGI
+server, so the async login and registration endpoints under ``/api/async/``
+run natively on the event loop; their password hashing runs on the bounded
+pool in ``Profile.hashing``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
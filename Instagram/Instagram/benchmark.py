@@ -0,0 +1,468 @@
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from Posts.counters import engagement_counters
+from Posts.models import Posts
+from Profile import purge
+from Profile.models import Profile
+from Profile.utils import createUserProfile, deleteUserProfile
+
+# Endpoint benchmark
+
+
+def queryCount(header):
+    # Sent by QueryCountMiddleware, absent when the server does not count
+    return int(header) if header else None
+
+
+# In Process Client
+class InProcessClient:
+    """
+    Sends requests through the Django test client, without a server.
+
+    Methods:
+        request(self, method, path, data=None):
+            Sends a request and returns its status code and query count.
+    """
+
+    def __init__(self, token=None):
+        self.client = APIClient()
+        self.client.raise_request_exception = False
+        self.authenticate(token)
+
+    def authenticate(self, token):
+        if token is not None:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+    def request(self, method, path, data=None):
+        response = getattr(self.client, method)(path, data, format="json")
+        # Only the token authenticates, never the session of a login
+        self.client.cookies.clear()
+        return response.status_code, queryCount(response.get("X-Query-Count"))
+
+
+# HTTP Client
+class HttpClient:
+    """
+    Sends requests to a running server over HTTP.
+
+    Methods:
+        request(self, method, path, data=None):
+            Sends a request and returns its status code and query count.
+    """
+
+    def __init__(self, url, token=None):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.headers = {"Content-Type": "application/json"}
+        self.authenticate(token)
+
+    def authenticate(self, token):
+        if token is not None:
+            self.headers["Authorization"] = f"Token {token}"
+
+    def request(self, method, path, data=None):
+        # gunicorn's sync workers close every connection, so never reuse one
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            body = None if data is None else json.dumps(data)
+            connection.request(method.upper(), self.prefix + path, body, self.headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status, queryCount(response.getheader("X-Query-Count"))
+        finally:
+            connection.close()
+
+
+# Benchmark Worker
+class Worker:
+    """
+    A benchmark user sending requests from one thread.
+
+    Attributes:
+        user (User): The benchmark user.
+        client: The client authenticated with the user's token.
+        anonymous: The client for the endpoints used before logging in.
+        rng (Random): The source of the worker's random choices.
+    """
+
+    def __init__(self, user, password, make_client, seed):
+        self.user = user
+        self.password = password
+        self.make_client = make_client
+        self.client = make_client(self.token())
+        self.anonymous = make_client()
+        self.rng = random.Random(seed)
+        self.sent = 0
+
+    def token(self):
+        return Token.objects.get_or_create(user=self.user)[0].key
+
+    def refreshToken(self):
+        # Logging out deletes the token
+        self.client.authenticate(self.token())
+
+    def uniqueName(self):
+        self.sent += 1
+        return f"{self.user.username}_{self.sent}"
+
+
+# Benchmark Targets
+class Targets:
+    """
+    The existing profiles and posts the requests pick from.
+    """
+
+    size = 1000
+
+    def __init__(self, prefix):
+        # Primary keys are random UUIDs, so the first rows are a random sample
+        profiles = list(
+            Profile.objects.filter(deactivated_at__isnull=True)
+            .exclude(username__startswith=prefix)
+            .values_list("pk", "username")[: self.size]
+        )
+        self.profile_ids = [str(pk) for pk, _ in profiles]
+        self.usernames = [username for _, username in profiles]
+        self.post_ids = [
+            str(pk)
+            for pk in Posts.objects.exclude(
+                profile__username__startswith=prefix
+            ).values_list("pk", flat=True)[: self.size]
+        ]
+
+
+def words(worker, count):
+    return " ".join(f"bench{worker.rng.randrange(1000)}" for _ in range(count))
+
+
+# Each scenario builds ``(client, method, path, data)`` for a worker, after an
+# optional untimed preparation step
+SCENARIOS = {
+    "register": lambda worker, targets: (
+        worker.anonymous,
+        "post",
+        "/api/register/user/",
+        {
+            "username": (username := worker.uniqueName()),
+            "email": f"{username}@example.com",
+            "password": worker.password,
+        },
+    ),
+    "login": lambda worker, targets: (
+        worker.anonymous,
+        "post",
+        "/api/user/login/",
+        {"username": worker.user.username, "password": worker.password},
+    ),
+    "profile_list": lambda worker, targets: (
+        worker.client,
+        "get",
+        "/api/profile/profile/",
+        None,
+    ),
+    "profile_detail": lambda worker, targets: (
+        worker.client,
+        "get",
+        f"/api/profile/profile/{worker.rng.choice(targets.usernames)}/",
+        None,
+    ),
+    "follow": lambda worker, targets: (
+        worker.client,
+        "post",
+        "/api/profile/followings/",
+        {"following": worker.rng.choice(targets.profile_ids)},
+    ),
+    "post_create": lambda worker, targets: (
+        worker.client,
+        "post",
+        "/api/posts/",
+        {"description": words(worker, 8)},
+    ),
+    "post_list": lambda worker, targets: (worker.client, "get", "/api/posts/", None),
+    "like": lambda worker, targets: (
+        worker.client,
+        "post",
+        "/api/likes/",
+        {"post": worker.rng.choice(targets.post_ids)},
+    ),
+    "comment": lambda worker, targets: (
+        worker.client,
+        "post",
+        "/api/comments/",
+        {"post": worker.rng.choice(targets.post_ids), "comment": words(worker, 5)},
+    ),
+    "logout": lambda worker, targets: (
+        worker.client,
+        "post",
+        "/api/user/logout/",
+        None,
+    ),
+}
+
+PREPARE = {"logout": Worker.refreshToken}
+
+
+def percentile(quantiles, latencies, index):
+    return quantiles[index] if quantiles else latencies[0]
+
+
+def summarize(samples, elapsed):
+    """
+    Summarizes the samples of one scenario.
+
+    Args:
+        samples (list of tuple): ``(seconds, status, queries)`` per request.
+        elapsed (float): The wall time of the scenario, in seconds.
+
+    Returns:
+        dict: Request and error counts, throughput, latency percentiles in
+        milliseconds and mean queries per request.
+    """
+    latencies = sorted(seconds * 1000 for seconds, _, _ in samples)
+    quantiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else []
+    )
+    queries = [queries for _, _, queries in samples if queries is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, status, _ in samples if status >= 400),
+        "throughput_rps": round(len(samples) / max(elapsed, 1e-9), 2),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(quantiles, latencies, 49), 3),
+        "p95_ms": round(percentile(quantiles, latencies, 94), 3),
+        "p99_ms": round(percentile(quantiles, latencies, 98), 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries_per_request": (
+            round(statistics.fmean(queries), 2) if queries else None
+        ),
+    }
+
+
+def runScenario(name, workers, targets, requests):
+    """
+    Sends ``requests`` requests of a scenario, one thread per worker.
+
+    Args:
+        name (str): The scenario, a key of ``SCENARIOS``.
+        workers (list of Worker): The workers, one per concurrent request.
+        targets (Targets): The profiles and posts to pick from.
+        requests (int): The number of requests to send in total.
+
+    Returns:
+        dict: The summary of the scenario, see ``summarize``.
+    """
+    build = SCENARIOS[name]
+    prepare = PREPARE.get(name)
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+
+    def run(worker):
+        samples = []
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return samples
+            if prepare is not None:
+                prepare(worker)
+            client, method, path, data = build(worker, targets)
+            started = time.perf_counter()
+            status, queries = client.request(method, path, data)
+            samples.append((time.perf_counter() - started, status, queries))
+
+    def runInThread(worker):
+        try:
+            return run(worker)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    if len(workers) == 1:
+        # Stay on this thread and its database connection
+        results = [run(workers[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            results = list(executor.map(runInThread, workers))
+    elapsed = time.perf_counter() - started
+    return summarize([sample for result in results for sample in result], elapsed)
+
+
+@contextmanager
+def inProcess():
+    """
+    Lets the test client reach the views as a benchmark client would.
+
+    Rate limits are lifted and queries counted for the duration.
+    """
+    with override_settings(QUERY_COUNT_ENABLED=True):
+        throttle_classes = APIView.throttle_classes
+        APIView.throttle_classes = []
+        try:
+            yield
+        finally:
+            APIView.throttle_classes = throttle_classes
+
+
+@contextmanager
+def gunicornServer(port):
+    """
+    Runs gunicorn with ``gunicorn_config.py`` on a local port.
+
+    The server counts queries and has no rate limits.
+
+    Args:
+        port (int): The port to bind on 127.0.0.1.
+
+    Yields:
+        str: The base URL of the server.
+    """
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "Instagram.settings"
+        ),
+        "INSTAGRAM_QUERY_COUNT": "1",
+        "INSTAGRAM_THROTTLING": "0",
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            str(settings.BASE_DIR.parent / "gunicorn_config.py"),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--pythonpath",
+            str(settings.BASE_DIR),
+            "Instagram.wsgi:application",
+        ],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {process.returncode}.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("gunicorn did not start within 30 seconds.")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def createWorkers(prefix, count, make_client, seed):
+    """
+    Creates the benchmark users, one per worker.
+
+    Args:
+        prefix (str): The prefix of the usernames.
+        count (int): The number of workers.
+        make_client (callable): Builds a client from an optional token.
+        seed (int): The seed of the workers' random choices.
+
+    Returns:
+        list of Worker: The workers.
+    """
+    password = f"{prefix}-password"
+    hashed = make_password(password)
+    return [
+        Worker(
+            createUserProfile(f"{prefix}_{index}", f"{prefix}_{index}@example.com", hashed),
+            password,
+            make_client,
+            seed + index,
+        )
+        for index in range(count)
+    ]
+
+
+def removeWorkers(prefix):
+    """
+    Deletes every user created by a benchmark run, counters included.
+
+    Args:
+        prefix (str): The prefix of the usernames.
+    """
+    engagement_counters.flush()
+    for profile in Profile.objects.filter(username__startswith=f"{prefix}_"):
+        deleteUserProfile(profile)
+    # The purge worker runs one job at a time, in order
+    purge.executor.submit(lambda: None).result()
+
+
+def compareResults(baseline, current, threshold):
+    """
+    Compares the scenarios of two benchmark results.
+
+    A scenario regresses when its p95 latency grows by more than
+    ``threshold`` or when it runs at least half a query more per request;
+    smaller differences come from caches and counter flushes.
+
+    Args:
+        baseline (dict): The stored result.
+        current (dict): The new result.
+        threshold (float): The tolerated relative p95 growth, e.g. 0.1.
+
+    Returns:
+        list of dict: One comparison per scenario present in both results.
+    """
+    comparisons = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        p95_change = (now["p95_ms"] - before["p95_ms"]) / max(before["p95_ms"], 1e-9)
+        queries_before = before.get("queries_per_request")
+        queries_now = now.get("queries_per_request")
+        more_queries = (
+            queries_before is not None
+            and queries_now is not None
+            and queries_now - queries_before >= 0.5
+        )
+        comparisons.append(
+            {
+                "scenario": name,
+                "p95_before": before["p95_ms"],
+                "p95_after": now["p95_ms"],
+                "p95_change": p95_change,
+                "queries_before": queries_before,
+                "queries_after": queries_now,
+                "throughput_before": before["throughput_rps"],
+                "throughput_after": now["throughput_rps"],
+                "regressed": p95_change > threshold or more_queries,
+            }
+        )
+    return comparisons
@@ -0,0 +1,351 @@
+import logging
+import mimetypes
+import os
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from django.utils.http import http_date, parse_etags
+
+logger = logging.getLogger(__name__)
+
+# Middleware goes here
+
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def acceptedEncodings(header):
+    """
+    Parses an ``Accept-Encoding`` header.
+
+    Args:
+        header (str): The header value, e.g. ``gzip, deflate, br;q=0.9``.
+
+    Returns:
+        set: The encodings with a non-zero quality.
+    """
+    accepted = set()
+    for item in header.split(","):
+        encoding, _, params = item.partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if encoding.strip():
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+# Static Files Middleware
+class StaticFilesMiddleware:
+    """
+    Serves collected static files, precompressed, before any view runs.
+
+    The best variant written by ``collectstatic`` that the client accepts is
+    picked from ``Accept-Encoding``: brotli, then gzip, then the original.
+    Content-hashed names from the manifest never change, so they are cached
+    for a year as immutable; other names are cached for a minute.
+
+    Under ASGI the file is looked up and read off the event loop, whole,
+    since Django would buffer a file streamed to it anyway. Production should
+    let the proxy serve ``STATIC_ROOT`` at ``STATIC_URL`` instead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    immutable_max_age = 365 * 24 * 60 * 60
+    max_age = 60
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        static_url = settings.STATIC_URL
+        self.prefix = static_url if static_url.startswith("/") else None
+
+    @cached_property
+    def hashed_names(self):
+        return set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.serve(request, stream=True) if self.matches(request) else None
+        if response is None:
+            return self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = None
+        if self.matches(request):
+            serve = sync_to_async(self.serve, thread_sensitive=False)
+            response = await serve(request, stream=False)
+        if response is None:
+            return await self.get_response(request)
+        return response
+
+    def matches(self, request):
+        return (
+            self.prefix is not None
+            and request.method in ("GET", "HEAD")
+            and request.path.startswith(self.prefix)
+        )
+
+    def serve(self, request, stream):
+        """
+        Builds the response for a static file.
+
+        Args:
+            request (HttpRequest): A GET or HEAD request under ``STATIC_URL``.
+            stream (bool): Whether to stream the file or read it whole.
+
+        Returns:
+            HttpResponse: The response, or None if no such file was collected.
+        """
+        name = request.path[len(self.prefix) :]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        accepted = acceptedEncodings(request.headers.get("Accept-Encoding", ""))
+        encoding = None
+        for candidate, suffix in ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                encoding, path = candidate, path + suffix
+                break
+
+        stat = os.stat(path)
+        etag = '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if stream:
+                response = FileResponse(open(path, "rb"), content_type=content_type)
+            else:
+                with open(path, "rb") as handle:
+                    response = HttpResponse(handle.read(), content_type=content_type)
+            response["Last-Modified"] = http_date(stat.st_mtime)
+            if encoding is not None:
+                response["Content-Encoding"] = encoding
+
+        response["ETag"] = etag
+        if name in self.hashed_names:
+            response["Cache-Control"] = (
+                f"public, max-age={self.immutable_max_age}, immutable"
+            )
+        else:
+            response["Cache-Control"] = f"public, max-age={self.max_age}"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a view runs more queries than its ``query_budget``.
+    """
+
+
+# Matches the placeholders of an IN list, whose length varies with the data
+IN_LIST = re.compile(r"\(%s(?:, %s)*\)")
+
+
+def queryShape(sql):
+    """
+    Reduces a query to its shape, IN lists collapsed.
+
+    Django sends parameters separately, so two queries with the same shape
+    only differ by their parameters.
+
+    Args:
+        sql (str): The SQL with its ``%s`` placeholders.
+
+    Returns:
+        str: The shape of the query.
+    """
+    return IN_LIST.sub("(...)", sql)
+
+
+def queryBudget(view_func, method):
+    """
+    Looks up the query budget declared by a view.
+
+    Views declare ``query_budget`` as a number for every request, or as a
+    dict keyed by viewset action, or by lowercase HTTP method for plain views.
+
+    Args:
+        view_func (callable): The resolved view function.
+        method (str): The HTTP method of the request.
+
+    Returns:
+        int: The budget, or None if the view declares none.
+    """
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    budget = getattr(view_class, "query_budget", None)
+    if not isinstance(budget, dict):
+        return budget
+    actions = getattr(view_func, "actions", None) or {}
+    method = method.lower()
+    return budget.get(actions.get(method, method))
+
+
+# Query Recorder
+class QueryRecorder:
+    """
+    ``execute_wrapper`` counting the queries of a request and their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[queryShape(sql)] += 1
+
+    def repeated(self, threshold):
+        """
+        Lists the query shapes run at least ``threshold`` times, N+1 suspects.
+
+        Args:
+            threshold (int): The number of runs from which a shape is reported.
+
+        Returns:
+            list of tuple: ``(shape, runs)`` pairs, most runs first.
+        """
+        return [
+            (shape, runs)
+            for shape, runs in self.shapes.most_common()
+            if runs >= threshold
+        ]
+
+
+# Query Count Middleware
+class QueryCountMiddleware:
+    """
+    Counts the SQL queries and database time of each request.
+
+    Enabled by ``QUERY_COUNT_ENABLED``, which should stay off in production.
+    The counts are sent back in ``X-Query-Count``, ``X-Query-Time`` (in
+    milliseconds) and ``X-Query-Repeated`` headers, the last one counting the
+    query shapes run ``QUERY_REPEAT_THRESHOLD`` times or more, which are also
+    logged as likely N+1 queries.
+
+    Views may declare a ``query_budget``, see ``queryBudget``; budgets leave
+    room for the authentication query of a token cache miss. A request over
+    budget is logged, or fails with ``QueryBudgetExceeded`` when
+    ``QUERY_BUDGET_ENFORCE`` is set, as it is in the test suite.
+
+    Under ASGI only the queries run through thread-sensitive ``sync_to_async``,
+    as sync views and the async ORM do, are counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.QUERY_COUNT_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not settings.QUERY_COUNT_ENABLED:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        # Connections are per thread: the wrappers go on the connections of
+        # the thread sync views and the async ORM run in for this request
+        stack = await sync_to_async(self.recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, recorder)
+
+    def recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def report(self, request, response, recorder):
+        """
+        Sets the X-Query-* headers and checks the budget of the view.
+
+        Args:
+            request (HttpRequest): The request.
+            response (HttpResponse): Its response.
+            recorder (QueryRecorder): The queries the request ran.
+
+        Returns:
+            HttpResponse: The response.
+
+        Raises:
+            QueryBudgetExceeded: If the view went over its budget under
+                ``QUERY_BUDGET_ENFORCE``.
+        """
+        repeated = recorder.repeated(settings.QUERY_REPEAT_THRESHOLD)
+        response["X-Query-Count"] = str(recorder.count)
+        response["X-Query-Time"] = f"{recorder.duration * 1000:.1f}"
+        response["X-Query-Repeated"] = str(len(repeated))
+        for shape, runs in repeated:
+            logger.warning(
+                "%s %s ran the same query %d times: %s",
+                request.method,
+                request.path,
+                runs,
+                shape,
+            )
+
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and recorder.count > budget:
+            message = (
+                f"{request.method} {request.path} ran {recorder.count} queries, "
+                f"over its budget of {budget}."
+            )
+            if settings.QUERY_BUDGET_ENFORCE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.QUERY_COUNT_ENABLED:
+            request.query_budget = queryBudget(view_func, request.method)
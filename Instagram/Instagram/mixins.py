@@ -0,0 +1,111 @@
+import hashlib
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+# Mixins goes here
+
+
+# Conditional Get Mixin
+class ConditionalGetMixin:
+    """
+    Adds weak ``ETag`` and ``Last-Modified`` validators to list and detail views.
+
+    The validators are computed from ``etag_fields`` of the rows being sent:
+    the object on detail views, the rows of the current page on list views,
+    which the paginator fetches anyway. A request whose ``If-None-Match``
+    matches gets a ``304`` before the serializer runs.
+
+    Counters are updated without touching ``updated_at``, so they belong in
+    ``etag_fields`` too, and ``If-Modified-Since`` is not honoured:
+    ``Last-Modified`` alone would miss those changes. Responses vary on the
+    requesting user, whose own state can be folded in with ``get_viewer_state``.
+
+    Attributes:
+        etag_fields (tuple of str): The row fields the response depends on.
+
+    Methods:
+        get_viewer_state(self, request):
+            Returns per-viewer state the responses depend on.
+    """
+
+    etag_fields = ("updated_at",)
+
+    def get_viewer_state(self, request):
+        """
+        Returns per-viewer state the responses depend on.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Hashable state folded into the ETag, None by default.
+        """
+        return None
+
+    def get_page_links(self):
+        return self.paginator.get_next_link(), self.paginator.get_previous_link()
+
+    def get_validators(self, request, rows, links=None):
+        digest = hashlib.md5(usedforsecurity=False)
+        state = (request.user.pk, self.get_viewer_state(request), links)
+        digest.update(repr(state).encode())
+        last_modified = None
+        for row in rows:
+            values = tuple(getattr(row, field) for field in self.etag_fields)
+            digest.update(repr((row.pk, values)).encode())
+            updated_at = getattr(row, "updated_at", None)
+            if updated_at is not None and (
+                last_modified is None or updated_at > last_modified
+            ):
+                last_modified = updated_at
+        return f'W/"{digest.hexdigest()}"', last_modified
+
+    def conditional_response(self, request, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization", "Cookie"])
+        return response
+
+    def not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get("If-None-Match")
+        if not if_none_match:
+            return None
+        # Weak comparison, see RFC 9110 section 8.8.3.2
+        candidates = {tag.removeprefix("W/") for tag in parse_etags(if_none_match)}
+        if "*" not in candidates and etag.removeprefix("W/") not in candidates:
+            return None
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return self.conditional_response(request, response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_validators(request, [instance])
+        response = self.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        return self.conditional_response(request, response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        links = None if page is None else self.get_page_links()
+        etag, last_modified = self.get_validators(request, rows, links)
+        response = self.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(rows, many=True)
+        if page is None:
+            response = Response(serializer.data)
+        else:
+            response = self.get_paginated_response(serializer.data)
+        return self.conditional_response(request, response, etag, last_modified)
@@ -0,0 +1,63 @@
+from rest_framework.pagination import CursorPagination
+
+# Pagination goes here
+
+
+# Created At Cursor Pagination
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over ``(created_at, id)``, newest first.
+
+    The cursor is opaque to clients and every page is a range scan on the
+    matching composite index, so deep pages cost the same as the first one.
+
+    Attributes:
+        ordering (tuple of str): The keyset ordering.
+        page_size (int): The default number of items per page.
+        page_size_query_param (str): The query parameter to override the page size.
+        max_page_size (int): The upper bound for the page size.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+# Liked At Cursor Pagination
+class LikedAtCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over ``(liked_at, id)``, newest first.
+    """
+
+    ordering = ("-liked_at", "-id")
+
+
+# User Id Cursor Pagination
+class UserIdCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over ``id`` for the auth User model, newest first.
+
+    ``auth_user.date_joined`` has no index, while the auto-incrementing
+    primary key follows the order users joined in and is a range scan.
+    """
+
+    ordering = ("-id",)
+
+
+# Tagged Posts Cursor Pagination
+class TaggedPostsCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over a hashtag posting list, ``(created_at, post)`` newest first.
+    """
+
+    ordering = ("-created_at", "-post_id")
+
+
+# Thread Cursor Pagination
+class ThreadCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over comment paths, a thread depth-first.
+    """
+
+    ordering = ("path",)
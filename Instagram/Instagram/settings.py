@@ -33,7 +33,10 @@ ALLOWED_HOSTS = ["*"]
 
 INSTALLED_APPS = [
     "Comments",
+    "Feed",
+    "Hashtags",
     "Likes",
+    "Media",
     "Posts",
     "Profile",
     "django_filters",
@@ -51,6 +54,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "Instagram.middleware.StaticFilesMiddleware",
+    "Instagram.middleware.QueryCountMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -59,21 +64,28 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# INSTAGRAM_THROTTLING=0 turns rate limits off, e.g. for a server under benchmark
+THROTTLING = os.environ.get("INSTAGRAM_THROTTLING", "1") != "0"
+
 REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
-    ],
+    ]
+    if THROTTLING
+    else [],
     "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
     #
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "Profile.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_FILTER_BACKENDS": [
         "rest_framework.filters.SearchFilter",
     ],
+    "DEFAULT_PAGINATION_CLASS": "Instagram.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": 20,
 }
 
 ROOT_URLCONF = "Instagram.urls"
@@ -108,6 +120,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# "tokens" and "feed" must be shared by every worker, so that logout, account
+# deletion and deleted posts take effect in all of them at once. They default
+# to files under CACHE_ROOT, which all workers of a host see; point them at
+# Redis or Memcached when running on several hosts.
+
+CACHE_ROOT = Path(os.environ.get("INSTAGRAM_CACHE_ROOT", BASE_DIR / "cache"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "feed": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_ROOT / "feed",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    "tokens": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_ROOT / "tokens",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+TOKEN_AUTH_CACHE = "tokens"
+TOKEN_AUTH_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -127,6 +168,16 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing pool used by the async login and registration endpoints.
+# At most PASSWORD_HASHING_MAX_PENDING hashes may be running or queued; more
+# are rejected with 503 so a login storm does not starve other endpoints.
+
+PASSWORD_HASHING_WORKERS = int(os.environ.get("INSTAGRAM_HASHING_WORKERS", 2))
+PASSWORD_HASHING_MAX_PENDING = int(
+    os.environ.get("INSTAGRAM_HASHING_MAX_PENDING", 32)
+)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -142,8 +193,125 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
-STATIC_ROOT = "/home/yash/Desktop/InstagramApp/static/staticfiles/"
-STATIC_URL = "/home/yash/Desktop/InstagramApp/static/"
+# collectstatic writes content-hashed copies with .gz (and, with the Brotli
+# package installed, .br) variants; StaticFilesMiddleware serves them. Behind a
+# proxy, and under ASGI in particular, let the proxy serve STATIC_ROOT at
+# STATIC_URL with the same headers instead.
+
+STATIC_ROOT = BASE_DIR.parent / "static" / "staticfiles"
+STATIC_URL = "/static/"
+
+# Home timeline
+# Followers are fanned out to in batches of FEED_FANOUT_BATCH_SIZE rows, and a
+# new follow backfills up to FEED_BACKFILL_LIMIT recent posts of the author.
+# Authors with more than FEED_FANOUT_FOLLOWER_THRESHOLD followers are not fanned
+# out; their newest FEED_RECENT_POSTS_LIMIT posts are cached in FEED_CACHE for
+# FEED_RECENT_POSTS_TIMEOUT seconds and merged into feeds at read time.
+
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_BACKFILL_LIMIT = 50
+FEED_FANOUT_FOLLOWER_THRESHOLD = int(
+    os.environ.get("INSTAGRAM_FEED_FANOUT_THRESHOLD", 10000)
+)
+FEED_RECENT_POSTS_LIMIT = 200
+FEED_CACHE = "feed"
+FEED_RECENT_POSTS_TIMEOUT = 300
+
+# Post engagement counters
+# Like and comment counts are buffered in-process and flushed
+# POSTS_COUNTER_FLUSH_INTERVAL seconds after the first change, or as soon as
+# POSTS_COUNTER_MAX_PENDING posts have pending deltas. 0 writes through.
+
+POSTS_COUNTER_FLUSH_INTERVAL = float(
+    os.environ.get("INSTAGRAM_COUNTER_FLUSH_INTERVAL", 1.0)
+)
+POSTS_COUNTER_MAX_PENDING = 1000
+
+# Comment threads
+# Comment trees inline the first COMMENTS_INLINE_REPLIES replies of each
+# top-level comment, feed pages the newest COMMENTS_PREVIEW_COUNT top-level
+# comments of each post.
+
+COMMENTS_INLINE_REPLIES = 3
+COMMENTS_PREVIEW_COUNT = 3
+
+# Trending posts
+# compute_trending folds likes and comments older than TRENDING_EVENT_LAG
+# seconds into time-decayed scores (half-life TRENDING_HALF_LIFE_HOURS) of the
+# posts of the last TRENDING_WINDOW_HOURS, and ranks the TRENDING_TOP_K best.
+
+TRENDING_WINDOW_HOURS = 48
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_REBASE_HOURS = 24
+TRENDING_TOP_K = 100
+TRENDING_LIKE_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 3.0
+TRENDING_EVENT_LAG = 5
+TRENDING_CHUNK_SIZE = 100000
+
+# Account deletion
+# Deleted accounts are purged by a background worker, ACCOUNT_PURGE_CHUNK_SIZE
+# rows per transaction with an ACCOUNT_PURGE_PAUSE seconds pause between chunks.
+
+ACCOUNT_PURGE_CHUNK_SIZE = 500
+ACCOUNT_PURGE_PAUSE = 0.05
+
+# Media files (uploads)
+# https://docs.djangoproject.com/en/5.0/topics/files/
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "/media/"
+
+# Uploads are stored once per distinct content under blobs/ab/cd/<sha256>.<ext>
+# with a reference count; gc_media removes blobs left unreferenced for
+# MEDIA_BLOB_GC_GRACE seconds.
+
+STORAGES = {
+    "default": {"BACKEND": "Media.storage.ContentAddressedStorage"},
+    "staticfiles": {
+        "BACKEND": "Instagram.staticfiles.CompressedManifestStaticFilesStorage"
+    },
+}
+MEDIA_BLOB_GC_GRACE = 3600
+
+# Media is served by Media.views.MediaFileView after an access check. Set
+# MEDIA_SERVE_MODE to "x-accel-redirect" (nginx, with an internal location
+# at MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT) or "x-sendfile"
+# (Apache, lighttpd) to let the proxy send the bytes; "python" streams them
+# with sendfile where the server supports it.
+
+MEDIA_SERVE_MODE = os.environ.get("INSTAGRAM_MEDIA_SERVE_MODE", "python")
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Resumable uploads
+# Post pictures of up to UPLOAD_MAX_SIZE bytes can be sent in chunks of at most
+# UPLOAD_CHUNK_MAX_SIZE bytes; gc_media drops uploads idle for UPLOAD_SESSION_TTL
+# seconds.
+
+UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+UPLOAD_CHUNK_MAX_SIZE = 4 * 1024 * 1024
+UPLOAD_STREAM_BUFFER_SIZE = 64 * 1024
+UPLOAD_SESSION_TTL = 24 * 60 * 60
+
+# Image pipeline
+# Uploaded pictures are decoded on a pool of IMAGE_PIPELINE_WORKERS processes
+# (0 processes them inline) and re-encoded without EXIF into the renditions
+# below, named after the maximum length of their longest edge.
+
+IMAGE_PIPELINE_WORKERS = int(os.environ.get("INSTAGRAM_IMAGE_WORKERS", 2))
+IMAGE_RENDITIONS = {"thumbnail": 150, "feed": 640, "full": 1080}
+IMAGE_RENDITION_FORMAT = "WEBP"
+IMAGE_RENDITION_QUALITY = 80
+
+# Query counting
+# QueryCountMiddleware reports the queries of each request in X-Query-* headers
+# and logs query shapes run QUERY_REPEAT_THRESHOLD times or more (N+1). Views
+# over their query_budget are logged, or fail under QUERY_BUDGET_ENFORCE, which
+# the test suite sets. Keep it off in production.
+
+QUERY_COUNT_ENABLED = DEBUG or os.environ.get("INSTAGRAM_QUERY_COUNT") == "1"
+QUERY_REPEAT_THRESHOLD = 3
+QUERY_BUDGET_ENFORCE = False
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
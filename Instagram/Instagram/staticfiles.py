@@ -0,0 +1,73 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Static files
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml",
+    ".ico", ".ttf", ".otf", ".eot",
+}
+
+
+def compressedVariants(content):
+    """
+    Compresses the content of a static file.
+
+    Args:
+        content (bytes): The file content.
+
+    Returns:
+        dict: ``{".gz": bytes, ".br": bytes}``, without the encodings that do
+        not make the file smaller. Brotli is only used if it is installed.
+    """
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    return {
+        suffix: data
+        for suffix, data in variants.items()
+        if len(data) < len(content)
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage also writing ``.gz`` and ``.br`` variants of text files.
+
+    ``collectstatic`` first writes the content-hashed copies and the
+    manifest, then a precompressed variant of every compressible file next
+    to it, e.g. ``rest_framework/css/bootstrap.min.3f2b1c9a7d8e.css.gz``.
+    ``Instagram.middleware.StaticFilesMiddleware`` serves them.
+
+    Files without a manifest entry, e.g. before ``collectstatic`` ran, keep
+    their unhashed name instead of failing the page that links them.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in set(paths) | set(self.hashed_files.values()):
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            for suffix, data in compressedVariants(content).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(data))
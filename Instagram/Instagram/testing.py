@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+
+from Profile.authentication import CachedTokenAuthentication
+from Profile.models import Profile
+
+# Test helpers
+
+
+def makeProfile(username):
+    """
+    Creates a user with a profile and an API client authenticated as that user.
+
+    The client sends a token whose authentication cache entry is already
+    primed, so requests spend no query on authentication and query counts
+    only cover the endpoint itself.
+
+    Args:
+        username (str): The username of the user and of the profile.
+
+    Returns:
+        tuple: The user, the profile and the client.
+    """
+    user = User.objects.create_user(username=username, password=f"{username}-password")
+    profile = Profile.objects.create(user=user, username=username)
+    token = Token.objects.create(user=user)
+    CachedTokenAuthentication().authenticate_credentials(token.key)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return user, profile, client
+
+
+# Query Count Test Case
+@override_settings(QUERY_COUNT_ENABLED=True, QUERY_BUDGET_ENFORCE=True)
+class QueryCountTestCase(APITestCase):
+    """
+    Test case asserting the exact number of queries of API requests.
+
+    Every request made in these tests also fails when it goes over the
+    ``query_budget`` of its view, see ``QueryCountMiddleware``. Counts include the savepoints of ``transaction.atomic`` blocks, since
+    every test runs inside a transaction, and exclude ``on_commit`` callbacks,
+    which never run in a test.
+
+    Methods:
+        assertQueries(self, num, client, method, path, data=None, status_code=None):
+            Sends a request and asserts how many queries it ran.
+
+        assertObjectPermission(self, permission, user, method, obj, allowed):
+            Asserts whether a permission lets a user send a request on an object.
+    """
+
+    def assertQueries(self, num, client, method, path, data=None, status_code=None):
+        """
+        Sends a request and asserts how many queries it ran.
+
+        Args:
+            num (int): The exact number of queries expected.
+            client (APIClient): The client sending the request.
+            method (str): The HTTP method, e.g. ``post``.
+            path (str): The path of the endpoint.
+            data (dict): The request body, sent as JSON.
+            status_code (int): The expected status code, if any.
+
+        Returns:
+            Response: The response of the request.
+        """
+        with self.assertNumQueries(num):
+            response = getattr(client, method)(path, data, format="json")
+        if status_code is not None:
+            self.assertEqual(response.status_code, status_code, response.data)
+        return response
+
+    def assertObjectPermission(self, permission, user, method, obj, allowed):
+        """
+        Asserts whether a permission lets a user send a request on an object.
+
+        Args:
+            permission (BasePermission): The permission to check.
+            user (User): The requesting user.
+            method (str): The HTTP method, e.g. ``patch``.
+            obj (Model): The object of the request.
+            allowed (bool): Whether the request should be allowed.
+        """
+        request = Request(APIRequestFactory().generic(method.upper(), "/"))
+        request.user = user
+        self.assertIs(permission.has_object_permission(request, None, obj), allowed)
@@ -15,10 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from django.conf.urls.static import static
+
+from Media.views import MediaFileView
 
 from . import views
 
@@ -28,4 +28,8 @@ urlpatterns = [
     path("api/", include("Posts.urls")),
     path("api/", include("Likes.urls")),
     path("api/", include("Comments.urls")),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    path("api/", include("Feed.urls")),
+    path("api/", include("Hashtags.urls")),
+    path("api/", include("Media.urls")),
+    path("media/<path:name>", MediaFileView.as_view()),
+]
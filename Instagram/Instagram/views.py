@@ -26,11 +26,17 @@ class ApiEndpoints(generics.ListAPIView):
             "register_user": "http://localhost:8000/api/register/user/",
             "user_login": "http://localhost:8000/api/user/login/",
             "user_logout": "http://localhost:8000/api/user/logout/",
+            "async_register_user": "http://localhost:8000/api/async/register/user/",
+            "async_user_login": "http://localhost:8000/api/async/user/login/",
             "profile": "http://localhost:8000/api/profile/profile/",
             "profile_followings": "http://localhost:8000/api/profile/followings/",
             "profile_followers": "http://localhost:8000/api/profile/followers/",
             "posts": "http://localhost:8000/api/posts/",
+            "trending_posts": "http://localhost:8000/api/posts/trending/",
             "likes": "http://localhost:8000/api/likes/",
             "comments": "http://localhost:8000/api/comments/",
+            "feed": "http://localhost:8000/api/feed/",
+            "tags": "http://localhost:8000/api/tags/",
+            "uploads": "http://localhost:8000/api/uploads/",
         }
         return Response(endpoints, status=status.HTTP_200_OK)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Likes', '0001_initial'),
+        ('Posts', '0002_keyset_indexes'),
+        ('Profile', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='likes',
+            index=models.Index(fields=['profile', 'liked_at', 'id'], name='likes_profile_liked_idx'),
+        ),
+    ]
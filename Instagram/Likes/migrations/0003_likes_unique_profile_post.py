@@ -0,0 +1,48 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:01
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    Likes = apps.get_model("Likes", "Likes")
+    Posts = apps.get_model("Posts", "Posts")
+
+    duplicates = (
+        Likes.objects.values("profile", "post")
+        .annotate(total=Count("pk"), first_liked_at=Min("liked_at"))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        keep = (
+            Likes.objects.filter(
+                profile=row["profile"],
+                post=row["post"],
+                liked_at=row["first_liked_at"],
+            )
+            .values_list("pk", flat=True)
+            .first()
+        )
+        Likes.objects.filter(profile=row["profile"], post=row["post"]).exclude(
+            pk=keep
+        ).delete()
+        Posts.objects.filter(pk=row["post"]).update(
+            like_count=F("like_count") - (row["total"] - 1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Likes', '0002_keyset_indexes'),
+        ('Posts', '0003_posts_engagement_counts'),
+        ('Profile', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='likes',
+            constraint=models.UniqueConstraint(fields=('profile', 'post'), name='likes_unique_profile_post'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Likes', '0003_likes_unique_profile_post'),
+        ('Posts', '0006_trending_scores'),
+        ('Profile', '0005_profile_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='likes',
+            index=models.Index(fields=['liked_at'], name='likes_liked_at_idx'),
+        ),
+    ]
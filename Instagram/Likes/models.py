@@ -16,5 +16,18 @@ class Likes(models.Model):
         default=uuid.uuid4, unique=True, primary_key=True, editable=False
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "post"], name="likes_unique_profile_post"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["profile", "liked_at", "id"], name="likes_profile_liked_idx"
+            ),
+            models.Index(fields=["liked_at"], name="likes_liked_at_idx"),
+        ]
+
     def __str__(self):
         return f"{self.profile} liked {self.post}"
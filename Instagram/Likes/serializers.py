@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from Posts.models import Posts
+
 from . import models
 
 # Serializers goes here
@@ -12,4 +14,5 @@ class LikeSerializer(serializers.ModelSerializer):
         fields = ["url", "id", "profile", "post"]
         extra_kwargs = {
             "profile": {"read_only": True},
+            "post": {"queryset": Posts.objects.visible()},
         }
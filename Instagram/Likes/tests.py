@@ -1,3 +1,98 @@
-from django.test import TestCase
+from django.db import IntegrityError, transaction
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from Instagram.testing import QueryCountTestCase, makeProfile
+from Posts.models import Posts
+
+from . import models
 
 # Create your tests here.
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class LikesWriteQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("liker")
+        self.owner_user, self.owner, self.owner_client = makeProfile("owner")
+        self.post = Posts.objects.create(profile=self.owner, description="hi")
+
+    def liked(self):
+        likes = models.Likes.objects.filter(profile=self.profile, post=self.post)
+        return likes.exists()
+
+    def test_like(self):
+        response = self.assertQueries(
+            5, self.client, "post", "/api/likes/", {"post": str(self.post.pk)}, 201
+        )
+        self.assertEqual(response.data, "Liked")
+        self.assertTrue(self.liked())
+
+    def test_unlike(self):
+        models.Likes.objects.create(profile=self.profile, post=self.post)
+        response = self.assertQueries(
+            2, self.client, "post", "/api/likes/", {"post": str(self.post.pk)}, 201
+        )
+        self.assertEqual(response.data, "Unliked")
+        self.assertFalse(self.liked())
+
+    def test_destroy(self):
+        like = models.Likes.objects.create(profile=self.profile, post=self.post)
+        self.assertQueries(
+            2, self.client, "delete", f"/api/likes/{like.pk}/", status_code=204
+        )
+        self.assertFalse(self.liked())
+
+    def test_destroy_by_other_profile(self):
+        like = models.Likes.objects.create(profile=self.profile, post=self.post)
+        # Likes are looked up among the requester's own, see get_queryset
+        self.assertQueries(
+            1, self.owner_client, "delete", f"/api/likes/{like.pk}/", status_code=404
+        )
+        self.assertTrue(self.liked())
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class LikeToggleTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("liker")
+        _, self.owner, self.owner_client = makeProfile("owner")
+        self.posts = [
+            Posts.objects.create(profile=self.owner, description=str(index))
+            for index in range(3)
+        ]
+
+    def like(self, post):
+        return self.client.post("/api/likes/", {"post": str(post.pk)})
+
+    def test_liking_twice_unlikes(self):
+        post = self.posts[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.like(post).data, "Liked")
+        self.assertEqual(Posts.objects.get(pk=post.pk).like_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.like(post).data, "Unliked")
+        self.assertEqual(Posts.objects.get(pk=post.pk).like_count, 0)
+        self.assertFalse(models.Likes.objects.exists())
+
+    def test_a_profile_likes_a_post_once(self):
+        models.Likes.objects.create(profile=self.profile, post=self.posts[0])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            models.Likes.objects.create(profile=self.profile, post=self.posts[0])
+
+    def test_viewer_has_liked_is_per_viewer(self):
+        self.like(self.posts[1])
+        liked = {str(self.posts[1].pk)}
+
+        results = self.client.get("/api/posts/").data["results"]
+        self.assertEqual(
+            {post["id"] for post in results if post["viewer_has_liked"]}, liked
+        )
+        response = self.client.get(f"/api/posts/{self.posts[1].pk}/")
+        self.assertTrue(response.data["viewer_has_liked"])
+
+        response = self.owner_client.get("/api/posts/")
+        self.assertFalse(
+            any(post["viewer_has_liked"] for post in response.data["results"])
+        )
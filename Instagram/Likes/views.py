@@ -1,5 +1,9 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from django.db import IntegrityError, transaction
+
+from Instagram.pagination import LikedAtCursorPagination
+from Posts.counters import addLike
 
 from . import models
 from . import serializers
@@ -11,6 +15,8 @@ from . import serializers
 class LikeViewsets(viewsets.ModelViewSet):
     queryset = models.Likes.objects.all()
     serializer_class = serializers.LikeSerializer
+    pagination_class = LikedAtCursorPagination
+    query_budget = {"list": 2, "create": 7, "destroy": 4}
 
     def get_queryset(self):
         return models.Likes.objects.filter(profile=self.request.user.Profile)  # type: ignore
@@ -18,7 +24,24 @@ class LikeViewsets(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            profile=request.user.Profile, post=serializer.validated_data.get("post")
-        )
+        profile = request.user.Profile
+        post = serializer.validated_data.get("post")
+
+        # Liking an already liked post unlikes it
+        deleted, _ = models.Likes.objects.filter(profile=profile, post=post).delete()
+        if deleted:
+            addLike(post.pk, -1)
+            return Response("Unliked", status=status.HTTP_201_CREATED)
+
+        try:
+            with transaction.atomic():
+                serializer.save(profile=profile, post=post)
+        except IntegrityError:
+            # A concurrent request liked the post first
+            return Response("Liked", status=status.HTTP_201_CREATED)
+        addLike(post.pk)
         return Response("Liked", status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        addLike(instance.post_id, -1)
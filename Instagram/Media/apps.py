@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class MediaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'Media'
+
+    def ready(self):
+        from .signals import connectSignals
+
+        connectSignals()
@@ -0,0 +1,302 @@
+import io
+import math
+
+from PIL import ExifTags, Image, ImageOps
+
+# Image processing
+#
+# Everything in this module runs inside the image pipeline worker processes,
+# so it only depends on Pillow and never touches Django models.
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+# The formats accepted as uploads, with their file extension
+UPLOAD_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+
+# JPEG segments kept by stripJpeg, by marker and payload prefix: JFIF, ICC
+# profiles and the Adobe colour transform that decoders need
+JPEG_KEPT_SEGMENTS = {
+    0xE0: (b"JFIF\0", b"JFXX\0"),
+    0xE2: (b"ICC_PROFILE\0",),
+    0xEE: (b"Adobe",),
+}
+
+
+def jpegSegment(marker, payload):
+    return bytes((0xFF, marker)) + (len(payload) + 2).to_bytes(2, "big") + payload
+
+
+def stripJpeg(data, orientation=1):
+    """
+    Drops the metadata segments of a JPEG without decoding it.
+
+    APP segments outside ``JPEG_KEPT_SEGMENTS`` (EXIF, XMP, maker notes, ...)
+    and comments are removed, the scans are copied byte for byte and anything
+    after the end of the image, such as appended depth maps, is cut off. A
+    rotated photo keeps an EXIF block holding only its orientation.
+
+    Args:
+        data (bytes): The JPEG file.
+        orientation (int): The EXIF orientation of the original.
+
+    Returns:
+        bytes: The JPEG without metadata.
+
+    Raises:
+        ValueError: If the data is not a well-formed JPEG.
+    """
+    if data[:2] != b"\xff\xd8":
+        raise ValueError("Not a JPEG image.")
+
+    output = [data[:2]]
+    if orientation != 1:
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = orientation
+        output.append(jpegSegment(0xE1, exif.tobytes()))
+
+    position, size = 2, len(data)
+    while position < size:
+        if data[position] != 0xFF:
+            raise ValueError("Malformed JPEG image.")
+        while position < size and data[position] == 0xFF:
+            position += 1
+        if position >= size:
+            break
+        marker = data[position]
+        start, position = position - 1, position + 1
+
+        if marker == 0xD9:
+            output.append(b"\xff\xd9")
+            return b"".join(output)
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            output.append(data[start:position])
+            continue
+        if position + 2 > size:
+            raise ValueError("Truncated JPEG image.")
+
+        end = position + int.from_bytes(data[position : position + 2], "big")
+        if end > size:
+            raise ValueError("Truncated JPEG image.")
+        payload = data[position + 2 : end]
+        position = end
+
+        if 0xE0 <= marker <= 0xEF or marker == 0xFE:
+            if not payload.startswith(JPEG_KEPT_SEGMENTS.get(marker, ())):
+                continue
+            # JFIF has to stay the first segment, ahead of the orientation
+            if marker == 0xE0 and len(output) == 2 and orientation != 1:
+                output.insert(1, data[start:end])
+                continue
+        output.append(data[start:end])
+
+        if marker == 0xDA:
+            # Entropy-coded data runs up to the next marker, stuffed 0xFF00
+            # bytes and restart markers aside
+            scan = position
+            while True:
+                scan = data.find(b"\xff", scan)
+                if scan < 0 or scan + 1 >= size:
+                    raise ValueError("Truncated JPEG image.")
+                following = data[scan + 1]
+                if following == 0 or following == 0xFF or 0xD0 <= following <= 0xD7:
+                    scan += 1
+                    continue
+                break
+            output.append(data[position:scan])
+            position = scan
+
+    raise ValueError("Truncated JPEG image.")
+
+
+def stripMetadata(data):
+    """
+    Returns an upload without any metadata.
+
+    JPEG photos are stripped losslessly with ``stripJpeg``, keeping only their
+    EXIF orientation. Other formats are re-encoded in their own format from
+    their pixels, rotated according to their EXIF orientation, so EXIF, XMP
+    and text chunks (GPS data included) are dropped; only the first frame of
+    an animation is kept, as for the renditions.
+
+    Args:
+        data (bytes): The uploaded file.
+
+    Returns:
+        tuple: The extension of the detected format and the stripped bytes.
+
+    Raises:
+        ValueError: If the data is not an image in ``UPLOAD_EXTENSIONS``.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            image_format = original.format
+            if image_format not in UPLOAD_EXTENSIONS:
+                raise ValueError(f"{image_format} images are not accepted.")
+            if image_format == "JPEG":
+                orientation = original.getexif().get(ExifTags.Base.Orientation, 1)
+                return UPLOAD_EXTENSIONS[image_format], stripJpeg(data, orientation)
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as error:
+        raise ValueError("Not a valid image.") from error
+
+    image = image.copy()
+    image.info = {
+        key: value for key, value in image.info.items() if key == "transparency"
+    }
+    options = {}
+    if image_format == "WEBP":
+        options["quality"] = 95
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return UPLOAD_EXTENSIONS[image_format], buffer.getvalue()
+
+
+def renderImage(data, sizes, image_format="WEBP", quality=80):
+    """
+    Decodes an upload and produces its renditions.
+
+    The image is rotated according to its EXIF orientation and re-encoded
+    without any metadata, so EXIF (including GPS data) never reaches clients;
+    the original itself is stripped with ``stripMetadata``.
+
+    Args:
+        data (bytes): The uploaded file.
+        sizes (dict): Rendition name to the maximum length of the longest edge.
+        image_format (str): ``WEBP`` or ``JPEG``.
+        quality (int): The encoder quality.
+
+    Returns:
+        dict: ``width``, ``height``, ``blurhash``, ``renditions``, a mapping
+        of rendition name to ``(extension, encoded bytes)``, and ``original``,
+        the upload without metadata as ``(extension, bytes)``.
+
+    Raises:
+        ValueError: If the data is not an image in ``UPLOAD_EXTENSIONS``.
+    """
+    stripped = stripMetadata(data)
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if hasAlpha(image) else "RGB")
+
+    if image_format == "JPEG" and image.mode == "RGBA":
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    renditions = {}
+    for name, size in sizes.items():
+        rendition = image.copy()
+        rendition.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        rendition.save(buffer, format=image_format, quality=quality, optimize=True)
+        renditions[name] = (EXTENSIONS[image_format], buffer.getvalue())
+
+    return {
+        "width": image.width,
+        "height": image.height,
+        "blurhash": blurhash(image),
+        "renditions": renditions,
+        "original": stripped,
+    }
+
+
+def hasAlpha(image):
+    return image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+# Blurhash, see https://github.com/woltapp/blurhash
+
+
+def encode83(value, length):
+    return "".join(
+        BASE83[(value // 83 ** (length - position - 1)) % 83]
+        for position in range(length)
+    )
+
+
+def srgbToLinear(value):
+    value = value / 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def linearToSrgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def signPow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def blurhash(image, x_components=4, y_components=3):
+    """
+    Computes the blurhash placeholder of an image.
+
+    The image is downscaled to at most 32x32 pixels first, which keeps the
+    pure Python transform cheap without visibly changing the result.
+
+    Args:
+        image (Image): The decoded image.
+        x_components (int): Horizontal components, 1 to 9.
+        y_components (int): Vertical components, 1 to 9.
+
+    Returns:
+        str: The blurhash string.
+    """
+    small = image.convert("RGB")
+    small.thumbnail((32, 32))
+    width, height = small.size
+    pixels = [tuple(srgbToLinear(channel) for channel in pixel) for pixel in small.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            red = green = blue = 0.0
+            for y in range(height):
+                basis_y = math.cos(math.pi * j * y / height)
+                for x in range(width):
+                    basis = normalisation * math.cos(math.pi * i * x / width) * basis_y
+                    pixel = pixels[y * width + x]
+                    red += basis * pixel[0]
+                    green += basis * pixel[1]
+                    blue += basis * pixel[2]
+            scale = 1 / (width * height)
+            factors.append((red * scale, green * scale, blue * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = encode83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_maximum = max(abs(channel) for factor in ac for channel in factor)
+        quantised_maximum = max(0, min(82, math.floor(actual_maximum * 166 - 0.5)))
+        maximum = (quantised_maximum + 1) / 166
+        result += encode83(quantised_maximum, 1)
+    else:
+        maximum = 1
+        result += encode83(0, 1)
+
+    result += encode83(
+        (linearToSrgb(dc[0]) << 16) + (linearToSrgb(dc[1]) << 8) + linearToSrgb(dc[2]),
+        4,
+    )
+
+    def quantise(value):
+        return max(0, min(18, math.floor(signPow(value / maximum, 0.5) * 9 + 9.5)))
+
+    for red, green, blue in ac:
+        result += encode83(quantise(red) * 19 * 19 + quantise(green) * 19 + quantise(blue), 2)
+
+    return result
@@ -0,0 +1,192 @@
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from Media.models import MediaBlob, UploadSession
+from Media.signals import IMAGE_FIELDS
+from Media.storage import isBlobName
+
+
+def referencedNames():
+    """
+    Counts the references to stored files held by Posts and Profile rows.
+
+    Returns:
+        Counter: Storage name to number of references.
+    """
+    references = Counter()
+    for model, field_name in IMAGE_FIELDS.items():
+        rows = model.objects.values_list(field_name, f"{field_name}_renditions")
+        for name, renditions in rows.iterator():
+            if name:
+                references[name] += 1
+            references.update((renditions or {}).values())
+    return references
+
+
+# GC Media
+class Command(BaseCommand):
+    """
+    Garbage-collects the content-addressed media storage.
+
+    Removes blobs that have been unreferenced for ``MEDIA_BLOB_GC_GRACE``
+    seconds, and blob files without a ``MediaBlob`` row, e.g. left by an
+    upload whose transaction rolled back. Each blob row is deleted only while
+    still unreferenced and its file removed in the same transaction, so a
+    concurrent save either re-references the row first, or waits and then
+    finds the file gone and stores its own copy.
+
+    Uploads idle for ``UPLOAD_SESSION_TTL`` seconds are aborted and their
+    staged chunks removed.
+
+    ``--recount`` first rebuilds every reference count from the rows, and
+    ``--adopt`` moves files stored before this backend into blobs.
+    """
+
+    help = "Remove unreferenced media blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Rebuild reference counts from Posts and Profile rows first.",
+        )
+        parser.add_argument(
+            "--adopt",
+            action="store_true",
+            help="Move files uploaded before content addressing into blobs.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        if options["adopt"]:
+            self.adopt(dry_run)
+        if options["recount"]:
+            self.recount(dry_run)
+
+        cutoff = timezone.now() - timedelta(seconds=settings.MEDIA_BLOB_GC_GRACE)
+        collected = 0
+        freed = 0
+        unreferenced = MediaBlob.objects.filter(refcount__lte=0, updated_at__lt=cutoff)
+        for name, size in list(unreferenced.values_list("name", "size")):
+            if not dry_run:
+                with transaction.atomic():
+                    # Skip blobs referenced again since they were listed
+                    if not unreferenced.filter(name=name).delete()[0]:
+                        continue
+                    default_storage.collect(name)
+            collected += 1
+            freed += size
+
+        orphans = self.sweepOrphans(cutoff.timestamp(), dry_run)
+        expired = self.expireUploads(dry_run)
+
+        prefix = "Would remove" if dry_run else "Removed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} {collected} blob(s) ({freed} bytes) "
+                f"and {orphans} orphaned file(s), expired {expired} upload(s)."
+            )
+        )
+
+    def sweepOrphans(self, cutoff, dry_run):
+        root = default_storage.path("blobs")
+        removed = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, default_storage.location)
+                name = name.replace(os.sep, "/")
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if isBlobName(name) and MediaBlob.objects.filter(name=name).exists():
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                removed += 1
+        return removed
+
+    def expireUploads(self, dry_run):
+        cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+        idle = UploadSession.objects.filter(
+            status=UploadSession.UPLOADING, updated_at__lt=cutoff
+        )
+        expired = idle.count()
+        if not dry_run:
+            idle.update(status=UploadSession.ABORTED)
+
+        # Staged chunks of aborted, finalized or deleted uploads
+        root = default_storage.path("uploads")
+        uploading = {
+            f"{pk}.part"
+            for pk in UploadSession.objects.filter(
+                status=UploadSession.UPLOADING
+            ).values_list("pk", flat=True)
+        }
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                if filename in uploading or os.path.getmtime(path) >= cutoff.timestamp():
+                    continue
+                if not dry_run:
+                    os.remove(path)
+        return expired
+
+    def recount(self, dry_run):
+        references = referencedNames()
+        changed = 0
+        for blob in MediaBlob.objects.iterator():
+            refcount = references.get(blob.name, 0)
+            if blob.refcount != refcount:
+                changed += 1
+                if not dry_run:
+                    MediaBlob.objects.filter(name=blob.name).update(
+                        refcount=refcount, updated_at=timezone.now()
+                    )
+        self.stdout.write(f"Recounted references, {changed} blob(s) were off.")
+
+    def adopt(self, dry_run):
+        adopted = 0
+        for model, field_name in IMAGE_FIELDS.items():
+            renditions_field = f"{field_name}_renditions"
+            rows = model.objects.exclude(**{field_name: ""}).exclude(
+                **{f"{field_name}__isnull": True}
+            )
+            for pk, name, renditions in rows.values_list(
+                "pk", field_name, renditions_field
+            ).iterator():
+                legacy = [name] + list((renditions or {}).values())
+                legacy = [path for path in legacy if path and not isBlobName(path)]
+                if not legacy:
+                    continue
+                adopted += 1
+                if dry_run:
+                    continue
+
+                with transaction.atomic():
+                    moved = {}
+                    for path in legacy:
+                        with default_storage.open(path, "rb") as source:
+                            moved[path] = default_storage.save(path, source)
+
+                    updated = model.objects.filter(pk=pk, **{field_name: name}).update(
+                        **{
+                            field_name: moved.get(name, name),
+                            renditions_field: {
+                                key: moved.get(path, path)
+                                for key, path in (renditions or {}).items()
+                            },
+                        }
+                    )
+                    # Whichever copy lost, the legacy file or the new reference, goes
+                    for path in moved if updated else moved.values():
+                        default_storage.delete(path)
+
+        self.stdout.write(f"Adopted the files of {adopted} row(s).")
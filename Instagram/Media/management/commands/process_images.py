@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from Media import imaging
+from Media.pipeline import renderArguments, storeRenditions
+from Posts.models import Posts
+from Profile.models import Profile
+
+
+# Process Images
+class Command(BaseCommand):
+    """
+    Builds missing renditions for post and profile pictures.
+
+    Covers uploads made before the pipeline existed and jobs lost when a
+    worker died; ``--all`` rebuilds every rendition, e.g. after the sizes changed.
+    """
+
+    help = "Build missing image renditions for posts and profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Rebuild existing renditions too."
+        )
+
+    def handle(self, *args, **options):
+        for model, field_name in ((Posts, "post_picture"), (Profile, "profile_picture")):
+            rows = model.objects.exclude(**{field_name: ""}).exclude(
+                **{f"{field_name}__isnull": True}
+            )
+            if not options["all"]:
+                rows = rows.filter(**{f"{field_name}_renditions": {}})
+
+            processed = 0
+            storage = model._meta.get_field(field_name).storage
+            for pk, name in rows.values_list("pk", field_name).iterator():
+                try:
+                    with storage.open(name, "rb") as source:
+                        result = imaging.renderImage(*renderArguments(source.read()))
+                except (OSError, ValueError) as error:
+                    self.stderr.write(f"Skipping {model.__name__} {pk}: {error}")
+                    continue
+                storeRenditions(model, pk, field_name, name, result)
+                processed += 1
+
+            self.stdout.write(
+                self.style.SUCCESS(f"Processed {processed} {model.__name__} image(s).")
+            )
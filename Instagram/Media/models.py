@@ -0,0 +1,89 @@
+import uuid
+from django.db import models
+
+# Create your models here.
+
+
+# Media Blob Model
+class MediaBlob(models.Model):
+    """
+    One stored file of the content-addressed media storage.
+
+    Attributes:
+        name (str): The storage name, ``blobs/ab/cd/<sha256>.<ext>``.
+        digest (str): The SHA-256 hex digest of the content.
+        size (int): The size of the file in bytes.
+        refcount (int): The number of image fields and renditions using the file.
+        created_at (DateTimeField): When the file was first stored.
+        updated_at (DateTimeField): When a reference was last added or dropped.
+    """
+
+    name = models.CharField(max_length=255, primary_key=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["refcount", "updated_at"], name="mediablob_refcount_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} references)"
+
+
+# Upload Session Model
+class UploadSession(models.Model):
+    """
+    A resumable upload of a post picture, sent in chunks before the post exists.
+
+    Attributes:
+        profile (ForeignKey): The profile uploading the file.
+        filename (str): The name of the file on the client.
+        content_type (str): The declared MIME type of the file.
+        size (int): The declared size of the file in bytes.
+        offset (int): The number of bytes received so far.
+        status (str): One of uploading, finalized or aborted.
+        post (ForeignKey): The post created from the upload, once finalized.
+        created_at (DateTimeField): When the upload was started.
+        updated_at (DateTimeField): When the last chunk was received.
+        id (UUIDField): The universally unique identifier for the upload.
+    """
+
+    UPLOADING = "uploading"
+    FINALIZED = "finalized"
+    ABORTED = "aborted"
+    STATUS_CHOICES = [
+        (UPLOADING, "Uploading"),
+        (FINALIZED, "Finalized"),
+        (ABORTED, "Aborted"),
+    ]
+
+    profile = models.ForeignKey(
+        "Profile.Profile", on_delete=models.CASCADE, related_name="uploads"
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=UPLOADING)
+    post = models.ForeignKey(
+        "Posts.Posts", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    id = models.UUIDField(
+        default=uuid.uuid4, editable=False, unique=True, primary_key=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "updated_at"], name="upload_status_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
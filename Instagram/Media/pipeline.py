@@ -0,0 +1,136 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+
+from . import imaging
+from .signals import releaseFiles
+
+logger = logging.getLogger(__name__)
+
+# Image pipeline
+
+lock = threading.Lock()
+executor = None
+
+
+def getExecutor():
+    global executor
+    with lock:
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PIPELINE_WORKERS)
+        return executor
+
+
+def scheduleRenditions(instance, field_name):
+    """
+    Queues the renditions of an uploaded image once the transaction commits.
+
+    Decoding and encoding run on a bounded process pool; the rendition files,
+    dimensions and blurhash are stored on the row when the worker is done.
+    With ``IMAGE_PIPELINE_WORKERS = 0`` the image is processed inline.
+
+    Args:
+        instance (Model): The Posts or Profile row holding the image.
+        field_name (str): The image field, e.g. ``post_picture``.
+    """
+    image = getattr(instance, field_name)
+    if not image:
+        return
+
+    model, pk, name = type(instance), instance.pk, image.name
+    transaction.on_commit(lambda: submitRenditions(model, pk, field_name, name))
+
+
+def renderArguments(data):
+    return (
+        data,
+        settings.IMAGE_RENDITIONS,
+        settings.IMAGE_RENDITION_FORMAT,
+        settings.IMAGE_RENDITION_QUALITY,
+    )
+
+
+def submitRenditions(model, pk, field_name, name):
+    storage = model._meta.get_field(field_name).storage
+    with storage.open(name, "rb") as source:
+        data = source.read()
+
+    if settings.IMAGE_PIPELINE_WORKERS <= 0:
+        result = imaging.renderImage(*renderArguments(data))
+        storeRenditions(model, pk, field_name, name, result)
+        return
+
+    future = getExecutor().submit(imaging.renderImage, *renderArguments(data))
+    future.add_done_callback(
+        lambda future: storeInBackground(model, pk, field_name, name, future)
+    )
+
+
+def storeInBackground(model, pk, field_name, name, future):
+    try:
+        storeRenditions(model, pk, field_name, name, future.result())
+    except Exception:
+        logger.exception("Failed to process %s of %s %s.", field_name, model.__name__, pk)
+    finally:
+        connection.close()
+
+
+def storeRenditions(model, pk, field_name, name, result):
+    """
+    Saves rendered images and records them on the row.
+
+    The original stripped of its metadata replaces the processed upload on
+    the row. The row is only updated if it still points at the processed
+    upload; when the image was replaced in the meantime the fresh files are
+    discarded.
+
+    Args:
+        model (Model): The Posts or Profile model.
+        pk (UUID): The primary key of the row.
+        field_name (str): The image field, e.g. ``post_picture``.
+        name (str): The storage name of the processed upload.
+        result (dict): The return value of ``imaging.renderImage``.
+    """
+    field = model._meta.get_field(field_name)
+    storage = field.storage
+    # The references of the saved files commit with the row, or not at all
+    with transaction.atomic():
+        renditions = {
+            rendition: storage.save(
+                f"renditions/{model._meta.model_name}/{pk}/{rendition}.{extension}",
+                ContentFile(content),
+            )
+            for rendition, (extension, content) in result["renditions"].items()
+        }
+        extension, content = result["original"]
+        original = storage.save(f"{field.upload_to}{pk}.{extension}", ContentFile(content))
+
+        previous = (
+            model.objects.filter(pk=pk)
+            .values_list(f"{field_name}_renditions", flat=True)
+            .first()
+        )
+        updated = model.objects.filter(pk=pk, **{field_name: name}).update(
+            **{
+                field_name: original,
+                f"{field_name}_renditions": renditions,
+                f"{field_name}_width": result["width"],
+                f"{field_name}_height": result["height"],
+                f"{field_name}_blurhash": result["blurhash"],
+            }
+        )
+
+        if not updated:
+            for path in [original, *renditions.values()]:
+                storage.delete(path)
+            return
+
+        # Identical files may share a stored blob, each save holds a reference;
+        # a stripped original equal to the upload was referenced twice
+        for path in (previous or {}).values():
+            storage.delete(path)
+        releaseFiles([name])
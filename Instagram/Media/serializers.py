@@ -0,0 +1,83 @@
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from . import imaging, models
+
+# Serializers goes here
+
+
+# Renditions Field
+class RenditionsField(serializers.Field):
+    """
+    Read-only field exposing stored image renditions as absolute URLs.
+
+    Example:
+        ```
+        post_picture_renditions = RenditionsField()
+        # {"thumbnail": "http://.../thumbnail.webp", "feed": ..., "full": ...}
+        ```
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        urls = {}
+        for rendition, path in (value or {}).items():
+            url = default_storage.url(path)
+            urls[rendition] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
+# Stripped Image Field
+class StrippedImageField(serializers.ImageField):
+    """
+    Image field for uploads whose metadata is stripped by the image pipeline.
+
+    Uploads are only checked to be in ``imaging.UPLOAD_EXTENSIONS`` and stored
+    as received under a random name, so the request never decodes pixels; the
+    pipeline swaps in the original without metadata along with the
+    renditions, see ``imaging.stripMetadata``.
+    """
+
+    def to_internal_value(self, data):
+        upload = super().to_internal_value(data)
+        extension = imaging.UPLOAD_EXTENSIONS.get(upload.image.format)
+        if extension is None:
+            self.fail("invalid_image")
+        upload.name = f"{uuid.uuid4()}.{extension}"
+        return upload
+
+
+# Upload Session Serializer
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.UploadSession
+        fields = [
+            "id",
+            "filename",
+            "content_type",
+            "size",
+            "offset",
+            "status",
+            "post",
+            "created_at",
+        ]
+        read_only_fields = ["offset", "status", "post"]
+
+    def validate_content_type(self, value):
+        if not value.startswith("image/"):
+            raise serializers.ValidationError("Only images can be uploaded.")
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Uploads must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
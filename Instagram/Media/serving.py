@@ -0,0 +1,219 @@
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+from Posts.models import Posts
+from Profile.models import Profile
+
+from .models import MediaBlob
+from .storage import isBlobName
+
+# Media serving
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Only these types are sent inline, anything else is sent as a download
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+
+class FileRange:
+    """
+    A read-only window on an open file, streamed by ``FileResponse``.
+
+    ``fileno`` and ``tell`` are delegated to the file, so a server with a
+    ``wsgi.file_wrapper`` (gunicorn) sends the window with ``os.sendfile``
+    from the current position for ``Content-Length`` bytes; ``read`` is
+    bounded for servers that copy instead.
+    """
+
+    name = ""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def tell(self):
+        return self.file.tell()
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def isServable(name):
+    """
+    Tells whether a storage name may be served.
+
+    Blobs are served while something references them; files stored before
+    content addressing only if a post or profile still uses them. Staged
+    uploads are never served.
+
+    Args:
+        name (str): The storage name from the URL.
+
+    Returns:
+        bool: Whether the file may be served.
+    """
+    if isBlobName(name):
+        return MediaBlob.objects.filter(name=name, refcount__gt=0).exists()
+    return (
+        Posts.objects.filter(post_picture=name).exists()
+        or Profile.objects.filter(profile_picture=name).exists()
+    )
+
+
+def entityTag(name, stat):
+    if isBlobName(name):
+        # The name of a blob is the hash of its content
+        return '"%s"' % os.path.splitext(os.path.basename(name))[0]
+    return '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+
+
+def parseRange(header, size):
+    """
+    Parses a single-range ``Range`` header.
+
+    Args:
+        header (str): The header value, e.g. ``bytes=0-1023``.
+        size (int): The size of the file.
+
+    Returns:
+        tuple: ``(start, length)``, ``None`` to send the whole file or
+        ``False`` if the range cannot be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if match is None:
+        # Multiple or malformed ranges, the whole file is a valid answer
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = min(int(last), size)
+        return (size - length, length) if length else False
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end - start + 1
+
+
+def contentHeaders(response, name):
+    """
+    Sets the type headers of a media response.
+
+    Images in ``CONTENT_TYPES`` are sent inline with their type; anything
+    else, e.g. a legacy file with an ``.html`` or ``.svg`` name, is sent as an
+    ``application/octet-stream`` attachment. Browsers are told not to sniff
+    either way.
+
+    Args:
+        response (HttpResponse): The response to update.
+        name (str): The storage name of the file.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    content_type = CONTENT_TYPES.get(os.path.splitext(name)[1].lower())
+    if content_type is None:
+        response["Content-Type"] = "application/octet-stream"
+        response["Content-Disposition"] = "attachment"
+    else:
+        response["Content-Type"] = content_type
+    response["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+def serveFile(request, name):
+    """
+    Builds the response sending a media file.
+
+    With ``MEDIA_SERVE_MODE`` set to ``x-accel-redirect`` or ``x-sendfile`` the
+    front proxy is told to send the file. Otherwise it is streamed from
+    Python with ``ETag``/``If-None-Match`` and single ``Range`` support, using
+    ``os.sendfile`` where the server allows it. The type headers come from
+    ``contentHeaders`` in every mode.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        name (str): The storage name of the file, already checked with ``isServable``.
+
+    Returns:
+        HttpResponse: The response.
+
+    Raises:
+        FileNotFoundError: If the file is missing from storage.
+    """
+    path = default_storage.path(name)
+    stat = os.stat(path)
+    etag = entityTag(name, stat)
+
+    mode = settings.MEDIA_SERVE_MODE
+    if mode in ("x-accel-redirect", "x-sendfile"):
+        response = contentHeaders(HttpResponse(), name)
+        if mode == "x-accel-redirect":
+            prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX
+            response["X-Accel-Redirect"] = prefix + quote(name)
+        else:
+            response["X-Sendfile"] = path
+        response["ETag"] = etag
+        return cacheHeaders(response, name)
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return cacheHeaders(response, name)
+
+    window = None
+    if "Range" in request.headers and request.headers.get("If-Range", etag) == etag:
+        window = parseRange(request.headers["Range"], stat.st_size)
+        if window is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+    handle = open(path, "rb")
+    if window is None:
+        response = FileResponse(handle)
+    else:
+        start, length = window
+        response = FileResponse(FileRange(handle, start, length))
+        response.status_code = 206
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{start + length - 1}/{stat.st_size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return cacheHeaders(contentHeaders(response, name), name)
+
+
+def cacheHeaders(response, name):
+    if isBlobName(name):
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+    else:
+        response["Cache-Control"] = "private, max-age=3600"
+    return response
@@ -0,0 +1,57 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from Posts.models import Posts
+from Profile.models import Profile
+
+# Media references
+
+IMAGE_FIELDS = {Posts: "post_picture", Profile: "profile_picture"}
+
+
+def releaseFiles(names):
+    """
+    Drops the storage references of files once the transaction commits.
+
+    Args:
+        names (list of str): Storage names no longer used by a row.
+    """
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: [default_storage.delete(name) for name in names])
+
+
+def rememberImage(sender, instance, raw=False, update_fields=None, **kwargs):
+    field_name = IMAGE_FIELDS[sender]
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and field_name not in update_fields:
+        return
+    instance._previous_image = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(field_name, flat=True)
+        .first()
+    )
+
+
+def releaseReplacedImage(sender, instance, raw=False, **kwargs):
+    previous = instance.__dict__.pop("_previous_image", None)
+    if previous and previous != getattr(instance, IMAGE_FIELDS[sender]).name:
+        releaseFiles([previous])
+
+
+def releaseDeletedImage(sender, instance, **kwargs):
+    field_name = IMAGE_FIELDS[sender]
+    releaseFiles(
+        [getattr(instance, field_name).name]
+        + list(getattr(instance, f"{field_name}_renditions").values())
+    )
+
+
+def connectSignals():
+    for model in IMAGE_FIELDS:
+        uid = f"media-{model.__name__}"
+        pre_save.connect(rememberImage, sender=model, dispatch_uid=f"{uid}-pre")
+        post_save.connect(releaseReplacedImage, sender=model, dispatch_uid=uid)
+        post_delete.connect(releaseDeletedImage, sender=model, dispatch_uid=uid)
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image
+
+from .imaging import UPLOAD_EXTENSIONS
+
+# Content-addressed storage
+
+BLOB_NAME = re.compile(r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$")
+
+
+def isBlobName(name):
+    return bool(name) and BLOB_NAME.match(name.replace("\\", "/")) is not None
+
+
+def detectExtension(path):
+    """
+    Detects the extension of a stored file from its content.
+
+    The name a client uploaded a file as is never trusted: a GIF named
+    ``x.html`` would otherwise be served back as HTML.
+
+    Args:
+        path (str): The local file.
+
+    Returns:
+        str: The extension of an accepted image format, e.g. ``jpg``, or an
+        empty string for anything else.
+    """
+    try:
+        with Image.open(path) as image:
+            return UPLOAD_EXTENSIONS.get(image.format, "")
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        return ""
+
+
+def blobName(digest, extension):
+    """
+    Builds the sharded storage name of a blob.
+
+    Args:
+        digest (str): The SHA-256 hex digest of the content.
+        extension (str): The extension detected from the content, may be empty.
+
+    Returns:
+        str: ``blobs/ab/cd/<digest>.<ext>``, without the dot when there is no
+        extension.
+    """
+    suffix = f".{extension}" if extension else ""
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage keeping every distinct file content exactly once.
+
+    Content is hashed with SHA-256 while it is streamed to a temporary file
+    next to the blobs, then moved to ``blobs/ab/cd/<sha256>.<ext>``; if that
+    blob already exists the copy is dropped. The extension comes from the
+    image format Pillow detects, never from the name being saved. Uploads Django already staged
+    on disk are hashed in place and moved instead of copied.
+
+    Every ``save`` adds a reference to the blob's ``MediaBlob`` row and every
+    ``delete`` drops one; files are only removed by ``gc_media`` once
+    unreferenced for ``MEDIA_BLOB_GC_GRACE`` seconds. Names outside
+    ``blobs/``, from before this storage, are opened and deleted as usual.
+
+    References are written in the caller's transaction, so saves must run in
+    the same atomic block as the row that stores the name; a rollback then
+    drops the reference along with the row.
+
+    Methods:
+        addReference(self, name, delta):
+            Adds or drops references to a blob.
+    """
+
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        staged = getattr(content, "temporary_file_path", None)
+
+        if staged is not None:
+            source = staged()
+            with open(source, "rb") as handle:
+                while chunk := handle.read(self.chunk_size):
+                    digest.update(chunk)
+            size = os.path.getsize(source)
+        else:
+            directory = self.path("blobs")
+            os.makedirs(directory, exist_ok=True)
+            descriptor, source = tempfile.mkstemp(dir=directory, suffix=".part")
+            size = 0
+            try:
+                with os.fdopen(descriptor, "wb") as handle:
+                    if hasattr(content, "seek"):
+                        content.seek(0)
+                    for chunk in content.chunks(self.chunk_size):
+                        if isinstance(chunk, str):
+                            chunk = chunk.encode()
+                        digest.update(chunk)
+                        handle.write(chunk)
+                        size += len(chunk)
+            except BaseException:
+                os.remove(source)
+                raise
+
+        name = blobName(digest.hexdigest(), detectExtension(source))
+        self.addReference(name, 1, digest=digest.hexdigest(), size=size)
+
+        path = self.path(name)
+        if os.path.exists(path):
+            if staged is None:
+                os.remove(source)
+            # Keep the orphan sweep of gc_media off a file that is reused
+            # before the reference commits
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if staged is not None:
+                file_move_safe(source, path, allow_overwrite=True)
+            else:
+                os.replace(source, path)
+            if self.file_permissions_mode is not None:
+                os.chmod(path, self.file_permissions_mode)
+
+        return name
+
+    def delete(self, name):
+        if not isBlobName(name):
+            return super().delete(name)
+        self.addReference(name, -1)
+
+    def addReference(self, name, delta, digest=None, size=0):
+        """
+        Adds or drops references to a blob.
+
+        The row is updated in place, or created when it does not exist, e.g.
+        because ``gc_media`` collected it a moment ago; the update waits for a
+        concurrent collection to commit, so the caller sees whether the file
+        is still there.
+
+        Args:
+            name (str): The storage name of the blob.
+            delta (int): The number of references to add, negative to drop.
+            digest (str): The content digest, required to record a new blob.
+            size (int): The content size, recorded with a new blob.
+        """
+        from .models import MediaBlob
+
+        while True:
+            updated = MediaBlob.objects.filter(name=name).update(
+                refcount=F("refcount") + delta, updated_at=timezone.now()
+            )
+            if updated or digest is None:
+                return
+            try:
+                with transaction.atomic():
+                    MediaBlob.objects.create(
+                        name=name, digest=digest, size=size, refcount=delta
+                    )
+                return
+            except IntegrityError:
+                # Created concurrently, add to that row instead
+                continue
+
+    def collect(self, name):
+        """
+        Removes the file of a blob.
+
+        Args:
+            name (str): The storage name of the blob.
+        """
+        super().delete(name)
@@ -0,0 +1,456 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps
+from rest_framework.test import APITestCase
+
+from Instagram.testing import makeProfile
+from Posts.models import Posts
+from Profile.models import Profile
+
+from . import imaging
+from .models import MediaBlob
+
+# Create your tests here.
+
+
+def encodeImage(image_format="JPEG", size=(64, 48), **options):
+    image = Image.new("RGB", size, "red")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def photoWithLocation(image_format="JPEG"):
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    exif[ExifTags.Base.Make] = "Camera"
+    exif[ExifTags.IFD.GPSInfo] = {
+        ExifTags.GPS.GPSLatitudeRef: "N",
+        ExifTags.GPS.GPSLatitude: (52.0, 31.0, 12.0),
+    }
+    return encodeImage(image_format, exif=exif)
+
+
+# Media Test Case
+class MediaTestCase(APITestCase):
+    """
+    Test case storing media in a temporary MEDIA_ROOT.
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, IMAGE_PIPELINE_WORKERS=0
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user, self.profile, self.client = makeProfile("owner")
+
+    def storedImage(self, name):
+        with default_storage.open(name, "rb") as handle:
+            data = handle.read()
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+        return data, image
+
+    def assertWithoutMetadata(self, name):
+        data, image = self.storedImage(name)
+        # Only the orientation is kept, when it was not applied to the pixels
+        self.assertLessEqual(set(image.getexif()), {ExifTags.Base.Orientation})
+        self.assertNotIn(b"Camera", data)
+        self.assertEqual(ImageOps.exif_transpose(image).size, (48, 64))
+
+    def startUpload(self, data, filename="photo.jpg", content_type="image/jpeg"):
+        response = self.client.post(
+            "/api/uploads/",
+            {"filename": filename, "content_type": content_type, "size": len(data)},
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return f"/api/uploads/{response.data['id']}/"
+
+    def putChunk(self, url, chunk, offset):
+        return self.client.put(
+            url,
+            chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def upload(self, data, filename, content_type="image/jpeg", description=None):
+        url = self.startUpload(data, filename, content_type)
+        response = self.putChunk(url, data, 0)
+        self.assertEqual(response.status_code, 200, response.data)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"{url}finalize/", {"description": description}, format="json"
+            )
+
+
+class MetadataTests(MediaTestCase):
+    def test_post_picture_is_stored_without_metadata(self):
+        photo = photoWithLocation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                "/api/posts/",
+                {
+                    "description": "hi",
+                    "post_picture": SimpleUploadedFile("photo.jpg", photo),
+                },
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+
+        # Stored as received, the pipeline strips it
+        post = Posts.objects.get(profile=self.profile)
+        upload = post.post_picture.name
+        self.assertEqual(self.storedImage(upload)[0], photo)
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+
+        post.refresh_from_db()
+        self.assertNotEqual(post.post_picture.name, upload)
+        self.assertEqual(MediaBlob.objects.get(name=upload).refcount, 0)
+        self.assertEqual(MediaBlob.objects.get(name=post.post_picture.name).refcount, 1)
+        self.assertWithoutMetadata(post.post_picture.name)
+        self.assertEqual(set(post.post_picture_renditions), {"thumbnail", "feed", "full"})
+        for name in post.post_picture_renditions.values():
+            self.assertNotIn(b"Exif", self.storedImage(name)[0])
+
+        response = self.client.get(f"/api/posts/{post.pk}/")
+        self.assertTrue(response.data["post_picture"].endswith(post.post_picture.name))
+
+    def test_profile_picture_is_stored_without_metadata(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                "/api/profile/profile/owner/",
+                {"profile_picture": SimpleUploadedFile("me.png", photoWithLocation("PNG"))},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertWithoutMetadata(Profile.objects.get(pk=self.profile.pk).profile_picture.name)
+
+    def test_finalized_upload_is_stored_without_metadata(self):
+        response = self.upload(photoWithLocation(), "photo.jpg")
+        self.assertEqual(response.status_code, 201, response.data)
+        post = Posts.objects.get(pk=response.data["post"])
+        self.assertWithoutMetadata(post.post_picture.name)
+
+    def test_jpeg_is_stripped_losslessly(self):
+        photo = photoWithLocation()
+        extension, stripped = imaging.stripMetadata(photo)
+        self.assertEqual(extension, "jpg")
+        # The scans are copied byte for byte
+        scan = photo.index(b"\xff\xda")
+        self.assertEqual(stripped[stripped.index(b"\xff\xda") :], photo[scan:])
+        self.assertEqual(imaging.stripMetadata(stripped)[1], stripped)
+        # Anything after the end of the image is dropped
+        self.assertEqual(imaging.stripMetadata(photo + b"<html>")[1], stripped)
+
+        upright = encodeImage(exif=Image.Exif())
+        self.assertNotIn(b"Exif", imaging.stripMetadata(upright)[1])
+
+    def test_invalid_image_is_rejected(self):
+        response = self.client.post(
+            "/api/posts/",
+            {"post_picture": SimpleUploadedFile("photo.jpg", b"not an image")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("post_picture", response.data)
+        self.assertFalse(Posts.objects.exists())
+
+
+class ResumableUploadTests(MediaTestCase):
+    def test_retried_chunk_is_answered_with_the_current_offset(self):
+        photo = photoWithLocation()
+        url = self.startUpload(photo)
+
+        response = self.putChunk(url, photo[:100], 0)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["offset"], 100)
+
+        # The acknowledgement was lost, the client sends the chunk again
+        response = self.putChunk(url, photo[:100], 0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], 100)
+        self.assertEqual(response["Upload-Offset"], "100")
+        self.assertEqual(self.client.get(url)["Upload-Offset"], "100")
+
+        response = self.putChunk(url, photo[100:], 100)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["offset"], len(photo))
+
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(f"{url}finalize/", format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+
+        # Moved into storage as received, the pipeline strips it later
+        post = Posts.objects.get(pk=response.data["post"])
+        self.assertEqual(self.storedImage(post.post_picture.name)[0], photo)
+        self.assertFalse(os.listdir(default_storage.path("uploads")))
+
+    @override_settings(UPLOAD_CHUNK_MAX_SIZE=64)
+    def test_oversized_chunk_is_rejected(self):
+        photo = photoWithLocation()
+        url = self.startUpload(photo)
+        response = self.putChunk(url, photo[:65], 0)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.client.get(url).data["offset"], 0)
+
+        response = self.putChunk(url, photo[:64], 0)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["offset"], 64)
+
+    def test_incomplete_upload_is_not_finalized(self):
+        photo = photoWithLocation()
+        url = self.startUpload(photo)
+        self.putChunk(url, photo[:100], 0)
+
+        response = self.client.post(f"{url}finalize/", format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["detail"], "Upload is not complete.")
+        self.assertEqual(self.client.get(url).data["status"], "uploading")
+        self.assertFalse(Posts.objects.exists())
+
+
+class BlobReferenceTests(MediaTestCase):
+    def save(self, content=b"blob"):
+        return default_storage.save("posts/file.bin", ContentFile(content))
+
+    def ageBlobs(self):
+        old = timezone.now() - timedelta(days=1)
+        MediaBlob.objects.update(updated_at=old)
+        for directory, _, files in os.walk(default_storage.path("blobs")):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                os.utime(path, (old.timestamp(), old.timestamp()))
+
+    def gc(self):
+        call_command("gc_media", stdout=io.StringIO())
+
+    def test_saves_share_one_blob(self):
+        name = self.save()
+        self.assertEqual(self.save(), name)
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 2)
+        default_storage.delete(name)
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
+
+    def test_gc_collects_only_unreferenced_blobs(self):
+        kept, dropped = self.save(b"kept"), self.save(b"dropped")
+        default_storage.delete(dropped)
+        self.ageBlobs()
+        self.gc()
+        self.assertTrue(default_storage.exists(kept))
+        self.assertFalse(default_storage.exists(dropped))
+        self.assertFalse(MediaBlob.objects.filter(name=dropped).exists())
+
+    def test_gc_skips_blobs_referenced_again(self):
+        name = self.save()
+        default_storage.delete(name)
+        self.ageBlobs()
+        delete = QuerySet.delete
+
+        # Listed as unreferenced, then referenced again before it is deleted
+        def referenceFirst(queryset):
+            self.save()
+            return delete(queryset)
+
+        with mock.patch.object(QuerySet, "delete", referenceFirst):
+            self.gc()
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
+
+    def test_save_after_collection_stores_the_file_again(self):
+        name = self.save()
+        default_storage.delete(name)
+        self.ageBlobs()
+        self.gc()
+
+        self.assertEqual(self.save(), name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
+
+    def test_reused_file_is_kept_from_the_orphan_sweep(self):
+        name = self.save()
+        MediaBlob.objects.filter(name=name).delete()
+        self.ageBlobs()
+        # Reused by a save whose reference has not committed yet
+        self.save()
+        MediaBlob.objects.filter(name=name).delete()
+        self.gc()
+        self.assertTrue(default_storage.exists(name))
+
+    def test_rolled_back_save_drops_its_reference(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                name = self.save()
+                raise RuntimeError("rolled back")
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_failed_post_creation_drops_its_reference(self):
+        picture = SimpleUploadedFile("photo.jpg", photoWithLocation())
+        with mock.patch("Posts.views.indexPost", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    "/api/posts/", {"post_picture": picture}, format="multipart"
+                )
+        self.assertFalse(Posts.objects.exists())
+        self.assertFalse(MediaBlob.objects.exists())
+
+
+class UploadFormatTests(MediaTestCase):
+    polyglot = encodeImage("GIF") + b"<html><script>alert(1)</script></html>"
+
+    def test_polyglot_is_stored_as_the_detected_format(self):
+        response = self.upload(self.polyglot, "x.html", "image/gif")
+        self.assertEqual(response.status_code, 201, response.data)
+        name = Posts.objects.get(pk=response.data["post"]).post_picture.name
+        self.assertTrue(name.endswith(".gif"), name)
+        self.assertNotIn(b"<script>", self.storedImage(name)[0])
+
+    def test_multipart_polyglot_is_rejected_or_re_encoded(self):
+        response = self.client.post(
+            "/api/posts/",
+            {"post_picture": SimpleUploadedFile("x.html", self.polyglot)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/posts/",
+                {"post_picture": SimpleUploadedFile("x.jpg", self.polyglot)},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        name = Posts.objects.get(profile=self.profile).post_picture.name
+        self.assertTrue(name.endswith(".gif"), name)
+        self.assertNotIn(b"<script>", self.storedImage(name)[0])
+
+    def test_storage_never_keeps_the_given_extension(self):
+        image = default_storage.save("posts/x.html", ContentFile(encodeImage("PNG")))
+        self.assertTrue(image.endswith(".png"), image)
+        other = default_storage.save("posts/x.html", ContentFile(b"<html></html>"))
+        self.assertEqual(os.path.splitext(other)[1], "")
+
+    def test_other_image_formats_are_rejected(self):
+        response = self.upload(encodeImage("BMP"), "photo.bmp", "image/bmp")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "Upload is not a valid image.")
+        self.assertFalse(Posts.objects.exists())
+        self.assertFalse(MediaBlob.objects.exists())
+
+
+class ServingTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.image = default_storage.save("posts/a.gif", ContentFile(encodeImage("GIF")))
+        # Stored before content addressing, under the client's name
+        self.legacy = "posts/x.html"
+        os.makedirs(default_storage.path("posts"), exist_ok=True)
+        with open(default_storage.path(self.legacy), "wb") as handle:
+            handle.write(b"<html><script>alert(1)</script></html>")
+        for name in (self.image, self.legacy):
+            Posts.objects.create(profile=self.profile, post_picture=name)
+
+    def get(self, name):
+        response = self.client.get(f"/media/{name}")
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_image_is_sent_inline_with_its_type(self):
+        response = self.get(self.image)
+        self.assertEqual(response["Content-Type"], "image/gif")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertNotIn("attachment", response.get("Content-Disposition", ""))
+        self.assertEqual(b"".join(response.streaming_content)[:3], b"GIF")
+
+    def test_other_files_are_sent_as_downloads(self):
+        response = self.get(self.legacy)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response["Content-Disposition"], "attachment")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+    def test_proxy_modes_send_the_same_headers(self):
+        for mode in ("x-accel-redirect", "x-sendfile"):
+            with self.subTest(mode=mode), override_settings(MEDIA_SERVE_MODE=mode):
+                image, legacy = self.get(self.image), self.get(self.legacy)
+                self.assertEqual(image["Content-Type"], "image/gif")
+                self.assertEqual(legacy["Content-Type"], "application/octet-stream")
+                self.assertEqual(legacy["Content-Disposition"], "attachment")
+                for response in (image, legacy):
+                    self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+                    self.assertEqual(response.content, b"")
+
+    def test_ranges_are_sent_partially(self):
+        content = b"".join(self.get(self.image).streaming_content)
+        size = len(content)
+        for header, start, end in (
+            ("bytes=0-9", 0, 9),
+            ("bytes=10-", 10, size - 1),
+            ("bytes=-5", size - 5, size - 1),
+            ("bytes=5-100000", 5, size - 1),
+        ):
+            with self.subTest(range=header):
+                response = self.client.get(f"/media/{self.image}", HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+                self.assertEqual(
+                    b"".join(response.streaming_content), content[start : end + 1]
+                )
+
+    def test_unsatisfiable_range_is_refused(self):
+        size = default_storage.size(self.image)
+        for header in (f"bytes={size}-", "bytes=5-4", "bytes=-0"):
+            with self.subTest(range=header):
+                response = self.client.get(f"/media/{self.image}", HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], f"bytes */{size}")
+
+    def test_other_ranges_send_the_whole_file(self):
+        etag = self.get(self.image)["ETag"]
+        for headers in (
+            {"HTTP_RANGE": "bytes=0-1,4-5"},
+            {"HTTP_RANGE": "lines=1-2"},
+            {"HTTP_RANGE": "bytes=0-9", "HTTP_IF_RANGE": '"stale"'},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(f"/media/{self.image}", **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("Content-Range", response)
+
+        response = self.client.get(
+            f"/media/{self.image}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag
+        )
+        self.assertEqual(response.status_code, 206)
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get(self.image)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        response = self.client.get(
+            f"/media/{self.image}", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Cache-Control"], "private, max-age=31536000, immutable")
+
+    def test_unreferenced_files_are_not_served(self):
+        Posts.objects.all().delete()
+        response = self.client.get(f"/media/{self.legacy}")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,116 @@
+import os
+
+from django.conf import settings
+from django.core.files import File, locks
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from . import models
+
+# Resumable uploads
+
+
+class OffsetMismatch(Exception):
+    """
+    Raised when a chunk does not start where the upload left off.
+
+    Attributes:
+        offset (int): The number of bytes received so far.
+    """
+
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset
+
+
+def stagingPath(session):
+    """
+    Returns the local file receiving the chunks of an upload.
+
+    Args:
+        session (UploadSession): The upload.
+
+    Returns:
+        str: ``<MEDIA_ROOT>/uploads/<id>.part``.
+    """
+    return os.path.join(default_storage.path("uploads"), f"{session.pk}.part")
+
+
+class StagedUpload(File):
+    """
+    The staging file of a complete upload, saved to storage without a copy.
+
+    Storages move a file exposing ``temporary_file_path`` into place instead
+    of copying its content, as they do for large multipart uploads.
+    """
+
+    def __init__(self, session):
+        self.path = stagingPath(session)
+        super().__init__(open(self.path, "rb"), name=os.path.basename(self.path))
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def appendChunk(session, offset, stream, length):
+    """
+    Writes a chunk of an upload straight from the request stream to disk.
+
+    The chunk is copied in ``UPLOAD_STREAM_BUFFER_SIZE`` pieces under an
+    exclusive lock on the staging file, so retried or concurrent requests for
+    one upload are applied one at a time.
+
+    Args:
+        session (UploadSession): The upload.
+        offset (int): Where the chunk starts, from the ``Upload-Offset`` header.
+        stream (file): The request body.
+        length (int): The length of the chunk.
+
+    Returns:
+        int: The number of bytes received so far.
+
+    Raises:
+        OffsetMismatch: If ``offset`` is not the current offset of the upload.
+    """
+    path = stagingPath(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "ab+") as handle:
+        locks.lock(handle, locks.LOCK_EX)
+        try:
+            current = (
+                models.UploadSession.objects.filter(pk=session.pk)
+                .values_list("offset", flat=True)
+                .get()
+            )
+            if offset != current:
+                raise OffsetMismatch(current)
+
+            # Drop bytes of an interrupted chunk that were never acknowledged
+            handle.truncate(current)
+            remaining = length
+            while remaining > 0:
+                data = stream.read(min(remaining, settings.UPLOAD_STREAM_BUFFER_SIZE))
+                if not data:
+                    break
+                handle.write(data)
+                remaining -= len(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+            received = current + length - remaining
+            models.UploadSession.objects.filter(pk=session.pk).update(
+                offset=received, updated_at=timezone.now()
+            )
+        finally:
+            locks.unlock(handle)
+
+    session.offset = received
+    return received
+
+
+def discardUpload(session):
+    try:
+        os.remove(stagingPath(session))
+    except FileNotFoundError:
+        pass
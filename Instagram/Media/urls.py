@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+# Media URL ( endpoints )
+
+router = DefaultRouter()
+router.register("", views.UploadSessionViewsets, basename="upload")
+
+urlpatterns = [
+    path("uploads/", include(router.urls)),
+]
@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import Http404
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from Feed.utils import fanOutPost
+from Hashtags.utils import indexPost
+from Posts.models import Posts
+
+from . import models, serializers, serving, uploads
+from .pipeline import scheduleRenditions
+from .storage import detectExtension
+
+# Create your views here.
+
+
+# Upload Session Viewsets
+class UploadSessionViewsets(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Resumable, chunked uploads of post pictures.
+
+    ``POST /api/uploads/`` starts an upload from its ``filename``,
+    ``content_type`` and ``size``. Chunks are sent with
+    ``PUT /api/uploads/<id>/`` and an ``Upload-Offset`` header, and are
+    streamed from the request body to disk without being buffered; a client
+    that lost its connection asks ``GET`` (or ``HEAD``) for the offset to
+    resume from. ``POST /api/uploads/<id>/finalize/`` then creates the post
+    in a short, metadata-only request.
+
+    Chunks are capped at ``UPLOAD_CHUNK_MAX_SIZE`` bytes, which bounds how long
+    a slow client can hold a worker per request.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = serializers.UploadSessionSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return models.UploadSession.objects.filter(profile=self.request.user.Profile)
+
+    def perform_create(self, serializer):
+        serializer.save(profile=self.request.user.Profile)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if isinstance(response.data, dict) and "offset" in response.data:
+            response["Upload-Offset"] = response.data["offset"]
+        return response
+
+    def update(self, request, *args, **kwargs):
+        session = self.get_object()
+        if session.status != models.UploadSession.UPLOADING:
+            return Response(
+                {"detail": f"Upload is {session.status}."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Upload-Offset and Content-Length headers are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+            return Response(
+                {
+                    "detail": f"Chunks are limited to {settings.UPLOAD_CHUNK_MAX_SIZE} bytes."
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if offset < 0 or length < 0 or offset + length > session.size:
+            return Response(
+                {"detail": "Chunk goes past the declared size."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            uploads.appendChunk(session, offset, request.stream, length)
+        except uploads.OffsetMismatch as mismatch:
+            session.offset = mismatch.offset
+            return Response(
+                self.get_serializer(session).data, status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(session).data, status=status.HTTP_200_OK)
+
+    def perform_destroy(self, instance):
+        updated = models.UploadSession.objects.filter(
+            pk=instance.pk, status=models.UploadSession.UPLOADING
+        ).update(status=models.UploadSession.ABORTED)
+        if updated:
+            uploads.discardUpload(instance)
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        complete = session.offset == session.size
+        if session.status != models.UploadSession.UPLOADING or not complete:
+            return Response(
+                {"detail": "Upload is not complete."}, status=status.HTTP_409_CONFLICT
+            )
+
+        # Only the header is read here, the image pipeline strips the metadata
+        extension = detectExtension(uploads.stagingPath(session))
+        if not extension:
+            return Response(
+                {"detail": "Upload is not a valid image."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            # Only one finalize request may claim the upload
+            claimed = models.UploadSession.objects.filter(
+                pk=session.pk, status=models.UploadSession.UPLOADING
+            ).update(status=models.UploadSession.FINALIZED)
+            if not claimed:
+                return Response(
+                    {"detail": "Upload is already finalized."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            # The client's filename is only metadata, never part of the name
+            with uploads.StagedUpload(session) as staged:
+                name = default_storage.save(f"posts/{session.pk}.{extension}", staged)
+            post = Posts.objects.create(
+                profile=session.profile,
+                post_picture=name,
+                description=request.data.get("description"),
+            )
+            indexPost(post)
+            models.UploadSession.objects.filter(pk=session.pk).update(post=post)
+            transaction.on_commit(lambda: fanOutPost(post))
+            scheduleRenditions(post, "post_picture")
+
+        uploads.discardUpload(session)
+        session.refresh_from_db()
+        serializer = self.get_serializer(session)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# Media File View
+class MediaFileView(APIView):
+    """
+    Serves uploaded media to authenticated users.
+
+    Access is checked here, then the transfer is handed to the front proxy
+    or streamed without copying through Python, see ``serving.serveFile``.
+    Media requests are not throttled: a single feed page loads dozens.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = []
+
+    def get(self, request, name):
+        try:
+            if not serving.isServable(name):
+                raise Http404
+            return serving.serveFile(request, name)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            raise Http404
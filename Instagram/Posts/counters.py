@@ -0,0 +1,141 @@
+import atexit
+import functools
+import logging
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Engagement counters
+
+
+class CounterBuffer:
+    """
+    In-process write-behind buffer for the engagement counters of Posts.
+
+    Likes and comments add their deltas here instead of updating the post row
+    directly. Pending deltas are flushed as one
+    ``UPDATE ... SET field = field + n WHERE id IN (...)`` per distinct
+    ``(field, n)``, so a burst of likes on one post costs a single row update
+    per flush instead of one row lock per like.
+
+    A flush happens ``POSTS_COUNTER_FLUSH_INTERVAL`` seconds after the first
+    pending delta, as soon as ``POSTS_COUNTER_MAX_PENDING`` posts are pending,
+    and when the worker exits. An interval of 0 writes through immediately.
+    Deltas added inside a transaction are only buffered once it commits, so a
+    rolled back like or purge chunk never reaches the counters.
+
+    Methods:
+        add(self, post_id, field, delta):
+            Buffers a delta for a counter of a post.
+
+        flush(self):
+            Writes every pending delta to the database.
+    """
+
+    chunk_size = 500
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(int)
+        self.timer = None
+
+    def add(self, post_id, field, delta):
+        """
+        Buffers a delta for a counter of a post once the current transaction commits.
+
+        Args:
+            post_id (UUID): The post whose counter changes.
+            field (str): ``like_count`` or ``comment_count``.
+            delta (int): The change to apply.
+        """
+        transaction.on_commit(functools.partial(self.buffer, post_id, field, delta))
+
+    def buffer(self, post_id, field, delta):
+        with self.lock:
+            self.pending[(field, post_id)] += delta
+            pending = len(self.pending)
+
+        interval = settings.POSTS_COUNTER_FLUSH_INTERVAL
+        if interval <= 0 or pending >= settings.POSTS_COUNTER_MAX_PENDING:
+            self.flush()
+        else:
+            self.schedule(interval)
+
+    def schedule(self, interval):
+        with self.lock:
+            if self.timer is None:
+                self.timer = threading.Timer(interval, self.flushInBackground)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flushInBackground(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush post engagement counters.")
+        finally:
+            connection.close()
+
+    def flush(self):
+        """
+        Writes every pending delta to the database.
+
+        Deltas whose update fails, and those not attempted yet, are put back
+        into the buffer; deltas already written are not.
+
+        Returns:
+            int: The number of post counters that were written.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(int)
+            timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()
+
+        grouped = defaultdict(list)
+        for (field, post_id), delta in pending.items():
+            if delta:
+                grouped[(field, delta)].append(post_id)
+
+        updates = deque(
+            (field, delta, post_ids[start : start + self.chunk_size])
+            for (field, delta), post_ids in grouped.items()
+            for start in range(0, len(post_ids), self.chunk_size)
+        )
+        written = 0
+        try:
+            while updates:
+                field, delta, post_ids = updates[0]
+                models.Posts.objects.filter(pk__in=post_ids).update(
+                    **{field: Greatest(F(field) + delta, Value(0))}
+                )
+                updates.popleft()
+                written += len(post_ids)
+        except Exception:
+            with self.lock:
+                for field, delta, post_ids in updates:
+                    for post_id in post_ids:
+                        self.pending[(field, post_id)] += delta
+            raise
+
+        return written
+
+
+engagement_counters = CounterBuffer()
+atexit.register(engagement_counters.flush)
+
+
+def addLike(post_id, delta=1):
+    engagement_counters.add(post_id, "like_count", delta)
+
+
+def addComment(post_id, delta=1):
+    engagement_counters.add(post_id, "comment_count", delta)
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Posts.trending import TrendingConflict, computeTrending
+
+
+# Compute Trending
+class Command(BaseCommand):
+    """
+    Updates the trending posts served by ``/api/posts/trending/``.
+
+    Each run only reads the likes and comments made since the previous one.
+    Run it from cron, or keep it running with ``--interval``; never run two
+    at once.
+    """
+
+    help = "Fold new likes and comments into the trending post scores."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Run again every N seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            try:
+                state = computeTrending()
+            except TrendingConflict as error:
+                self.stderr.write(self.style.WARNING(f"Skipped: {error}"))
+            else:
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Folded {state.events} event(s) through "
+                        f"{state.events_through.isoformat()} in {elapsed:.2f}s."
+                    )
+                )
+            elapsed = time.monotonic() - started
+            if options["interval"] <= 0:
+                return
+            time.sleep(max(options["interval"] - elapsed, 0))
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from Comments.models import Comments
+from Likes.models import Likes
+from Posts import models
+from Posts.counters import engagement_counters
+
+
+def postCount(model):
+    """
+    Builds a correlated COUNT over a model referencing the post in the outer query.
+
+    Args:
+        model (Model): Likes or Comments.
+
+    Returns:
+        Coalesce: The row count, 0 when the post has no rows.
+    """
+    return Coalesce(
+        Subquery(
+            model.objects.filter(post=OuterRef("pk"))
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+# Reconcile Post Counts
+class Command(BaseCommand):
+    """
+    Recomputes Posts.like_count / comment_count from the Likes and Comments tables.
+
+    Buffered deltas of this process are flushed first, then only drifted posts
+    are rewritten, in batches of ``--batch-size`` rows.
+    """
+
+    help = "Recompute drifted like/comment counters on Posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted posts without writing.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        engagement_counters.flush()
+
+        drifted = (
+            models.Posts.objects.annotate(
+                actual_likes=postCount(Likes),
+                actual_comments=postCount(Comments),
+            )
+            .filter(
+                ~Q(like_count=F("actual_likes"))
+                | ~Q(comment_count=F("actual_comments"))
+            )
+            .only("pk", "like_count", "comment_count")
+        )
+
+        fixed = 0
+        batch = []
+        for post in drifted.iterator(chunk_size=batch_size):
+            post.like_count = post.actual_likes
+            post.comment_count = post.actual_comments
+            batch.append(post)
+            if len(batch) >= batch_size:
+                fixed += self.flush(batch, options["dry_run"])
+                batch = []
+        fixed += self.flush(batch, options["dry_run"])
+
+        verb = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {fixed} drifted post(s)."))
+
+    def flush(self, batch, dry_run):
+        if batch and not dry_run:
+            with transaction.atomic():
+                models.Posts.objects.bulk_update(batch, ["like_count", "comment_count"])
+        return len(batch)
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0001_initial'),
+        ('Profile', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['created_at', 'id'], name='posts_created_id_idx'),
+        ),
+    ]
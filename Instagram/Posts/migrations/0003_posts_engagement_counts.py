@@ -0,0 +1,50 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_engagement_counts(apps, schema_editor):
+    Posts = apps.get_model("Posts", "Posts")
+    Likes = apps.get_model("Likes", "Likes")
+    Comments = apps.get_model("Comments", "Comments")
+
+    def post_count(model):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(post=OuterRef("pk"))
+                .values("post")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    Posts.objects.update(
+        like_count=post_count(Likes),
+        comment_count=post_count(Comments),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Comments', '0001_initial'),
+        ('Likes', '0001_initial'),
+        ('Posts', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posts',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_engagement_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:07
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+
+def strip_media_prefix(apps, schema_editor):
+    # MEDIA_ROOT now points at the media/ directory itself
+    Posts = apps.get_model("Posts", "Posts")
+    Posts.objects.filter(post_picture__startswith="media/").update(
+        post_picture=Substr("post_picture", len("media/") + 1)
+    )
+
+
+def add_media_prefix(apps, schema_editor):
+    Posts = apps.get_model("Posts", "Posts")
+    Posts.objects.exclude(post_picture="").exclude(post_picture__isnull=True).update(
+        post_picture=Concat(Value("media/"), "post_picture")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0003_posts_engagement_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posts',
+            name='post_picture_blurhash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='post_picture_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='post_picture_renditions',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='posts',
+            name='post_picture_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='posts',
+            name='post_picture',
+            field=models.ImageField(blank=True, null=True, upload_to='posts/'),
+        ),
+        migrations.RunPython(strip_media_prefix, add_media_prefix),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0004_post_picture_renditions'),
+        ('Profile', '0005_profile_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posts',
+            index=models.Index(fields=['profile', '-created_at', '-id'], name='posts_profile_created_idx'),
+        ),
+    ]
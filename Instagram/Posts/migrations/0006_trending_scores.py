@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Posts', '0005_profile_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('epoch', models.DateTimeField()),
+                ('events_through', models.DateTimeField()),
+                ('events', models.PositiveBigIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PostScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='Posts.posts')),
+                ('score', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score'], name='postscore_score_idx'), models.Index(fields=['rank'], name='postscore_rank_idx'), models.Index(fields=['created_at'], name='postscore_created_idx')],
+            },
+        ),
+    ]
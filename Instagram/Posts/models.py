@@ -6,21 +6,97 @@ from Profile.models import Profile
 # Create your models here.
 
 
+# Posts QuerySet
+class PostsQuerySet(models.QuerySet):
+    def visible(self):
+        # Deactivated accounts keep their posts until the purge reaches them
+        return self.filter(profile__deactivated_at__isnull=True)
+
+
 # Posts Model
 class Posts(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
-    post_picture = models.ImageField(
-        upload_to="media/posts/", null=True, blank=True
-    )
+    post_picture = models.ImageField(upload_to="posts/", null=True, blank=True)
+    post_picture_renditions = models.JSONField(default=dict, editable=False)
+    post_picture_width = models.PositiveIntegerField(null=True, editable=False)
+    post_picture_height = models.PositiveIntegerField(null=True, editable=False)
+    post_picture_blurhash = models.CharField(max_length=64, blank=True, editable=False)
     description = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
     id = models.UUIDField(
         default=uuid.uuid4, editable=False, unique=True, primary_key=True
     )
 
+    objects = PostsQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="posts_created_id_idx"),
+            models.Index(
+                fields=["profile", "-created_at", "-id"],
+                name="posts_profile_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.description
+
+
+# Post Score Model
+class PostScore(models.Model):
+    """
+    The time-decayed engagement score of a recent post.
+
+    Scores are stored relative to ``TrendingState.epoch``: an event at time
+    ``t`` adds ``weight * exp(rate * (t - epoch))``. Decay then scales every
+    score by the same factor, so the ranking never needs rewriting and a run
+    only touches the posts that got new events.
+
+    Attributes:
+        post (OneToOneField): The scored post.
+        score (float): The score relative to the trending epoch.
+        created_at (DateTimeField): Copy of the post creation time, used for pruning.
+        rank (int): The position in the trending top-K, None outside of it.
+    """
+
+    post = models.OneToOneField(
+        Posts, on_delete=models.CASCADE, primary_key=True, related_name="score"
+    )
+    score = models.FloatField(default=0)
+    created_at = models.DateTimeField()
+    rank = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-score"], name="postscore_score_idx"),
+            models.Index(fields=["rank"], name="postscore_rank_idx"),
+            models.Index(fields=["created_at"], name="postscore_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.post} scored {self.score}"
+
+
+# Trending State Model
+class TrendingState(models.Model):
+    """
+    Bookkeeping of the incremental trending job, a single row.
+
+    Attributes:
+        epoch (DateTimeField): The time scores are relative to.
+        events_through (DateTimeField): Events up to this time are folded in.
+        events (int): The number of events folded in by the last run.
+        computed_at (DateTimeField): When the job last ran.
+    """
+
+    epoch = models.DateTimeField()
+    events_through = models.DateTimeField()
+    events = models.PositiveBigIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Trending through {self.events_through}"
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from Profile.authentication import requestProfileId
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -13,4 +15,4 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the owner of the profile.
-        return obj.profile == request.user.Profile
+        return obj.profile_id == requestProfileId(request)
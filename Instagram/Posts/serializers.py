@@ -1,16 +1,121 @@
+from django.conf import settings
+from django.db import models as db_models
 from rest_framework import serializers
 
+from Comments.serializers import CommentsSerializer
+from Comments.utils import firstComments
+from Likes.models import Likes
+from Media.serializers import RenditionsField, StrippedImageField
+
 from . import models
 
 
 # Serializers goes here
 
 
+def likedPostIds(request, posts):
+    """
+    Returns the IDs of the given posts that the requesting user has liked.
+
+    Args:
+        request (Request): The HTTP request object.
+        posts (list of Posts): The posts to check.
+
+    Returns:
+        set: The IDs of the liked posts, resolved with a single ``IN`` query.
+    """
+    if request is None or not request.user.is_authenticated or not posts:
+        return set()
+    return set(
+        Likes.objects.filter(
+            profile=request.user.Profile, post__in=[post.pk for post in posts]
+        ).values_list("post_id", flat=True)
+    )
+
+
+# Posts List Serializer
+class PostsListSerializer(serializers.ListSerializer):
+    """
+    List serializer resolving per-viewer fields for a whole page at once.
+
+    The IDs of the posts liked by the viewer are looked up once for the page
+    and shared with every child through the serializer context.
+    """
+
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, db_models.manager.BaseManager) else data)
+        self.child.context["liked_post_ids"] = likedPostIds(
+            self.context.get("request"), posts
+        )
+        return super().to_representation(posts)
+
+
 # Posts Serializer
 class PostsSeriliazer(serializers.ModelSerializer):
+    viewer_has_liked = serializers.SerializerMethodField()
+    post_picture = StrippedImageField(required=False, allow_null=True)
+    post_picture_renditions = RenditionsField()
+
     class Meta:
         model = models.Posts
-        fields = ["url", "id", "post_picture", "description", "profile"]
+        list_serializer_class = PostsListSerializer
+        fields = [
+            "url",
+            "id",
+            "post_picture",
+            "post_picture_renditions",
+            "post_picture_width",
+            "post_picture_height",
+            "post_picture_blurhash",
+            "description",
+            "profile",
+            "like_count",
+            "comment_count",
+            "viewer_has_liked",
+        ]
         extra_kwargs = {
             "profile": {"read_only": True},
         }
+
+    def get_viewer_has_liked(self, instance):
+        liked_post_ids = self.context.get("liked_post_ids")
+        if liked_post_ids is None:
+            liked_post_ids = likedPostIds(self.context.get("request"), [instance])
+        return instance.pk in liked_post_ids
+
+
+# Posts With Comments List Serializer
+class PostsWithCommentsListSerializer(PostsListSerializer):
+    """
+    List serializer also loading the comment previews of the whole page at once.
+    """
+
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, db_models.manager.BaseManager) else data)
+        self.child.context["comment_previews"] = firstComments(
+            [post.pk for post in posts], settings.COMMENTS_PREVIEW_COUNT
+        )
+        return super().to_representation(posts)
+
+
+# Posts With Comments Serializer
+class PostsWithCommentsSerializer(PostsSeriliazer):
+    """
+    A post with the preview of its newest top-level comments inlined.
+    """
+
+    comment_previews = serializers.SerializerMethodField()
+
+    class Meta(PostsSeriliazer.Meta):
+        list_serializer_class = PostsWithCommentsListSerializer
+        fields = PostsSeriliazer.Meta.fields + ["comment_previews"]
+
+    def get_comment_previews(self, instance):
+        comment_previews = self.context.get("comment_previews")
+        if comment_previews is None:
+            comment_previews = firstComments(
+                [instance.pk], settings.COMMENTS_PREVIEW_COUNT
+            )
+        return CommentsSerializer(
+            comment_previews.get(instance.pk, []), many=True, context=self.context
+        ).data
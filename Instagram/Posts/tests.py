@@ -1,3 +1,585 @@
-from django.test import TestCase
+import asyncio
+import math
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APITestCase
+
+from Comments.models import Comments
+from Comments.utils import createComment
+from Instagram.middleware import (
+    QueryBudgetExceeded,
+    QueryCountMiddleware,
+    QueryRecorder,
+    StaticFilesMiddleware,
+    queryShape,
+)
+from Instagram.testing import QueryCountTestCase, makeProfile
+from Likes.models import Likes
+
+from . import models
+from . import trending, views
+from .permissions import IsOwnerOrReadOnly
+from .counters import CounterBuffer
 
 # Create your tests here.
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class PostsWriteQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        self.other_user, self.other_profile, self.other_client = makeProfile("other")
+        self.post = models.Posts.objects.create(profile=self.profile, description="hi")
+
+    def test_create(self):
+        response = self.assertQueries(
+            10, self.client, "post", "/api/posts/", {"description": "hi #tag"}, 201
+        )
+        self.assertEqual(response.data, "Post Created.")
+        self.assertTrue(
+            models.Posts.objects.filter(
+                profile=self.profile, description="hi #tag"
+            ).exists()
+        )
+
+    def test_update(self):
+        self.assertObjectPermission(
+            IsOwnerOrReadOnly(), self.user, "patch", self.post, True
+        )
+        response = self.assertQueries(
+            9,
+            self.client,
+            "patch",
+            f"/api/posts/{self.post.pk}/",
+            {"description": "edited"},
+            200,
+        )
+        self.assertEqual(response.data["description"], "edited")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.description, "edited")
+
+    def test_update_by_other_profile(self):
+        self.assertObjectPermission(
+            IsOwnerOrReadOnly(), self.other_user, "patch", self.post, False
+        )
+        self.assertObjectPermission(
+            IsOwnerOrReadOnly(), self.other_user, "get", self.post, True
+        )
+        response = self.assertQueries(
+            1,
+            self.other_client,
+            "patch",
+            f"/api/posts/{self.post.pk}/",
+            {"description": "edited"},
+            403,
+        )
+        self.assertEqual(response.data["detail"], PermissionDenied.default_detail)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.description, "hi")
+
+    def test_destroy(self):
+        self.assertQueries(
+            14, self.client, "delete", f"/api/posts/{self.post.pk}/", status_code=204
+        )
+        self.assertFalse(models.Posts.objects.filter(pk=self.post.pk).exists())
+
+    def test_destroy_by_other_profile(self):
+        response = self.assertQueries(
+            1,
+            self.other_client,
+            "delete",
+            f"/api/posts/{self.post.pk}/",
+            status_code=403,
+        )
+        self.assertEqual(response.data["detail"], PermissionDenied.default_detail)
+        self.assertTrue(models.Posts.objects.filter(pk=self.post.pk).exists())
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=0)
+class PostsReadQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        self.posts = [
+            models.Posts.objects.create(profile=self.profile, description=str(i))
+            for i in range(5)
+        ]
+        for post in self.posts:
+            createComment(self.profile, post, "comment")
+
+    def newestFirst(self):
+        return [str(post.pk) for post in reversed(self.posts)]
+
+    def test_list(self):
+        response = self.assertQueries(
+            3, self.client, "get", "/api/posts/", status_code=200
+        )
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]], self.newestFirst()
+        )
+
+    def test_list_by_profile(self):
+        _, other, _ = makeProfile("other")
+        models.Posts.objects.create(profile=other, description="other")
+        response = self.assertQueries(
+            4, self.client, "get", "/api/posts/?profile=owner", status_code=200
+        )
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]], self.newestFirst()
+        )
+
+    def test_retrieve(self):
+        post = self.posts[0]
+        response = self.assertQueries(
+            3, self.client, "get", f"/api/posts/{post.pk}/", status_code=200
+        )
+        self.assertEqual(response.data["id"], str(post.pk))
+        self.assertEqual(response.data["description"], "0")
+        self.assertFalse(response.data["viewer_has_liked"])
+
+    def test_comments(self):
+        response = self.assertQueries(
+            2,
+            self.client,
+            "get",
+            f"/api/posts/{self.posts[0].pk}/comments/",
+            status_code=200,
+        )
+        self.assertEqual(
+            [comment["comment"] for comment in response.data["results"]], ["comment"]
+        )
+
+
+class QueryCountMiddlewareTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        models.Posts.objects.create(profile=self.profile, description="hi")
+
+    def test_headers(self):
+        response = self.client.get("/api/posts/")
+        self.assertEqual(response["X-Query-Count"], "3")
+        self.assertEqual(response["X-Query-Repeated"], "0")
+        self.assertIn("X-Query-Time", response)
+
+    @override_settings(QUERY_COUNT_ENABLED=False)
+    def test_disabled(self):
+        self.assertNotIn("X-Query-Count", self.client.get("/api/posts/"))
+
+    def test_budget_exceeded(self):
+        with mock.patch.object(views.PostsViewets, "query_budget", {"list": 2}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/posts/")
+
+    @override_settings(QUERY_BUDGET_ENFORCE=False)
+    def test_budget_exceeded_is_logged(self):
+        with mock.patch.object(views.PostsViewets, "query_budget", 2):
+            with self.assertLogs("Instagram.middleware", "WARNING"):
+                response = self.client.get("/api/posts/")
+        self.assertEqual(response.status_code, 200)
+
+    async def test_async_requests_are_counted(self):
+        login = {"username": "owner", "password": "owner-password"}
+        sync_response = await sync_to_async(self.client.post)(
+            "/api/async/user/login/", login, format="json"
+        )
+        response = await self.async_client.post(
+            "/api/async/user/login/", login, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        self.assertEqual(response["X-Query-Count"], sync_response["X-Query-Count"])
+
+    def test_async_requests_overlap(self):
+        async def requests():
+            arrived = []
+            both = asyncio.Event()
+
+            # Only answers once both requests are in the view at the same time
+            async def view(request):
+                arrived.append(request)
+                if len(arrived) == 2:
+                    both.set()
+                await asyncio.wait_for(both.wait(), timeout=5)
+                return HttpResponse("view")
+
+            middleware = QueryCountMiddleware(view)
+            self.assertTrue(iscoroutinefunction(middleware))
+            factory = AsyncRequestFactory()
+            return await asyncio.gather(
+                middleware(factory.get("/")), middleware(factory.get("/"))
+            )
+
+        for response in async_to_sync(requests)():
+            self.assertEqual(response.content, b"view")
+            self.assertEqual(response["X-Query-Count"], "0")
+
+    def test_repeated_shapes(self):
+        recorder = QueryRecorder()
+        execute = lambda sql, params, many, context: None
+        for params in ([1], [2, 3], [4]):
+            sql = f"SELECT 1 WHERE id IN ({', '.join(['%s'] * len(params))})"
+            recorder(execute, sql, params, False, {})
+        recorder(execute, "SELECT 2", [], False, {})
+        self.assertEqual(queryShape("id IN (%s, %s)"), "id IN (...)")
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.repeated(3), [("SELECT 1 WHERE id IN (...)", 3)])
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        (static_root / "app.css").write_bytes(b"body{}")
+        (static_root / "app.css.gz").write_bytes(b"gzipped")
+        settings_override = override_settings(STATIC_ROOT=static_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def view(self, request):
+        return HttpResponse("view")
+
+    async def asyncView(self, request):
+        return HttpResponse("view")
+
+    def test_serves_the_best_accepted_variant(self):
+        middleware = StaticFilesMiddleware(self.view)
+        factory = RequestFactory()
+        response = middleware(factory.get("/static/app.css"))
+        self.assertEqual(b"".join(response.streaming_content), b"body{}")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+        response = middleware(
+            factory.get("/static/app.css", HTTP_ACCEPT_ENCODING="br, gzip")
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(b"".join(response.streaming_content), b"gzipped")
+
+        etag = response["ETag"]
+        response = middleware(
+            factory.get(
+                "/static/app.css", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+            )
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_requests_reach_the_view(self):
+        middleware = StaticFilesMiddleware(self.view)
+        factory = RequestFactory()
+        for request in (
+            factory.get("/static/missing.css"),
+            factory.get("/static/../settings.py"),
+            factory.post("/static/app.css"),
+            factory.get("/api/posts/"),
+        ):
+            self.assertEqual(middleware(request).content, b"view")
+
+    def test_async_stack_stays_async(self):
+        middleware = StaticFilesMiddleware(self.asyncView)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = AsyncRequestFactory()
+        call = async_to_sync(middleware)
+
+        response = call(
+            factory.get("/static/app.css", headers={"Accept-Encoding": "gzip"})
+        )
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, b"gzipped")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(call(factory.get("/api/posts/")).content, b"view")
+
+
+class StaticFilesStorageTests(APITestCase):
+    def setUp(self):
+        static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        (static_root / "app.css").write_bytes(b"body{}")
+        settings_override = override_settings(STATIC_ROOT=static_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_uncollected_files_keep_their_name(self):
+        self.assertEqual(staticfiles_storage.url("app.css"), "/static/app.css")
+        response = self.client.get("/", HTTP_ACCEPT="text/html")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "/static/rest_framework/css/bootstrap.min.css")
+
+    def test_collected_files_are_hashed(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        url = staticfiles_storage.url("rest_framework/css/bootstrap.min.css")
+        self.assertRegex(url, r"^/static/rest_framework/css/bootstrap\.min\.[0-9a-f]{12}\.css$")
+
+
+@override_settings(POSTS_COUNTER_FLUSH_INTERVAL=60)
+class CounterBufferTests(TestCase):
+    def setUp(self):
+        _, profile, _ = makeProfile("owner")
+        self.first = models.Posts.objects.create(profile=profile, description="a")
+        self.second = models.Posts.objects.create(profile=profile, description="b")
+        self.buffer = CounterBuffer()
+
+    def likeCounts(self):
+        return [
+            models.Posts.objects.get(pk=post.pk).like_count
+            for post in (self.first, self.second)
+        ]
+
+    def test_failed_flush_keeps_only_unwritten_deltas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buffer.add(self.first.pk, "like_count", 1)
+            self.buffer.add(self.second.pk, "like_count", 2)
+
+        update = QuerySet.update
+        calls = []
+
+        def failSecondUpdate(queryset, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise RuntimeError("database went away")
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", failSecondUpdate):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        self.assertEqual(sum(self.likeCounts()), 1)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.likeCounts(), [1, 2])
+
+    def test_rolled_back_deltas_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.buffer.add(self.first.pk, "like_count", 1)
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self.buffer.add(self.second.pk, "like_count", 1)
+                    raise RuntimeError("rolled back")
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.likeCounts(), [1, 0])
+
+    def test_deltas_are_summed_and_floored_at_zero(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for delta in (1, 1, 1, -1):
+                self.buffer.add(self.first.pk, "like_count", delta)
+            self.buffer.add(self.second.pk, "like_count", -5)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.likeCounts(), [2, 0])
+
+
+class TrendingTestCase:
+    def setUp(self):
+        _, self.profile, self.client = makeProfile("owner")
+        self.fans = [makeProfile(f"fan{index}")[1] for index in range(2)]
+        self.liked = models.Posts.objects.create(profile=self.profile, description="a")
+        self.commented = models.Posts.objects.create(
+            profile=self.profile, description="b"
+        )
+        models.Posts.objects.create(profile=self.profile, description="quiet")
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        for fan in self.fans:
+            Likes.objects.create(profile=fan, post=self.liked)
+        Comments.objects.create(profile=self.fans[0], post=self.commented, comment="!")
+        Likes.objects.update(liked_at=an_hour_ago)
+        Comments.objects.update(created_at=an_hour_ago)
+
+    def scores(self):
+        return dict(models.PostScore.objects.values_list("post_id", "score"))
+
+
+class TrendingTests(TrendingTestCase, TestCase):
+    def test_posts_are_ranked_by_decayed_engagement(self):
+        state = trending.computeTrending()
+        self.assertEqual(state.events, 3)
+        response = self.client.get("/api/posts/trending/")
+        self.assertEqual(
+            [post["id"] for post in response.data],
+            [str(self.commented.pk), str(self.liked.pk)],
+        )
+
+        # Nothing new happened, nothing changes
+        scores = self.scores()
+        self.assertEqual(trending.computeTrending().events, 0)
+        self.assertEqual(self.scores(), scores)
+
+    def test_rebase_rescales_stored_scores(self):
+        state = trending.computeTrending()
+        score = self.scores()[self.liked.pk]
+        rate = trending.decayRate()
+        # The same scores, relative to an epoch a day older
+        shift = timedelta(hours=25)
+        models.TrendingState.objects.update(epoch=state.epoch - shift)
+        models.PostScore.objects.filter(pk=self.liked.pk).update(
+            score=score * math.exp(rate * shift.total_seconds())
+        )
+
+        rebased = trending.computeTrending()
+        self.assertGreater(rebased.epoch, state.epoch)
+        elapsed = (rebased.epoch - state.epoch).total_seconds()
+        self.assertAlmostEqual(
+            self.scores()[self.liked.pk], score * math.exp(-rate * elapsed)
+        )
+
+    def test_concurrent_run_stores_nothing(self):
+        read_events = trending.readEvents
+
+        # Another run stores its scores while this one is scoring
+        def otherRunFirst(*args):
+            with mock.patch.object(trending, "readEvents", read_events):
+                trending.computeTrending()
+            return read_events(*args)
+
+        with mock.patch.object(trending, "readEvents", otherRunFirst):
+            with self.assertRaises(trending.TrendingConflict):
+                trending.computeTrending()
+        self.assertEqual(models.TrendingState.objects.get().events, 3)
+        self.assertAlmostEqual(
+            self.scores()[self.liked.pk] / self.scores()[self.commented.pk], 2 / 3
+        )
+
+
+class TrendingTransactionTests(TrendingTestCase, TransactionTestCase):
+    def test_events_are_scored_outside_of_the_transaction(self):
+        in_transaction = {}
+
+        def recorded(name, function):
+            def record(*args):
+                in_transaction[name] = connection.in_atomic_block
+                return function(*args)
+
+            return record
+
+        with (
+            mock.patch.object(
+                trending, "eventScores", recorded("score", trending.eventScores)
+            ),
+            mock.patch.object(
+                trending, "storeScores", recorded("store", trending.storeScores)
+            ),
+        ):
+            trending.computeTrending()
+        self.assertEqual(in_transaction, {"score": False, "store": True})
+
+
+class ProfilePostsTests(APITestCase):
+    def setUp(self):
+        _, self.profile, self.client = makeProfile("owner")
+        _, other, _ = makeProfile("other")
+        self.posts = [
+            models.Posts.objects.create(profile=self.profile, description=str(index))
+            for index in range(5)
+        ]
+        models.Posts.objects.create(profile=other, description="other")
+
+    def pages(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([post["id"] for post in response.data["results"]])
+            url = response.data["next"]
+        return pages
+
+    def test_pages_are_newest_first(self):
+        newest_first = [str(post.pk) for post in reversed(self.posts)]
+        expected = [newest_first[:2], newest_first[2:4], newest_first[4:]]
+        for url in (
+            "/api/profile/profile/owner/posts/?page_size=2",
+            "/api/posts/?profile=owner&page_size=2",
+            f"/api/posts/?profile={self.profile.pk}&page_size=2",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.pages(url), expected)
+
+    def test_unknown_profile(self):
+        self.assertEqual(self.pages("/api/posts/?profile=nobody"), [[]])
+        response = self.client.get("/api/profile/profile/nobody/posts/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_pages_scan_the_profile_index(self):
+        plan = (
+            models.Posts.objects.filter(profile=self.profile)
+            .order_by("-created_at", "-id")
+            .explain()
+        )
+        self.assertIn("posts_profile_created_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        _, self.other, self.other_client = makeProfile("other")
+        self.post = models.Posts.objects.create(profile=self.profile, description="hi")
+        self.url = f"/api/posts/{self.post.pk}/"
+
+    def get(self, url, etag=None, client=None):
+        headers = {} if etag is None else {"HTTP_IF_NONE_MATCH": etag}
+        return (client or self.client).get(url, **headers)
+
+    def test_unchanged_post_is_not_sent_again(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("Authorization", response["Vary"])
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.get(self.url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_changes_send_the_post_again(self):
+        etag = self.get(self.url)["ETag"]
+        self.client.patch(self.url, {"description": "edited"})
+        response = self.get(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["description"], "edited")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_validators_depend_on_the_viewer(self):
+        etag = self.get(self.url)["ETag"]
+        self.assertEqual(self.get(self.url, etag, self.other_client).status_code, 200)
+
+        # Liking changes viewer_has_liked, so the viewer's ETag
+        self.client.post("/api/likes/", {"post": str(self.post.pk)})
+        response = self.get(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["viewer_has_liked"])
+
+    def test_lists_and_other_endpoints(self):
+        for url in (
+            "/api/posts/",
+            "/api/profile/profile/owner/",
+            "/api/profile/profile/",
+            f"/api/comments/?post={self.post.pk}",
+        ):
+            with self.subTest(url=url):
+                etag = self.get(url)["ETag"]
+                self.assertEqual(self.get(url, etag).status_code, 304)
+                self.assertEqual(self.get(url, "W/\"stale\"").status_code, 200)
+                self.assertEqual(self.get(url, "*").status_code, 304)
@@ -0,0 +1,250 @@
+import math
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from Comments.models import Comments
+from Likes.models import Likes
+
+from . import models
+
+# Trending posts
+
+
+def decayRate():
+    # Per second, from the half-life
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 60 * 60)
+
+
+def eventScores(rows, weight, epoch, rate):
+    """
+    Scores a chunk of engagement events relative to the epoch.
+
+    Args:
+        rows (list of tuple): ``(post_id, timestamp)`` pairs.
+        weight (float): The weight of one event.
+        epoch (float): The trending epoch, in seconds.
+        rate (float): The decay rate per second.
+
+    Returns:
+        tuple: An object array of post IDs and a float array of scores.
+    """
+    post_ids = np.empty(len(rows), dtype=object)
+    post_ids[:] = [post_id for post_id, _ in rows]
+    times = np.fromiter(
+        (timestamp.timestamp() for _, timestamp in rows),
+        dtype=np.float64,
+        count=len(rows),
+    )
+    return post_ids, weight * np.exp(rate * (times - epoch))
+
+
+def sumByPost(post_ids, scores):
+    """
+    Adds up the scores of the events of each post.
+
+    Args:
+        post_ids (ndarray): Post IDs, one per event.
+        scores (ndarray): Scores, one per event.
+
+    Returns:
+        tuple: The distinct post IDs and their total scores.
+    """
+    if not len(post_ids):
+        return post_ids, scores
+    unique, inverse = np.unique(post_ids, return_inverse=True)
+    return unique, np.bincount(inverse, weights=scores, minlength=len(unique))
+
+
+def readEvents(since, until, window_start, epoch, rate):
+    """
+    Scores the likes and comments made in ``(since, until]`` on recent posts.
+
+    Events are read in ``TRENDING_CHUNK_SIZE`` rows and scored one chunk at a time.
+
+    Returns:
+        tuple: The distinct post IDs, their added scores and the number of events.
+    """
+    sources = [
+        (Likes.objects, "liked_at", settings.TRENDING_LIKE_WEIGHT),
+        (Comments.objects, "created_at", settings.TRENDING_COMMENT_WEIGHT),
+    ]
+    post_ids, scores, events = [], [], 0
+    for manager, field, weight in sources:
+        rows = (
+            manager.filter(
+                **{
+                    f"{field}__gt": since,
+                    f"{field}__lte": until,
+                    "post__created_at__gte": window_start,
+                }
+            )
+            .order_by()
+            .values_list("post_id", field)
+            .iterator(chunk_size=settings.TRENDING_CHUNK_SIZE)
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= settings.TRENDING_CHUNK_SIZE:
+                ids, values = sumByPost(*eventScores(chunk, weight, epoch, rate))
+                post_ids.append(ids)
+                scores.append(values)
+                events += len(chunk)
+                chunk = []
+        if chunk:
+            ids, values = sumByPost(*eventScores(chunk, weight, epoch, rate))
+            post_ids.append(ids)
+            scores.append(values)
+            events += len(chunk)
+
+    if not post_ids:
+        return np.empty(0, dtype=object), np.empty(0), 0
+    return (*sumByPost(np.concatenate(post_ids), np.concatenate(scores)), events)
+
+
+def rebasedEpoch(state, now):
+    """
+    Picks the epoch of a run: ``now`` once the stored one is
+    ``TRENDING_REBASE_HOURS`` old, or the stored one.
+
+    Relative scores grow by ``exp(rate * age)``; moving the epoch keeps them
+    well inside float range.
+    """
+    age = (now - state.epoch).total_seconds()
+    if age < settings.TRENDING_REBASE_HOURS * 60 * 60:
+        return state.epoch
+    return now
+
+
+def rebase(state, epoch, rate):
+    """
+    Rescales the stored scores to ``epoch`` in one update.
+    """
+    if epoch == state.epoch:
+        return
+    factor = math.exp(-rate * (epoch - state.epoch).total_seconds())
+    models.PostScore.objects.update(score=F("score") * factor)
+    state.epoch = epoch
+
+
+def storeScores(post_ids, added):
+    """
+    Adds new event scores to the stored scores of their posts.
+    """
+    for start in range(0, len(post_ids), 1000):
+        ids = list(post_ids[start : start + 1000])
+        values = added[start : start + 1000]
+        stored = models.PostScore.objects.in_bulk(ids)
+        missing = [post_id for post_id in ids if post_id not in stored]
+        created_at = dict(
+            models.Posts.objects.filter(pk__in=missing).values_list("pk", "created_at")
+        )
+
+        updated, created = [], []
+        for post_id, value in zip(ids, values):
+            if post_id in stored:
+                stored[post_id].score += float(value)
+                updated.append(stored[post_id])
+            elif post_id in created_at:
+                created.append(
+                    models.PostScore(
+                        post_id=post_id,
+                        score=float(value),
+                        created_at=created_at[post_id],
+                    )
+                )
+        models.PostScore.objects.bulk_update(updated, ["score"])
+        models.PostScore.objects.bulk_create(created)
+
+
+def rankTopPosts():
+    """
+    Stores the rank of the ``TRENDING_TOP_K`` best scored posts.
+
+    Returns:
+        int: The number of ranked posts.
+    """
+    scored = models.PostScore.objects.filter(
+        post__profile__deactivated_at__isnull=True
+    ).order_by("-score")
+    top = list(scored.values_list("post_id", flat=True)[: settings.TRENDING_TOP_K])
+
+    models.PostScore.objects.filter(rank__isnull=False).update(rank=None)
+    models.PostScore.objects.bulk_update(
+        [
+            models.PostScore(post_id=post_id, rank=rank)
+            for rank, post_id in enumerate(top, start=1)
+        ],
+        ["rank"],
+    )
+    return len(top)
+
+
+class TrendingConflict(Exception):
+    """
+    Raised when another run stored its scores while this one was scoring.
+    """
+
+
+def computeTrending():
+    """
+    Folds the likes and comments made since the last run into the trending scores.
+
+    Events older than ``TRENDING_EVENT_LAG`` seconds are read from the
+    ``liked_at`` and ``created_at`` indexes, scored with NumPy and added to the
+    scores of their posts; posts older than ``TRENDING_WINDOW_HOURS`` drop out
+    and the top-K is ranked again. Unlikes and deleted comments are not
+    subtracted, an engagement counts once it happened.
+
+    Events are read and scored outside of any transaction; only storing the
+    scores is atomic, so the database is not locked for writes while scoring.
+
+    Only one run may execute at a time.
+
+    Returns:
+        TrendingState: The bookkeeping of the run.
+
+    Raises:
+        TrendingConflict: If another run stored its scores in the meantime,
+            in which case nothing is stored.
+    """
+    rate = decayRate()
+    now = timezone.now() - timedelta(seconds=settings.TRENDING_EVENT_LAG)
+    window_start = now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+
+    state = models.TrendingState.objects.first()
+    if state is None:
+        state = models.TrendingState(epoch=now, events_through=window_start)
+    read = (state.pk, state.epoch, state.events_through)
+    since = max(state.events_through, window_start)
+    epoch = rebasedEpoch(state, now)
+    post_ids, added, events = readEvents(
+        since, now, window_start, epoch.timestamp(), rate
+    )
+
+    with transaction.atomic():
+        current = models.TrendingState.objects.select_for_update().first()
+        if current is not None and (
+            current.pk,
+            current.epoch,
+            current.events_through,
+        ) != read:
+            raise TrendingConflict(
+                f"Trending scores were stored through {current.events_through} "
+                "by another run."
+            )
+
+        rebase(state, epoch, rate)
+        storeScores(post_ids, added)
+        models.PostScore.objects.filter(created_at__lt=window_start).delete()
+        rankTopPosts()
+
+        state.events_through = now
+        state.events = events
+        state.save()
+    return state
@@ -2,6 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from django.db import transaction
+from django.db.models import Count, Max
+
+from Comments.models import Comments
+from Comments.serializers import CommentsSerializer
+from Feed.utils import fanOutPost, forgetRecentPosts
+from Hashtags.utils import indexPost, unindexPost
+from Instagram.mixins import ConditionalGetMixin
+from Likes.models import Likes
+from Media.pipeline import scheduleRenditions
+from Profile.utils import profileIdFor
 
 from . import models
 from . import serializers
@@ -12,14 +23,89 @@ from .permissions import IsOwnerOrReadOnly
 
 
 # Posts Viewsets
-class PostsViewets(viewsets.ModelViewSet):
+class PostsViewets(ConditionalGetMixin, viewsets.ModelViewSet):
 
     permission_classes = [IsOwnerOrReadOnly, IsAuthenticated]
-    queryset = models.Posts.objects.all()
+    queryset = models.Posts.objects.visible()
     serializer_class = serializers.PostsSeriliazer
+    etag_fields = (
+        "updated_at",
+        "like_count",
+        "comment_count",
+        "post_picture_renditions",
+    )
+    query_budget = {
+        "list": 5,
+        "retrieve": 4,
+        "comments": 3,
+        "trending": 2,
+        "create": 11,
+        "update": 16,
+        "partial_update": 16,
+        "destroy": 16,
+    }
+
+    def get_viewer_state(self, request):
+        # Changes whenever the viewer likes or unlikes anything
+        return tuple(
+            Likes.objects.filter(profile=request.user.Profile)
+            .aggregate(count=Count("pk"), latest=Max("liked_at"))
+            .values()
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?profile=<username or id> lists one profile's posts off its index
+        profile = self.request.query_params.get("profile")
+        if profile and self.action == "list":
+            profile_id = profileIdFor(profile)
+            if profile_id is None:
+                return queryset.none()
+            queryset = queryset.filter(profile_id=profile_id)
+        return queryset
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(profile=request.user.Profile)
+        with transaction.atomic():
+            post = serializer.save(profile=request.user.Profile)
+            indexPost(post)
+        transaction.on_commit(lambda: fanOutPost(post))
+        scheduleRenditions(post, "post_picture")
         return Response("Post Created.", status=status.HTTP_201_CREATED)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            post = serializer.save()
+            if "description" in serializer.validated_data:
+                indexPost(post)
+        if "post_picture" in serializer.validated_data:
+            scheduleRenditions(post, "post_picture")
+
+    @action(detail=True, methods=["get"])
+    def comments(self, request, pk=None):
+        # A range scan on comments_post_created_idx, newest first
+        post = self.get_object()
+        comments = Comments.objects.filter(post_id=post.pk)
+        page = self.paginate_queryset(comments)
+        serializer = CommentsSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def trending(self, request):
+        # Ranked ahead of time by compute_trending, see Posts.trending
+        posts = (
+            models.Posts.objects.visible()
+            .filter(score__rank__isnull=False)
+            .order_by("score__rank")
+        )
+        serializer = self.get_serializer(posts, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            unindexPost(instance)
+            instance.delete()
+        forgetRecentPosts(instance.profile_id)
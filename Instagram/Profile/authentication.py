@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from . import models
+
+
+def tokenCacheKey(key):
+    return f"auth:token:{key}"
+
+
+def tokenCache():
+    return caches[settings.TOKEN_AUTH_CACHE]
+
+
+def revokeUserTokens(user):
+    """
+    Deletes the tokens of a user and their cached authentication entries.
+
+    The cache entries are dropped once the deletion commits: a request
+    authenticating before that still finds the token and caches it again.
+
+    Args:
+        user (User): The user whose tokens are revoked.
+    """
+    keys = [
+        tokenCacheKey(key)
+        for key in Token.objects.filter(user=user).values_list("key", flat=True)
+    ]
+    Token.objects.filter(user=user).delete()
+    transaction.on_commit(lambda: tokenCache().delete_many(keys))
+
+
+def requestProfileId(request):
+    """
+    Resolves the profile ID of the requesting user, once per request.
+
+    Token authentication loads the profile along with the user, so this
+    usually costs no query; otherwise only the ID is selected.
+
+    Args:
+        request (Request): The HTTP request object.
+
+    Returns:
+        UUID: The profile ID, or None if the user has no profile.
+    """
+    if not hasattr(request, "profile_id"):
+        user = request.user
+        if models.User.Profile.is_cached(user):
+            request.profile_id = user.Profile.pk
+        else:
+            request.profile_id = (
+                models.Profile.objects.filter(user_id=user.pk)
+                .values_list("pk", flat=True)
+                .first()
+            )
+    return request.profile_id
+
+
+# Cached Token Authentication
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the token, user and profile lookup.
+
+    A cache miss resolves the token, its user and the user's Profile in one
+    query; a hit resolves them without touching the database. Entries live for
+    ``TOKEN_AUTH_CACHE_TIMEOUT`` seconds in the ``TOKEN_AUTH_CACHE`` cache and
+    are invalidated explicitly on logout and account deletion, so that cache
+    must be shared by every worker.
+
+    Methods:
+        authenticate_credentials(self, key):
+            Resolves a token key to ``(user, token)``.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Resolves a token key to ``(user, token)``.
+
+        Args:
+            key (str): The token key sent by the client.
+
+        Returns:
+            tuple: The authenticated user and the token.
+        """
+        cache = tokenCache()
+        cached = cache.get(tokenCacheKey(key))
+        if cached is not None:
+            return cached
+
+        try:
+            token = Token.objects.select_related("user__Profile").get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        cache.set(
+            tokenCacheKey(key),
+            (token.user, token),
+            settings.TOKEN_AUTH_CACHE_TIMEOUT,
+        )
+        return (token.user, token)
@@ -0,0 +1,76 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+# Password hashing pool
+
+
+class PoolSaturated(Exception):
+    """
+    Raised when the password hashing queue is full and a request is turned away.
+    """
+
+
+class PasswordHashingPool:
+    """
+    A size-limited executor for password hashing with admission control.
+
+    PBKDF2 runs in ``hashlib``, which releases the GIL, so a small thread pool
+    hashes in parallel without blocking the event loop. At most
+    ``PASSWORD_HASHING_MAX_PENDING`` hashes may be running or queued; further
+    requests fail fast with ``PoolSaturated`` so a login storm only degrades
+    the login and registration endpoints.
+
+    Methods:
+        run(self, func, *args, **kwargs):
+            Runs a hashing function on the pool.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.executor = None
+
+    def getExecutor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    thread_name_prefix="password-hashing",
+                )
+            return self.executor
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a hashing function on the pool.
+
+        Args:
+            func (callable): The function to run, e.g. ``make_password``.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The return value of the function.
+
+        Raises:
+            PoolSaturated: If the queue already holds the maximum number of hashes.
+        """
+        with self.lock:
+            if self.pending >= settings.PASSWORD_HASHING_MAX_PENDING:
+                raise PoolSaturated()
+            self.pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.getExecutor(), functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+
+hashing_pool = PasswordHashingPool()
@@ -0,0 +1,188 @@
+import json
+import secrets
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from Comments.models import Comments
+from Instagram import benchmark
+from Likes.models import Likes
+from Posts.models import Posts
+from Profile import models
+
+
+def gitCommit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Benchmark
+class Command(BaseCommand):
+    """
+    Benchmarks the main endpoints against the current, seeded database.
+
+    Every scenario sends ``--requests`` requests from ``--concurrency``
+    threads, each thread acting as its own benchmark user. Requests go
+    through the Django test client by default, or over HTTP to a server at
+    ``--url`` or to gunicorn started with ``gunicorn_config.py``.
+
+    The result holds latency percentiles, throughput and queries per request
+    for each scenario and is written as JSON to ``--output``. With
+    ``--baseline`` it is compared against an earlier result, and
+    ``--fail-on-regression`` makes the command fail when a scenario got
+    slower than ``--threshold`` or runs more queries.
+
+    Benchmark users and everything they created are deleted afterwards.
+    Seed the database first, e.g. with ``seed_synthetic``.
+    """
+
+    help = "Benchmark the API endpoints against a seeded database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per scenario."
+        )
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(benchmark.SCENARIOS),
+            help="Comma separated scenarios to run, in order.",
+        )
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument(
+            "--gunicorn",
+            action="store_true",
+            help="Start gunicorn with gunicorn_config.py and benchmark it over HTTP.",
+        )
+        target.add_argument("--url", help="Benchmark an already running server.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--output", help="Write the result as JSON to this file.")
+        parser.add_argument("--baseline", help="An earlier result to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="Tolerated relative p95 growth against the baseline.",
+        )
+        parser.add_argument("--fail-on-regression", action="store_true")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options["scenarios"].split(",") if name]
+        unknown = set(scenarios) - set(benchmark.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as stream:
+                baseline = json.load(stream)
+
+        prefix = f"bench_{secrets.token_hex(4)}"
+        targets = benchmark.Targets(prefix)
+        if not targets.profile_ids or not targets.post_ids:
+            raise CommandError(
+                "The database has no profiles or posts, run seed_synthetic first."
+            )
+
+        result = {
+            "meta": {
+                "commit": gitCommit(),
+                "started_at": timezone.now().isoformat(),
+                "target": "in-process",
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+                "database": connection.vendor,
+                "rows": {
+                    "profiles": models.Profile.objects.count(),
+                    "relations": models.Relation.objects.count(),
+                    "posts": Posts.objects.count(),
+                    "likes": Likes.objects.count(),
+                    "comments": Comments.objects.count(),
+                },
+            },
+            "scenarios": {},
+        }
+
+        try:
+            if options["gunicorn"]:
+                with benchmark.gunicornServer(options["port"]) as url:
+                    result["meta"]["target"] = "gunicorn"
+                    self.run(result, scenarios, targets, prefix, options, url)
+            elif options["url"]:
+                result["meta"]["target"] = options["url"]
+                self.run(result, scenarios, targets, prefix, options, options["url"])
+            else:
+                with benchmark.inProcess():
+                    self.run(result, scenarios, targets, prefix, options)
+        finally:
+            benchmark.removeWorkers(prefix)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(result, stream, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if baseline is not None:
+            self.compare(baseline, result, options)
+
+    def run(self, result, scenarios, targets, prefix, options, url=None):
+        """
+        Runs the scenarios in order and records their summaries.
+        """
+        if url is None:
+            make_client = benchmark.InProcessClient
+        else:
+            make_client = lambda token=None: benchmark.HttpClient(url, token)
+        workers = benchmark.createWorkers(
+            prefix, options["concurrency"], make_client, options["seed"]
+        )
+
+        self.stdout.write(
+            f"{'scenario':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'queries':>9}{'errors':>8}"
+        )
+        for name in scenarios:
+            summary = benchmark.runScenario(name, workers, targets, options["requests"])
+            result["scenarios"][name] = summary
+            queries = summary["queries_per_request"]
+            self.stdout.write(
+                f"{name:<16}{summary['throughput_rps']:>10.1f}"
+                f"{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}"
+                f"{summary['p99_ms']:>10.2f}"
+                f"{'-' if queries is None else f'{queries:.1f}':>9}"
+                f"{summary['errors']:>8}"
+            )
+
+    def compare(self, baseline, result, options):
+        comparisons = benchmark.compareResults(baseline, result, options["threshold"])
+        self.stdout.write(
+            f"\nAgainst {options['baseline']} "
+            f"(commit {baseline.get('meta', {}).get('commit')}):"
+        )
+        for comparison in comparisons:
+            line = (
+                f"{comparison['scenario']:<16}"
+                f"p95 {comparison['p95_before']:.2f} -> {comparison['p95_after']:.2f} ms "
+                f"({comparison['p95_change']:+.0%}), "
+                f"queries {comparison['queries_before']} -> {comparison['queries_after']}"
+            )
+            style = self.style.ERROR if comparison["regressed"] else self.style.SUCCESS
+            self.stdout.write(style(line))
+
+        regressed = [c["scenario"] for c in comparisons if c["regressed"]]
+        if regressed and options["fail_on_regression"]:
+            raise CommandError(f"Regressed: {', '.join(regressed)}.")
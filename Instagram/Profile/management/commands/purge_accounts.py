@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from Profile import models
+from Profile.purge import purgeAccount
+
+
+# Purge Accounts
+class Command(BaseCommand):
+    """
+    Runs every unfinished account deletion in the foreground.
+
+    Deletions are normally purged by the in-process background worker; this
+    command resumes the ones interrupted by a restart or a failure.
+    """
+
+    help = "Resume pending, running or failed account deletions."
+
+    def handle(self, *args, **options):
+        deletions = models.AccountDeletion.objects.exclude(
+            status=models.AccountDeletion.DONE
+        ).order_by("created_at")
+
+        for deletion in deletions:
+            self.stdout.write(f"Purging {deletion.username}...")
+            purgeAccount(deletion.pk)
+            deletion.refresh_from_db()
+            self.stdout.write(
+                f"  {deletion.status}, {deletion.rows_deleted} row(s) deleted."
+            )
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from Profile import models
+
+
+def relationCount(field):
+    """
+    Builds a correlated COUNT over Relation for the profile in the outer query.
+
+    Args:
+        field (str): The Relation foreign key pointing at the outer profile.
+
+    Returns:
+        Coalesce: The relation count, 0 when the profile has no relations.
+    """
+    return Coalesce(
+        Subquery(
+            models.Relation.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+# Reconcile Follow Counts
+class Command(BaseCommand):
+    """
+    Recomputes Profile.followers_count / following_count from the Relation table.
+
+    Only drifted profiles are rewritten, in batches of ``--batch-size`` rows.
+    """
+
+    help = "Recompute drifted follower/following counters on Profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted profiles without writing.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        drifted = (
+            models.Profile.objects.annotate(
+                actual_followers=relationCount("following"),
+                actual_following=relationCount("follower"),
+            )
+            .filter(
+                ~Q(followers_count=F("actual_followers"))
+                | ~Q(following_count=F("actual_following"))
+            )
+            .only("pk", "followers_count", "following_count")
+        )
+
+        fixed = 0
+        batch = []
+        for profile in drifted.iterator(chunk_size=batch_size):
+            profile.followers_count = profile.actual_followers
+            profile.following_count = profile.actual_following
+            batch.append(profile)
+            if len(batch) >= batch_size:
+                fixed += self.flush(batch, options["dry_run"])
+                batch = []
+        fixed += self.flush(batch, options["dry_run"])
+
+        verb = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {fixed} drifted profile(s)."))
+
+    def flush(self, batch, dry_run):
+        if batch and not dry_run:
+            with transaction.atomic():
+                models.Profile.objects.bulk_update(
+                    batch, ["followers_count", "following_count"]
+                )
+        return len(batch)
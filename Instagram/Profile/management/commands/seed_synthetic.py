@@ -0,0 +1,484 @@
+import random
+import time
+import uuid
+from argparse import BooleanOptionalAction
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from Comments.models import Comments
+from Comments.utils import pathSegment
+from Feed.models import Timeline
+from Feed.utils import isHighFollowerProfile
+from Hashtags.models import Hashtag, PostHashtag
+from Likes.models import Likes
+from Posts.models import Posts
+from Profile import models
+from Profile.utils import setCreatedUserIds
+
+# Share of activity per hour of the day (UTC), low at night, peaking in the evening
+HOURLY_ACTIVITY = [
+    2, 1, 1, 1, 1, 2, 3, 5, 6, 6, 6, 6, 7, 6, 6, 6, 6, 7, 8, 9, 9, 8, 6, 4,
+]
+
+WORDS = (
+    "sunset beach coffee city friends weekend morning dinner travel summer "
+    "family walk music night park food books garden rain mountains cat dog "
+    "art street light home run lake snow party ocean road trip bike market"
+).split()
+
+# Mean delays between joining and following, and between a post and its likes
+# and comments
+FOLLOW_DELAY = timedelta(days=1)
+LIKE_DELAY = timedelta(hours=6)
+COMMENT_DELAY = timedelta(hours=12)
+
+# Shares of likes and comments coming from the author's followers, and of
+# comments replying to an earlier comment
+FOLLOWER_SHARE = 0.8
+REPLY_SHARE = 0.25
+
+
+# Seed Synthetic
+class Command(BaseCommand):
+    """
+    Fills the database with a synthetic, realistically shaped dataset.
+
+    Users join over the ``--days`` before ``--end`` and follow earlier users by
+    preferential attachment, so follower counts follow a power law. Post
+    counts per user are Pareto distributed, likes and comments scale with the
+    author's followers and mostly come from them, a share of the comments are
+    replies, and every event follows a daily activity curve. Hashtags are
+    drawn from a Zipf distribution over ``--tags`` tags.
+
+    The same ``--seed`` and ``--end`` always produce the same rows, IDs
+    included. Rows are generated in memory and inserted in bulk, one
+    transaction per ``--batch-size`` rows, with every denormalized counter
+    already filled in. All users share one password hash, computed once.
+    Timelines are materialized like fan-out on write would, for every post of
+    authors under the fan-out threshold.
+    """
+
+    help = "Generate synthetic users, follows, posts, likes and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument(
+            "--follows",
+            type=int,
+            default=10,
+            help="Profiles each new user follows.",
+        )
+        parser.add_argument("--posts", type=float, default=5, help="Mean posts per user.")
+        parser.add_argument("--likes", type=float, default=8, help="Mean likes per post.")
+        parser.add_argument(
+            "--comments", type=float, default=2, help="Mean comments per post."
+        )
+        parser.add_argument("--tags", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument(
+            "--end",
+            type=datetime.fromisoformat,
+            help="Time of the last events, ISO 8601, today at midnight UTC by default.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--password", default="synthetic-password")
+        parser.add_argument("--batch-size", type=int, default=20000)
+        parser.add_argument(
+            "--timelines",
+            action=BooleanOptionalAction,
+            default=True,
+            help="Materialize the feed timelines.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+        self.options = options
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        prefix = options["prefix"]
+        if models.User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(
+                f"Users named {prefix}_* already exist, pick another --prefix."
+            )
+
+        end = options["end"]
+        if end is None:
+            end = datetime.now(dt_timezone.utc).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+        elif end.tzinfo is None:
+            end = end.replace(tzinfo=dt_timezone.utc)
+        self.end = end
+        self.start = end - timedelta(days=options["days"])
+        self.hour_weights = list(accumulate(HOURLY_ACTIVITY))
+
+        # The connection itself, not the thread-local proxy looked up per value
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        if self.connection.vendor == "sqlite":
+            # Random UUID keys touch pages all over every index, keep them cached
+            with self.connection.cursor() as cursor:
+                cursor.execute("PRAGMA cache_size = -262144")
+
+        self.pending = {}
+        self.pending_rows = 0
+        self.written = 0
+        self.started = time.monotonic()
+
+        self.createUsers(prefix)
+        self.createTags()
+        self.createPosts()
+        self.flush()
+        for hashtag in self.hashtags:
+            hashtag.post_count = self.tag_counts[hashtag.pk]
+        Hashtag.objects.bulk_update(
+            self.hashtags, ["post_count"], batch_size=self.batch_size
+        )
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {self.written} row(s) in {elapsed:.1f}s "
+                f"({self.written / max(elapsed, 1e-9):.0f} rows/s)."
+            )
+        )
+
+    # Random draws
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def between(self, start, end):
+        return start + (end - start) * self.rng.random()
+
+    def activityTime(self, start, end):
+        """
+        Draws a time between two bounds, on the daily activity curve.
+
+        Args:
+            start (datetime): The earliest time.
+            end (datetime): The latest time.
+
+        Returns:
+            datetime: The drawn time.
+        """
+        moment = self.between(start, end)
+        hour = self.rng.choices(range(24), cum_weights=self.hour_weights)[0]
+        shifted = moment.replace(hour=hour) + timedelta(seconds=self.rng.random() * 3600)
+        return shifted if start <= shifted <= end else moment
+
+    def after(self, moment, mean_delay):
+        # Reactions come in fast after a post, then trail off
+        return moment + timedelta(
+            seconds=self.rng.expovariate(1 / mean_delay.total_seconds())
+        )
+
+    def text(self, low, high):
+        return " ".join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    # Generation
+
+    def add(self, instance):
+        self.pending.setdefault(type(instance), []).append(instance)
+        self.pending_rows += 1
+        if self.pending_rows >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every pending row in one transaction, parents first.
+        """
+        with transaction.atomic():
+            for model in (
+                models.User,
+                models.Profile,
+                models.Relation,
+                Posts,
+                Comments,
+                Likes,
+                PostHashtag,
+                Timeline,
+            ):
+                rows = self.pending.pop(model, [])
+                if rows:
+                    self.insert(model, rows)
+        self.pending_rows = 0
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f"{self.written} rows written ({self.written / max(elapsed, 1e-9):.0f} rows/s)"
+        )
+
+    def insert(self, model, rows):
+        """
+        Inserts rows with a single ``executemany``.
+
+        Skips the per-value ``pre_save`` of ``bulk_create``, which dominates
+        its run time, and which would also overwrite the generated timestamps
+        of ``auto_now`` fields.
+
+        Args:
+            model (Model): The model of the rows.
+            rows (list of Model): Unsaved instances, primary keys included.
+        """
+        if model is models.User:
+            # The auto-incremented IDs of users are needed for their profiles
+            model.objects.bulk_create(rows, batch_size=self.batch_size)
+            self.written += len(rows)
+            return
+
+        connection = self.connection
+        fields = model._meta.concrete_fields
+        quote = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(model._meta.db_table),
+            ", ".join(quote(field.column) for field in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                sql,
+                [
+                    [
+                        field.get_db_prep_save(getattr(row, field.attname), connection)
+                        for field in fields
+                    ]
+                    for row in rows
+                ],
+            )
+        self.written += len(rows)
+
+    def createUsers(self, prefix):
+        """
+        Generates the users, their profiles and the follow graph.
+
+        Each user follows ``--follows`` earlier users picked with a probability
+        proportional to their followers plus one (preferential attachment).
+        """
+        count = self.options["users"]
+        password = make_password(
+            self.options["password"], salt=f"synthetic{self.options['seed']}"
+        )
+        # Users keep joining until the last fifth of the window
+        self.joined = sorted(
+            self.between(self.start, self.end - (self.end - self.start) / 5)
+            for _ in range(count)
+        )
+        self.profile_ids = [self.uuid() for _ in range(count)]
+        self.followers = [[] for _ in range(count)]
+        following = [[] for _ in range(count)]
+
+        # One entry per profile plus one per follower, to draw targets from
+        pool = []
+        for index in range(count):
+            targets = set()
+            wanted = min(self.options["follows"], index)
+            while len(targets) < wanted:
+                targets.add(self.rng.choice(pool))
+            for target in sorted(targets):
+                following[index].append(target)
+                self.followers[target].append(index)
+                pool.append(target)
+            pool.append(index)
+
+        users = []
+        for index in range(count):
+            username = f"{prefix}_{index}"
+            user = models.User(
+                username=username,
+                email=f"{username}@example.com",
+                first_name=f"Synthetic {index}",
+                password=password,
+                date_joined=self.joined[index],
+            )
+            users.append(user)
+            self.add(user)
+        self.flush()
+        setCreatedUserIds(users)
+
+        for index, user in enumerate(users):
+            self.add(
+                models.Profile(
+                    id=self.profile_ids[index],
+                    user_id=user.pk,
+                    username=user.username,
+                    name=user.first_name,
+                    bio=self.text(3, 10),
+                    followers_count=len(self.followers[index]),
+                    following_count=len(following[index]),
+                    created_at=self.joined[index],
+                    updated_at=self.joined[index],
+                )
+            )
+        for index, targets in enumerate(following):
+            for target in targets:
+                self.add(
+                    models.Relation(
+                        id=self.uuid(),
+                        follower_id=self.profile_ids[index],
+                        following_id=self.profile_ids[target],
+                        created_at=min(
+                            self.after(self.joined[index], FOLLOW_DELAY), self.end
+                        ),
+                    )
+                )
+        self.flush()
+
+    def createTags(self):
+        self.hashtags = [
+            Hashtag(
+                id=self.uuid(),
+                name=f"{self.rng.choice(WORDS)}{rank}",
+                created_at=self.start,
+            )
+            for rank in range(self.options["tags"])
+        ]
+        with transaction.atomic():
+            self.insert(Hashtag, self.hashtags)
+        self.tag_counts = dict.fromkeys((hashtag.pk for hashtag in self.hashtags), 0)
+        # Zipf: the tag of rank r is drawn with a weight of 1 / r
+        self.tag_weights = list(
+            accumulate(1 / rank for rank in range(1, len(self.hashtags) + 1))
+        )
+
+    def createPosts(self):
+        """
+        Generates the posts of every user with their likes, comments, tags
+        and timeline entries.
+        """
+        count = len(self.profile_ids)
+        mean_followers = sum(len(followers) for followers in self.followers) / count
+        # A Pareto variate with shape 1.5 has a mean of 3
+        post_scale = self.options["posts"] / 3
+
+        for author in range(count):
+            posts = min(
+                int(post_scale * self.rng.paretovariate(1.5)),
+                int(self.options["posts"] * 50) + 1,
+            )
+            # Popular authors get proportionally more likes and comments
+            reach = (len(self.followers[author]) + 1) / (mean_followers + 1)
+            for _ in range(posts):
+                self.createPost(author, reach)
+
+    def reactors(self, author, wanted):
+        """
+        Draws the distinct profiles reacting to a post, mostly followers.
+        """
+        followers = self.followers[author]
+        count = len(self.profile_ids)
+        wanted = min(wanted, count - 1)
+        chosen = {}
+        attempts = 0
+        while len(chosen) < wanted and attempts < wanted * 4:
+            attempts += 1
+            if followers and self.rng.random() < FOLLOWER_SHARE:
+                index = self.rng.choice(followers)
+            else:
+                index = self.rng.randrange(count)
+            if index != author:
+                chosen.setdefault(index, None)
+        return list(chosen)
+
+    def createPost(self, author, reach):
+        author_id = self.profile_ids[author]
+        created_at = self.activityTime(self.joined[author], self.end)
+        tags = []
+        if self.hashtags:
+            ranks = self.rng.choices(
+                range(len(self.hashtags)),
+                cum_weights=self.tag_weights,
+                k=self.rng.choice((0, 0, 1, 1, 2, 3)),
+            )
+            tags = [self.hashtags[rank] for rank in sorted(set(ranks))]
+        post = Posts(
+            id=self.uuid(),
+            profile_id=author_id,
+            description=" ".join(
+                [self.text(3, 15)] + [f"#{hashtag.name}" for hashtag in tags]
+            ),
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+        likes = []
+        wanted = int(self.rng.expovariate(1 / (self.options["likes"] * reach + 1e-9)))
+        for liker in self.reactors(author, wanted):
+            liked_at = self.after(created_at, LIKE_DELAY)
+            if liked_at <= self.end:
+                likes.append(
+                    Likes(
+                        id=self.uuid(),
+                        profile_id=self.profile_ids[liker],
+                        post_id=post.pk,
+                        liked_at=liked_at,
+                    )
+                )
+
+        comments = []
+        wanted = int(self.rng.expovariate(1 / (self.options["comments"] * reach + 1e-9)))
+        for commenter in self.reactors(author, wanted):
+            commented_at = self.after(created_at, COMMENT_DELAY)
+            if commented_at > self.end:
+                continue
+            comment = Comments(
+                id=self.uuid(),
+                profile_id=self.profile_ids[commenter],
+                post_id=post.pk,
+                comment=self.text(1, 12),
+                created_at=commented_at,
+                updated_at=commented_at,
+            )
+            comments.append(comment)
+        comments.sort(key=lambda comment: comment.created_at)
+
+        top_level = []
+        for comment in comments:
+            if top_level and self.rng.random() < REPLY_SHARE:
+                parent = self.rng.choice(top_level)
+                comment.parent_id = parent.pk
+                comment.root_id = parent.pk
+                comment.depth = 1
+                comment.path = f"{parent.path}/{pathSegment(comment)}"
+                parent.reply_count += 1
+            else:
+                comment.root_id = comment.pk
+                comment.path = pathSegment(comment)
+                top_level.append(comment)
+
+        post.like_count = len(likes)
+        post.comment_count = len(comments)
+        self.add(post)
+        for row in likes + comments:
+            self.add(row)
+        for hashtag in tags:
+            self.tag_counts[hashtag.pk] += 1
+            self.add(
+                PostHashtag(
+                    id=self.uuid(),
+                    hashtag_id=hashtag.pk,
+                    post_id=post.pk,
+                    created_at=created_at,
+                )
+            )
+
+        if self.options["timelines"]:
+            owners = [author]
+            if not isHighFollowerProfile(len(self.followers[author])):
+                owners += self.followers[author]
+            for owner in owners:
+                self.add(
+                    Timeline(
+                        id=self.uuid(),
+                        owner_id=self.profile_ids[owner],
+                        post_id=post.pk,
+                        author_id=author_id,
+                        created_at=created_at,
+                    )
+                )
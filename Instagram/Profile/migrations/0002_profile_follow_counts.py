@@ -0,0 +1,47 @@
+# Generated by Django 5.0.3 on 2026-10-17 11:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    Profile = apps.get_model("Profile", "Profile")
+    Relation = apps.get_model("Profile", "Relation")
+
+    def relation_count(field):
+        return Coalesce(
+            Subquery(
+                Relation.objects.filter(**{field: OuterRef("pk")})
+                .values(field)
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    Profile.objects.update(
+        followers_count=relation_count("following"),
+        following_count=relation_count("follower"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.3 on 2026-10-17 11:57
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0002_profile_follow_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['created_at', 'id'], name='profile_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relation',
+            index=models.Index(fields=['follower', 'created_at', 'id'], name='relation_follower_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relation',
+            index=models.Index(fields=['following', 'created_at', 'id'], name='relation_following_created_idx'),
+        ),
+    ]
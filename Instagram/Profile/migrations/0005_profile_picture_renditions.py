@@ -0,0 +1,56 @@
+# Generated by Django 5.0.3 on 2026-10-17 12:07
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+
+def strip_media_prefix(apps, schema_editor):
+    # MEDIA_ROOT now points at the media/ directory itself
+    Profile = apps.get_model("Profile", "Profile")
+    Profile.objects.filter(profile_picture__startswith="media/").update(
+        profile_picture=Substr("profile_picture", len("media/") + 1)
+    )
+
+
+def add_media_prefix(apps, schema_editor):
+    Profile = apps.get_model("Profile", "Profile")
+    Profile.objects.exclude(profile_picture="").exclude(profile_picture__isnull=True).update(
+        profile_picture=Concat(Value("media/"), "profile_picture")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Profile', '0004_account_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_blurhash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_renditions',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, upload_to='profile_images/'),
+        ),
+        migrations.RunPython(strip_media_prefix, add_media_prefix),
+    ]
@@ -13,12 +13,19 @@ class Profile(models.Model):
     Attributes:
         user (User): The user associated with this profile.
         profile_picture (ImageField): The profile picture of the user.
+        profile_picture_renditions (JSONField): Storage names of the resized profile pictures.
+        profile_picture_width (int): The width of the profile picture.
+        profile_picture_height (int): The height of the profile picture.
+        profile_picture_blurhash (str): The blurhash placeholder of the profile picture.
         username (str): The unique username of the user.
         name (str): The name of the user.
         bio (str): A short biography or description of the user.
         website (str): The website URL of the user.
         created_at (DateTimeField): The date and time when the profile was created.
         updated_at (DateTimeField): The date and time when the profile was last updated.
+        followers_count (int): Number of profiles following this profile.
+        following_count (int): Number of profiles this profile follows.
+        deactivated_at (DateTimeField): When the account was scheduled for deletion, if it was.
         id (UUIDField): The universally unique identifier for the profile.
 
     Methods:
@@ -27,7 +34,13 @@ class Profile(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="Profile")
     profile_picture = models.ImageField(
-        upload_to="media/profile_images/", null=True, blank=True
+        upload_to="profile_images/", null=True, blank=True
+    )
+    profile_picture_renditions = models.JSONField(default=dict, editable=False)
+    profile_picture_width = models.PositiveIntegerField(null=True, editable=False)
+    profile_picture_height = models.PositiveIntegerField(null=True, editable=False)
+    profile_picture_blurhash = models.CharField(
+        max_length=64, blank=True, editable=False
     )
     username = models.CharField(null=False, blank=False, unique=True, max_length=50)
     name = models.CharField(null=True, blank=True, max_length=100)
@@ -35,10 +48,18 @@ class Profile(models.Model):
     website = models.URLField(null=True, blank=True, max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    deactivated_at = models.DateTimeField(null=True, blank=True, editable=False)
     id = models.UUIDField(
         default=uuid.uuid4, editable=False, unique=True, primary_key=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="profile_created_id_idx"),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of the profile.
@@ -57,9 +78,11 @@ class Relation(models.Model):
     Attributes:
         following (ForeignKey): The profile being followed.
         follower (ForeignKey): The profile following another.
+        created_at (DateTimeField): The date and time when the follow happened.
 
     Meta:
         unique_together (list of str): Ensures each combination of following and follower is unique.
+        indexes (list of Index): Keyset indexes for paginating followings and followers.
 
     Methods:
         __str__(self): Returns a string representation of the relation.
@@ -67,12 +90,23 @@ class Relation(models.Model):
 
     following = models.ForeignKey(Profile, models.CASCADE, related_name="follower")
     follower = models.ForeignKey(Profile, models.CASCADE, related_name="following")
+    created_at = models.DateTimeField(auto_now_add=True)
     id = models.UUIDField(
         default=uuid.uuid4, editable=False, unique=True, primary_key=True
     )
 
     class Meta:
         unique_together = ["following", "follower"]
+        indexes = [
+            models.Index(
+                fields=["follower", "created_at", "id"],
+                name="relation_follower_created_idx",
+            ),
+            models.Index(
+                fields=["following", "created_at", "id"],
+                name="relation_following_created_idx",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -82,3 +116,57 @@ class Relation(models.Model):
             str: A string indicating the follower is following the following.
         """
         return f"{self.follower} is following {self.following}"
+
+
+class AccountDeletion(models.Model):
+    """
+    Tracks the background purge of a deactivated account.
+
+    Attributes:
+        profile (ForeignKey): The profile being purged, cleared once it is gone.
+        username (str): The username of the purged profile, kept for reference.
+        status (str): One of pending, running, done or failed.
+        stage (str): The dependent rows currently being purged.
+        rows_deleted (int): The number of rows purged so far.
+        created_at (DateTimeField): When the deletion was requested.
+        updated_at (DateTimeField): When the progress was last updated.
+        finished_at (DateTimeField): When the purge completed.
+        id (UUIDField): The universally unique identifier for the deletion.
+
+    Methods:
+        __str__(self): Returns a string representation of the deletion.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    profile = models.ForeignKey(
+        Profile, models.SET_NULL, null=True, related_name="deletions"
+    )
+    username = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    stage = models.CharField(max_length=30, blank=True)
+    rows_deleted = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    id = models.UUIDField(
+        default=uuid.uuid4, editable=False, unique=True, primary_key=True
+    )
+
+    def __str__(self):
+        """
+        Returns a string representation of the deletion.
+
+        Returns:
+            str: The username and the status of the deletion.
+        """
+        return f"Deletion of {self.username} ({self.status})"
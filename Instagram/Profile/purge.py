@@ -0,0 +1,203 @@
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from Comments.models import Comments
+from Comments.utils import releaseComments
+from Feed.models import Timeline
+from Hashtags.models import Hashtag, PostHashtag
+from Likes.models import Likes
+from Posts.counters import engagement_counters
+from Posts.models import Posts
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Account purge
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="account-purge")
+
+
+def schedulePurge(deletion_id):
+    """
+    Queues the purge of a deactivated account on the background worker.
+
+    Args:
+        deletion_id (UUID): The AccountDeletion to run.
+    """
+    executor.submit(purgeInBackground, deletion_id)
+
+
+def purgeInBackground(deletion_id):
+    try:
+        purgeAccount(deletion_id)
+    except Exception:
+        logger.exception("Failed to purge account deletion %s.", deletion_id)
+    finally:
+        connection.close()
+
+
+def deleteChunk(queryset, adjust=None):
+    """
+    Deletes up to ``ACCOUNT_PURGE_CHUNK_SIZE`` rows of a queryset in one short transaction.
+
+    Args:
+        queryset (QuerySet): The rows left to purge.
+        adjust (callable): Called with the values of ``adjust.fields`` for the
+            chunk, inside the transaction, to fix up counters.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    fields = getattr(adjust, "fields", ())
+    rows = list(
+        queryset.values_list("pk", *fields)[: settings.ACCOUNT_PURGE_CHUNK_SIZE]
+    )
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        if adjust is not None:
+            adjust([row[1:] for row in rows])
+        queryset.model.objects.filter(pk__in=[row[0] for row in rows]).delete()
+    return len(rows)
+
+
+def counterAdjuster(model, field, counter_field):
+    """
+    Builds a chunk callback decrementing a counter once per deleted row.
+
+    Post counters go through the engagement counter buffer, other counters
+    are updated directly with F-expressions.
+
+    Args:
+        model (Model): The model holding the counter.
+        field (str): The purged row field pointing at the counter row.
+        counter_field (str): The counter to decrement.
+
+    Returns:
+        callable: The callback for ``deleteChunk``.
+    """
+
+    def adjust(rows):
+        for target, total in Counter(row[0] for row in rows).items():
+            if model is Posts:
+                engagement_counters.add(target, counter_field, -total)
+            else:
+                model.objects.filter(pk=target).update(
+                    **{counter_field: F(counter_field) - total}
+                )
+
+    adjust.fields = (field,)
+    return adjust
+
+
+def purgeStages(profile_id):
+    """
+    Lists the dependents of a profile in the order they are purged.
+
+    Rows owned by other profiles go first, then the profile's own posts once
+    nothing references them any more, so no single delete cascades widely.
+
+    Args:
+        profile_id (UUID): The profile being purged.
+
+    Returns:
+        list of tuple: ``(stage, queryset, adjust)`` entries.
+    """
+    return [
+        ("timeline", Timeline.objects.filter(owner_id=profile_id), None),
+        ("authored_timeline", Timeline.objects.filter(author_id=profile_id), None),
+        (
+            "likes",
+            Likes.objects.filter(profile_id=profile_id).exclude(
+                post__profile_id=profile_id
+            ),
+            counterAdjuster(Posts, "post_id", "like_count"),
+        ),
+        (
+            "comments",
+            Comments.objects.filter(profile_id=profile_id).exclude(
+                post__profile_id=profile_id
+            ),
+            releaseComments,
+        ),
+        ("post_likes", Likes.objects.filter(post__profile_id=profile_id), None),
+        ("post_comments", Comments.objects.filter(post__profile_id=profile_id), None),
+        (
+            "hashtags",
+            PostHashtag.objects.filter(post__profile_id=profile_id),
+            counterAdjuster(Hashtag, "hashtag_id", "post_count"),
+        ),
+        ("posts", Posts.objects.filter(profile_id=profile_id), None),
+        (
+            "following",
+            models.Relation.objects.filter(follower_id=profile_id),
+            counterAdjuster(models.Profile, "following_id", "followers_count"),
+        ),
+        (
+            "followers",
+            models.Relation.objects.filter(following_id=profile_id),
+            counterAdjuster(models.Profile, "follower_id", "following_count"),
+        ),
+    ]
+
+
+def purgeAccount(deletion_id):
+    """
+    Purges a deactivated account in bounded chunks, recording progress.
+
+    Each chunk is its own short transaction followed by an optional pause of
+    ``ACCOUNT_PURGE_PAUSE`` seconds, so other writers are never blocked for
+    long. A purge interrupted midway can simply be run again.
+
+    Args:
+        deletion_id (UUID): The AccountDeletion to run.
+    """
+    deletion = models.AccountDeletion.objects.get(pk=deletion_id)
+    if deletion.status == models.AccountDeletion.DONE:
+        return
+
+    profile_id = deletion.profile_id
+    if profile_id is None:
+        # The profile is already gone, only the bookkeeping was left
+        deletion.status = models.AccountDeletion.DONE
+        deletion.finished_at = deletion.finished_at or timezone.now()
+        deletion.save(update_fields=["status", "finished_at", "updated_at"])
+        return
+
+    deletion.status = models.AccountDeletion.RUNNING
+    deletion.save(update_fields=["status", "updated_at"])
+
+    try:
+        for stage, queryset, adjust in purgeStages(profile_id):
+            deletion.stage = stage
+            deletion.save(update_fields=["stage", "updated_at"])
+            while deleted := deleteChunk(queryset, adjust):
+                deletion.rows_deleted += deleted
+                deletion.save(update_fields=["rows_deleted", "updated_at"])
+                time.sleep(settings.ACCOUNT_PURGE_PAUSE)
+
+        with transaction.atomic():
+            user_id = (
+                models.Profile.objects.filter(pk=profile_id)
+                .values_list("user_id", flat=True)
+                .first()
+            )
+            models.User.objects.filter(pk=user_id).delete()
+    except Exception:
+        deletion.status = models.AccountDeletion.FAILED
+        deletion.save(update_fields=["status", "updated_at"])
+        raise
+
+    deletion.status = models.AccountDeletion.DONE
+    deletion.stage = ""
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=["status", "stage", "finished_at", "updated_at"])
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from Media.serializers import RenditionsField, StrippedImageField
+
 from . import models
 
 # Serializer goes here
@@ -50,14 +52,20 @@ class ProfileSerializer(serializers.ModelSerializer):
 
     Attributes:
         url (str): A SerializerMethodField representing the URL for the profile.
+        followers (int): The maintained follower counter of the profile.
+        following (int): The maintained following counter of the profile.
+        profile_picture (ImageField): The profile picture, stored without metadata.
+        profile_picture_renditions (dict): URLs of the resized profile pictures.
 
     Methods:
         get_url(self, instance): Method to get the URL for the profile.
     """
 
     url = serializers.SerializerMethodField()
-    followers = serializers.SerializerMethodField()  # type:ignore
-    following = serializers.SerializerMethodField()
+    followers = serializers.IntegerField(source="followers_count", read_only=True)
+    following = serializers.IntegerField(source="following_count", read_only=True)
+    profile_picture = StrippedImageField(required=False, allow_null=True)
+    profile_picture_renditions = RenditionsField()
 
     class Meta:
         model = models.Profile
@@ -65,6 +73,10 @@ class ProfileSerializer(serializers.ModelSerializer):
             "id",
             "url",
             "profile_picture",
+            "profile_picture_renditions",
+            "profile_picture_width",
+            "profile_picture_height",
+            "profile_picture_blurhash",
             "username",
             "name",
             "bio",
@@ -90,12 +102,6 @@ class ProfileSerializer(serializers.ModelSerializer):
                 f"/api/profile/profile/{instance.username}/"
             )
 
-    def get_followers(self, instance):
-        return instance.follower.count()
-
-    def get_following(self, instance):
-        return instance.following.count()
-
 
 # Following Serializer
 class FollowingSerializer(serializers.ModelSerializer):
@@ -106,6 +112,10 @@ class FollowingSerializer(serializers.ModelSerializer):
         fields = "__all__"
         extra_kwargs = {
             "follower": {"read_only": True},
+            # The purge of a deactivated account would miss a later follow
+            "following": {
+                "queryset": models.Profile.objects.filter(deactivated_at__isnull=True)
+            },
         }
 
     def get_url(self, instance):
@@ -1,3 +1,705 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APITestCase
+
+from Comments.models import Comments
+from Comments.utils import createComment
+from Feed.models import Timeline
+from Feed.utils import fanOutPost
+from Hashtags.models import Hashtag, PostHashtag
+from Hashtags.utils import indexPost
+from Instagram.testing import QueryCountTestCase, makeProfile
+from Posts.models import Posts
+
+from . import models
+from .authentication import tokenCache, tokenCacheKey
+from .permissions import IsOwnerOrReadOnly
+from .purge import deleteChunk, purgeAccount, purgeStages
 
 # Create your tests here.
+
+
+class ProfileWriteQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        self.other_user, self.other_profile, self.other_client = makeProfile("other")
+
+    def followCounts(self):
+        return [
+            (profile.following_count, profile.followers_count)
+            for profile in models.Profile.objects.filter(
+                pk__in=[self.profile.pk, self.other_profile.pk]
+            ).order_by("username")
+        ]
+
+    def test_update(self):
+        self.assertObjectPermission(
+            IsOwnerOrReadOnly(), self.user, "patch", self.profile, True
+        )
+        response = self.assertQueries(
+            6,
+            self.client,
+            "patch",
+            "/api/profile/profile/owner/",
+            {"name": "Owner"},
+            200,
+        )
+        self.assertEqual(response.data, "Profile has been updated.")
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.name, "Owner")
+
+    def test_update_by_other_profile(self):
+        self.assertObjectPermission(
+            IsOwnerOrReadOnly(), self.other_user, "patch", self.profile, False
+        )
+        self.assertObjectPermission(
+            IsOwnerOrReadOnly(), self.other_user, "get", self.profile, True
+        )
+        response = self.assertQueries(
+            1,
+            self.other_client,
+            "patch",
+            "/api/profile/profile/owner/",
+            {"name": "Owner"},
+            403,
+        )
+        self.assertEqual(response.data["detail"], PermissionDenied.default_detail)
+        self.profile.refresh_from_db()
+        self.assertNotEqual(self.profile.name, "Owner")
+
+    def test_destroy(self):
+        response = self.assertQueries(
+            8,
+            self.client,
+            "delete",
+            "/api/profile/profile/owner/",
+            status_code=202,
+        )
+        deletion = models.AccountDeletion.objects.get(profile=self.profile)
+        self.assertEqual(
+            response.data, {"deletion": deletion.pk, "status": deletion.status}
+        )
+        self.profile.refresh_from_db()
+        self.assertIsNotNone(self.profile.deactivated_at)
+        self.assertFalse(models.User.objects.get(pk=self.user.pk).is_active)
+
+    def test_destroy_by_other_profile(self):
+        response = self.other_client.delete("/api/profile/profile/owner/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["detail"], PermissionDenied.default_detail)
+        self.profile.refresh_from_db()
+        self.assertIsNone(self.profile.deactivated_at)
+        self.assertFalse(models.AccountDeletion.objects.exists())
+
+    def test_follow(self):
+        response = self.assertQueries(
+            9,
+            self.client,
+            "post",
+            "/api/profile/followings/",
+            {"following": str(self.other_profile.pk)},
+            201,
+        )
+        self.assertEqual(response.data, f"Following {self.other_profile.pk}")
+        self.assertTrue(
+            models.Relation.objects.filter(
+                follower=self.profile, following=self.other_profile
+            ).exists()
+        )
+        # other, then owner
+        self.assertEqual(self.followCounts(), [(0, 1), (1, 0)])
+
+    def test_unfollow(self):
+        self.client.post(
+            "/api/profile/followings/", {"following": str(self.other_profile.pk)}
+        )
+        response = self.assertQueries(
+            7,
+            self.client,
+            "post",
+            "/api/profile/followings/",
+            {"following": str(self.other_profile.pk)},
+            201,
+        )
+        self.assertEqual(response.data, f"Unfollowed {self.other_profile.pk}")
+        self.assertFalse(models.Relation.objects.exists())
+        self.assertEqual(self.followCounts(), [(0, 0), (0, 0)])
+
+
+class ProfileReadQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        self.posts = {}
+        for username in ("first", "second", "third"):
+            _, profile, _ = makeProfile(username)
+            self.posts[username] = Posts.objects.create(
+                profile=profile, description=username
+            )
+
+    def test_list(self):
+        response = self.assertQueries(
+            1, self.client, "get", "/api/profile/profile/", status_code=200
+        )
+        self.assertEqual(
+            sorted(profile["username"] for profile in response.data["results"]),
+            ["first", "owner", "second", "third"],
+        )
+
+    def test_retrieve(self):
+        response = self.assertQueries(
+            1, self.client, "get", "/api/profile/profile/first/", status_code=200
+        )
+        self.assertEqual(response.data["username"], "first")
+
+    def test_posts(self):
+        response = self.assertQueries(
+            3, self.client, "get", "/api/profile/profile/first/posts/", status_code=200
+        )
+        self.assertEqual(
+            [post["id"] for post in response.data["results"]],
+            [str(self.posts["first"].pk)],
+        )
+
+
+class UserListPaginationTests(APITestCase):
+    def setUp(self):
+        self.users = [makeProfile(f"user{i}")[0] for i in range(3)]
+
+    def test_pages_by_id_newest_first(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get("/api/register/user/?page_size=2")
+        self.assertIn('ORDER BY "auth_user"."id" DESC', queries[0]["sql"])
+        self.assertEqual(
+            [user["username"] for user in first.data["results"]], ["user2", "user1"]
+        )
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual([user["username"] for user in second.data["results"]], ["user0"])
+        self.assertIsNone(second.data["next"])
+
+
+class TokenCacheTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        self.key = tokenCacheKey(Token.objects.get(user=self.user).key)
+        # A second handler on the same backend, as in another worker
+        self.other_worker = caches.create_connection(settings.TOKEN_AUTH_CACHE)
+
+    def test_cache_outlives_the_process(self):
+        # A per-process cache keeps revoked tokens alive in the other workers
+        self.assertNotIsInstance(tokenCache(), LocMemCache)
+
+    def test_cached_token_authenticates(self):
+        user, token = self.other_worker.get(self.key)
+        self.assertEqual(user.Profile.pk, self.profile.pk)
+        response = self.client.get("/api/profile/profile/owner/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["username"], "owner")
+
+    def logout(self):
+        return self.client.post("/api/user/logout/")
+
+    def deleteAccount(self):
+        with mock.patch("Profile.purge.schedulePurge"):
+            return self.client.delete("/api/profile/profile/owner/")
+
+    def assertRevoked(self):
+        self.assertIsNone(self.other_worker.get(self.key))
+        response = self.client.get("/api/posts/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["detail"], "Invalid token.")
+
+    def test_logout_revokes_the_token_in_every_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.logout()
+        self.assertEqual(response.status_code, 200)
+        self.assertRevoked()
+
+    def test_account_deletion_revokes_the_token_in_every_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.deleteAccount()
+        self.assertEqual(response.status_code, 202)
+        self.assertRevoked()
+
+    def assertRacingLookupIsEvicted(self, revoke):
+        cached = self.other_worker.get(self.key)
+        with self.captureOnCommitCallbacks() as callbacks:
+            revoke()
+        # Another worker read the token before the revocation committed
+        self.other_worker.set(self.key, cached)
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+        self.assertRevoked()
+
+    def test_lookup_racing_the_logout_is_evicted(self):
+        self.assertRacingLookupIsEvicted(self.logout)
+
+    def test_lookup_racing_the_account_deletion_is_evicted(self):
+        self.assertRacingLookupIsEvicted(self.deleteAccount)
+
+
+class DeactivatedProfileTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("viewer")
+        self.owner_user, self.owner, self.owner_client = makeProfile("owner")
+        models.Relation.objects.create(follower=self.profile, following=self.owner)
+        self.visible = Posts.objects.create(profile=self.profile, description="#tag")
+        self.hidden = Posts.objects.create(profile=self.owner, description="#tag")
+        for post in (self.visible, self.hidden):
+            indexPost(post)
+            fanOutPost(post)
+
+        # The purge runs on commit, which never happens inside a test
+        response = self.owner_client.delete("/api/profile/profile/owner/")
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(models.AccountDeletion.objects.filter(profile=self.owner).exists())
+        self.assertTrue(Posts.objects.filter(pk=self.hidden.pk).exists())
+
+    def postIds(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return [post["id"] for post in response.data["results"]]
+
+    def test_posts_are_hidden_before_the_purge(self):
+        expected = [str(self.visible.pk)]
+        self.assertEqual(self.postIds("/api/posts/"), expected)
+        self.assertEqual(self.postIds("/api/feed/"), expected)
+        self.assertEqual(self.postIds("/api/tags/tag/posts/"), expected)
+        response = self.client.get(f"/api/posts/{self.hidden.pk}/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_is_hidden_before_the_purge(self):
+        response = self.client.get("/api/profile/profile/owner/")
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/api/profile/profile/")
+        self.assertEqual(
+            [profile["username"] for profile in response.data["results"]], ["viewer"]
+        )
+
+
+@override_settings(
+    ACCOUNT_PURGE_CHUNK_SIZE=2, ACCOUNT_PURGE_PAUSE=0, POSTS_COUNTER_FLUSH_INTERVAL=0
+)
+class PurgeAccountTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        _, self.fan, self.fan_client = makeProfile("fan")
+        _, self.other, self.other_client = makeProfile("other")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.follow(self.fan_client, self.profile)
+            self.follow(self.client, self.other)
+            self.follow(self.client, self.fan)
+            self.kept = self.createPost(self.other_client, "#shared")
+            self.posts = [
+                self.createPost(self.client, f"#shared #own{index}") for index in range(3)
+            ]
+
+            for post in [self.kept, *self.posts]:
+                self.client.post("/api/likes/", {"post": str(post.pk)})
+                self.fan_client.post("/api/likes/", {"post": str(post.pk)})
+            # A thread on the kept post: owner > fan, and fan > owner
+            comment = createComment(self.profile, self.kept, "first")
+            createComment(self.fan, self.kept, "reply", parent=comment)
+            self.thread = createComment(self.fan, self.kept, "second")
+            createComment(self.profile, self.kept, "reply", parent=self.thread)
+            for post in self.posts:
+                createComment(self.fan, post, "nice")
+
+        response = self.client.delete("/api/profile/profile/owner/")
+        self.assertEqual(response.status_code, 202)
+        self.deletion = models.AccountDeletion.objects.get(profile=self.profile)
+        # Stages may overlap, e.g. the owner's own posts in their timeline
+        self.rows = len(
+            {
+                (queryset.model, pk)
+                for _, queryset, _ in purgeStages(self.profile.pk)
+                for pk in queryset.values_list("pk", flat=True)
+            }
+        )
+
+    def follow(self, client, profile):
+        response = client.post("/api/profile/followings/", {"following": str(profile.pk)})
+        self.assertEqual(response.status_code, 201)
+
+    def createPost(self, client, description):
+        response = client.post("/api/posts/", {"description": description})
+        self.assertEqual(response.status_code, 201)
+        return Posts.objects.latest("created_at")
+
+    def purge(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            purgeAccount(self.deletion.pk)
+
+    def assertPurged(self):
+        self.deletion.refresh_from_db()
+        self.assertEqual(self.deletion.status, models.AccountDeletion.DONE)
+        self.assertEqual(self.deletion.stage, "")
+        self.assertEqual(self.deletion.rows_deleted, self.rows)
+        self.assertIsNotNone(self.deletion.finished_at)
+        self.assertIsNone(self.deletion.profile_id)
+        self.assertFalse(models.User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(list(Posts.objects.all()), [self.kept])
+
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.like_count, 1)
+        # Only the fan's comment is left, the owner's reply went with the thread
+        self.assertEqual(self.kept.comment_count, 1)
+        self.assertEqual(Comments.objects.get().reply_count, 0)
+        self.assertEqual(
+            dict(Hashtag.objects.values_list("name", "post_count")),
+            {"shared": 1, "own0": 0, "own1": 0, "own2": 0},
+        )
+        for profile in (self.fan, self.other):
+            profile.refresh_from_db()
+            self.assertEqual((profile.followers_count, profile.following_count), (0, 0))
+        self.assertFalse(models.Relation.objects.exists())
+        self.assertFalse(Timeline.objects.filter(owner_id=self.profile.pk).exists())
+        self.assertFalse(Timeline.objects.filter(author_id=self.profile.pk).exists())
+
+    def test_purge_deletes_in_chunks_and_fixes_counters(self):
+        chunks = []
+
+        def recordChunk(queryset, adjust=None):
+            deleted = deleteChunk(queryset, adjust)
+            chunks.append(deleted)
+            return deleted
+
+        with mock.patch("Profile.purge.deleteChunk", recordChunk):
+            self.purge()
+        self.assertPurged()
+        self.assertLessEqual(max(chunks), 2)
+        self.assertEqual(sum(chunks), self.rows)
+
+    def test_interrupted_purge_resumes(self):
+        calls = []
+
+        def failingChunk(queryset, adjust=None):
+            calls.append(queryset)
+            if len(calls) == 6:
+                raise RuntimeError("worker died")
+            return deleteChunk(queryset, adjust)
+
+        with mock.patch("Profile.purge.deleteChunk", failingChunk):
+            with self.assertRaises(RuntimeError):
+                self.purge()
+        self.deletion.refresh_from_db()
+        self.assertEqual(self.deletion.status, models.AccountDeletion.FAILED)
+        self.assertNotEqual(self.deletion.stage, "")
+        self.assertGreater(self.deletion.rows_deleted, 0)
+        self.assertTrue(models.User.objects.filter(pk=self.user.pk).exists())
+
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("purge_accounts", stdout=out)
+        self.assertIn(f"done, {self.rows} row(s) deleted.", out.getvalue())
+        self.assertPurged()
+
+    def test_deactivated_account_takes_no_new_writes(self):
+        post = self.posts[0]
+        for client, path, data in (
+            (self.other_client, "/api/profile/followings/", {"following": str(self.profile.pk)}),
+            (self.other_client, "/api/likes/", {"post": str(post.pk)}),
+            (self.other_client, "/api/comments/", {"post": str(post.pk), "comment": "hi"}),
+        ):
+            response = client.post(path, data)
+            self.assertEqual(response.status_code, 400, path)
+        comment = Comments.objects.filter(post=post).first()
+        response = self.other_client.post(
+            "/api/comments/", {"parent": str(comment.pk), "comment": "hi"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.purge()
+        self.assertPurged()
+
+
+class FollowCountTests(APITestCase):
+    def setUp(self):
+        self.user, self.profile, self.client = makeProfile("owner")
+        _, self.fan, self.fan_client = makeProfile("fan")
+
+    def counts(self, profile):
+        profile.refresh_from_db()
+        return profile.followers_count, profile.following_count
+
+    def followOwner(self):
+        response = self.fan_client.post(
+            "/api/profile/followings/", {"following": str(self.profile.pk)}
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_removing_a_follower_updates_both_counts(self):
+        self.followOwner()
+        self.assertEqual(self.counts(self.profile), (1, 0))
+        self.assertEqual(self.counts(self.fan), (0, 1))
+        response = self.client.get("/api/profile/profile/owner/")
+        self.assertEqual(response.data["followers"], 1)
+        self.assertEqual(response.data["following"], 0)
+
+        relation = models.Relation.objects.get()
+        response = self.client.delete(f"/api/profile/followers/{relation.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.counts(self.profile), (0, 0))
+        self.assertEqual(self.counts(self.fan), (0, 0))
+
+    def test_reconcile_rewrites_drifted_counts(self):
+        self.followOwner()
+        models.Profile.objects.filter(pk=self.profile.pk).update(followers_count=5)
+
+        out = io.StringIO()
+        call_command("reconcile_follow_counts", "--dry-run", stdout=out)
+        self.assertIn("Found 1 drifted profile(s).", out.getvalue())
+        self.assertEqual(self.counts(self.profile), (5, 0))
+
+        out = io.StringIO()
+        call_command("reconcile_follow_counts", stdout=out)
+        self.assertIn("Reconciled 1 drifted profile(s).", out.getvalue())
+        self.assertEqual(self.counts(self.profile), (1, 0))
+        self.assertEqual(self.counts(self.fan), (0, 1))
+
+
+class AsyncCredentialsTests(TestCase):
+    async def register(self, username, password="a long passphrase"):
+        return await self.async_client.post(
+            "/api/async/register/user/",
+            {
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": password,
+            },
+            content_type="application/json",
+        )
+
+    async def login(self, username, password="a long passphrase"):
+        return await self.async_client.post(
+            "/api/async/user/login/",
+            {"username": username, "password": password},
+            content_type="application/json",
+        )
+
+    async def test_register_and_login(self):
+        response = await self.register("newcomer")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), "User Account Created Successfully")
+        self.assertTrue(
+            await models.Profile.objects.filter(username="newcomer").aexists()
+        )
+
+        response = await self.login("newcomer")
+        self.assertEqual(response.status_code, 200)
+        token = await Token.objects.aget(user__username="newcomer")
+        self.assertEqual(response.json(), {"Token": f"Token {token.key}"})
+
+    async def test_wrong_credentials_are_rejected(self):
+        await self.register("newcomer")
+        for username, password in (("newcomer", "wrong"), ("nobody", "wrong")):
+            response = await self.login(username, password)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json(), "Invalid Username or Password.")
+
+    async def test_invalid_registration_is_rejected(self):
+        await self.register("newcomer")
+        response = await self.register("newcomer")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", response.json())
+
+    @override_settings(PASSWORD_HASHING_MAX_PENDING=0)
+    async def test_saturated_pool_turns_requests_away(self):
+        for response in (await self.register("newcomer"), await self.login("owner")):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "1")
+        self.assertFalse(await models.User.objects.aexists())
+
+
+class ImportUsersTests(TestCase):
+    def importUsers(self, content, suffix=".csv"):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        out = io.StringIO()
+        call_command("import_users", path, "--workers", "1", stdout=out)
+        return out.getvalue()
+
+    def test_imports_users_with_their_profiles(self):
+        makeProfile("taken")
+        encoded = make_password("exported")
+        output = self.importUsers(
+            "username,email,name,password,password_hash\n"
+            "Alice,alice@EXAMPLE.com,Alice A,secret,\n"
+            f"bob,,,,{encoded}\n"
+            "taken,,,,\n"
+            "Alice,,,,\n"
+        )
+        self.assertIn("Imported 2 user(s), skipped 2", output)
+
+        alice = models.User.objects.get(username="Alice")
+        self.assertEqual(alice.email, "alice@example.com")
+        self.assertTrue(check_password("secret", alice.password))
+        self.assertEqual(alice.Profile.name, "Alice A")
+        bob = models.User.objects.get(username="bob")
+        self.assertEqual(bob.password, encoded)
+        self.assertEqual(bob.Profile.username, "bob")
+
+    def test_reads_ndjson(self):
+        output = self.importUsers('{"username": "carol"}\n\n', suffix=".ndjson")
+        self.assertIn("Imported 1 user(s), skipped 0", output)
+        user = models.User.objects.get(username="carol")
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(models.Profile.objects.filter(user=user).exists())
+
+    def test_backends_without_returning_get_the_ids_back(self):
+        features = type(connection.features)
+        with mock.patch.object(features, "can_return_rows_from_bulk_insert", False):
+            output = self.importUsers("username\ndave\nerin\n")
+        self.assertIn("Imported 2 user(s), skipped 0", output)
+        for username in ("dave", "erin"):
+            user = models.User.objects.get(username=username)
+            self.assertEqual(user.Profile.username, username)
+
+
+class SeedSyntheticTests(TestCase):
+    def seed(self, *args):
+        out = io.StringIO()
+        call_command(
+            "seed_synthetic",
+            "--users=40",
+            "--days=10",
+            "--end=2026-01-01",
+            "--tags=20",
+            "--batch-size=50",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_counters_match_the_generated_rows(self):
+        self.assertIn("Wrote ", self.seed())
+        self.assertEqual(models.Profile.objects.count(), 40)
+        self.assertTrue(Posts.objects.exists())
+        user = models.User.objects.get(username="synthetic_0")
+        self.assertTrue(check_password("synthetic-password", user.password))
+
+        out = io.StringIO()
+        call_command("reconcile_follow_counts", "--dry-run", stdout=out)
+        self.assertIn("Found 0 drifted profile(s).", out.getvalue())
+
+        posts = Posts.objects.annotate(
+            like_rows=Count("likes", distinct=True),
+            comment_rows=Count("comments", distinct=True),
+        )
+        end = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        for post in posts:
+            self.assertEqual(post.like_count, post.like_rows)
+            self.assertEqual(post.comment_count, post.comment_rows)
+            self.assertLessEqual(post.created_at, end)
+        threads = Comments.objects.filter(depth=0).annotate(reply_rows=Count("replies"))
+        for comment in threads:
+            self.assertEqual(comment.reply_count, comment.reply_rows)
+        for hashtag in Hashtag.objects.all():
+            tagged = PostHashtag.objects.filter(hashtag=hashtag).count()
+            self.assertEqual(hashtag.post_count, tagged)
+        # Every author sees their own posts
+        own_entries = Timeline.objects.filter(owner_id=F("author_id"))
+        self.assertEqual(own_entries.count(), Posts.objects.count())
+
+    def test_same_seed_same_rows(self):
+        self.seed("--seed=7")
+        post_ids = set(Posts.objects.values_list("pk", flat=True))
+        with self.assertRaises(CommandError):
+            self.seed("--seed=7")
+
+        models.User.objects.all().delete()
+        Hashtag.objects.all().delete()
+        self.seed("--seed=7")
+        self.assertEqual(set(Posts.objects.values_list("pk", flat=True)), post_ids)
+
+    def test_backends_without_returning_get_the_ids_back(self):
+        features = type(connection.features)
+        with mock.patch.object(features, "can_return_rows_from_bulk_insert", False):
+            self.seed()
+        profiles = models.Profile.objects.filter(user__username=F("username"))
+        self.assertEqual(profiles.count(), 40)
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        for username in ("first", "second"):
+            _, profile, _ = makeProfile(username)
+            Posts.objects.create(profile=profile, description=username)
+        handle, self.output = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, self.output)
+
+    def benchmark(self, *args):
+        out = io.StringIO()
+        call_command(
+            "benchmark",
+            "--requests=3",
+            "--concurrency=1",
+            "--scenarios=post_list,profile_detail,like",
+            f"--output={self.output}",
+            *args,
+            stdout=out,
+        )
+        with open(self.output, encoding="utf-8") as stream:
+            return json.load(stream), out.getvalue()
+
+    def test_records_every_scenario_and_removes_its_users(self):
+        result, _ = self.benchmark()
+        self.assertEqual(result["meta"]["target"], "in-process")
+        self.assertEqual(result["meta"]["rows"]["posts"], 2)
+        self.assertEqual(
+            list(result["scenarios"]), ["post_list", "profile_detail", "like"]
+        )
+        for summary in result["scenarios"].values():
+            self.assertEqual(summary["requests"], 3)
+            self.assertEqual(summary["errors"], 0)
+            self.assertGreater(summary["queries_per_request"], 0)
+            self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+
+        # Deactivated, and purged once their deletion commits
+        self.assertFalse(
+            models.Profile.objects.filter(
+                username__startswith="bench_", deactivated_at__isnull=True
+            ).exists()
+        )
+
+    def test_fails_on_regression_against_a_baseline(self):
+        baseline, _ = self.benchmark()
+        for summary in baseline["scenarios"].values():
+            summary["p95_ms"] = 0.001
+        handle, path = tempfile.mkstemp(suffix=".json")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump(baseline, stream)
+
+        _, out = self.benchmark(f"--baseline={path}")
+        self.assertIn("post_list", out.split("Against")[1])
+        message = "Regressed: post_list, profile_detail, like."
+        with self.assertRaisesMessage(CommandError, message):
+            self.benchmark(f"--baseline={path}", "--fail-on-regression")
+
+    def test_rejects_unknown_scenarios(self):
+        with self.assertRaisesMessage(CommandError, "Unknown scenario(s): nope."):
+            call_command("benchmark", "--scenarios=nope", stdout=io.StringIO())
@@ -1,4 +1,5 @@
 from django.urls import include, path
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.routers import DefaultRouter
 
 from . import views
@@ -15,6 +16,12 @@ urlpatterns = [
     path("register/user/", views.UserRegisterView.as_view()),
     path("user/login/", views.UserLoginView.as_view()),
     path("user/logout/", views.UserLogoutView.as_view()),
+    # async user endpoints, hashing on a bounded pool
+    path(
+        "async/register/user/",
+        csrf_exempt(views.AsyncUserRegisterView.as_view()),
+    ),
+    path("async/user/login/", csrf_exempt(views.AsyncUserLoginView.as_view())),
     # profile endpoints
     path("profile/", include(router.urls)),
 ]
@@ -1,9 +1,22 @@
+import uuid
+
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from Feed.utils import backfillTimeline, retractTimeline
+from Media.pipeline import scheduleRenditions
+from Posts.models import Posts
+from Posts.serializers import PostsSeriliazer
 
 from . import models
+from . import purge
+from .authentication import revokeUserTokens
 
 # -----------------------------------------------------------------------------------------------------------
 # -----------------------------------------------------------------------------------------------------------
@@ -11,6 +24,53 @@ from . import models
 # User Viewset
 
 
+def createUserProfile(username, email, password):
+    """
+    Creates a user and its profile in one transaction.
+
+    Args:
+        username (str): The username of the new user.
+        email (str): The email address of the new user.
+        password (str): The already hashed password, see ``make_password``.
+
+    Returns:
+        User: The created user.
+    """
+    user = models.User(
+        username=models.User.normalize_username(username),
+        email=models.User.objects.normalize_email(email),
+        password=password,
+    )
+    with transaction.atomic():
+        user.save()
+        models.Profile.objects.create(user=user, username=user.username)
+    return user
+
+
+def setCreatedUserIds(users, batch_size=1000):
+    """
+    Sets the primary keys of users saved with ``bulk_create``.
+
+    Backends without RETURNING do not set them, so they are read back by
+    username, ``batch_size`` usernames per query.
+
+    Args:
+        users (list of User): The users passed to ``bulk_create``.
+        batch_size (int): The number of usernames looked up at once.
+    """
+    usernames = [user.username for user in users if user.pk is None]
+    ids = {}
+    for start in range(0, len(usernames), batch_size):
+        ids.update(
+            models.User.objects.filter(
+                username__in=usernames[start : start + batch_size]
+            ).values_list("username", "pk")
+        )
+    for user in users:
+        if user.pk is None:
+            user.pk = ids[user.username]
+
+
 def userProfileCreate(self, request):
     """
     Creates a user profile.
@@ -25,18 +85,11 @@ def userProfileCreate(self, request):
     serializer = self.serializer_class(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    user = models.User.objects.create_user(
-        email=serializer.validated_data.get("email"),
+    createUserProfile(
         username=serializer.validated_data.get("username"),
-        password=serializer.validated_data.get("password"),
+        email=serializer.validated_data.get("email"),
+        password=make_password(serializer.validated_data.get("password")),
     )
-
-    models.Profile.objects.create(
-        user=user,
-        username=user.username,
-    ).save()
-
-    user.save()
     return Response("User Account Created Successfully", status=status.HTTP_201_CREATED)
 
 
@@ -75,7 +128,7 @@ def userLogout(request):
     Returns:
         Response: A response indicating the status of the logout process.
     """
-    Token.objects.filter(user=request.user).delete()
+    revokeUserTokens(request.user)
     logout(request)
     return Response("You are logged out.", status=status.HTTP_200_OK)
 
@@ -97,34 +150,91 @@ def updateProfile(self, request):
     Returns:
         Response: A response indicating the status of the update process.
     """
-    serializer = self.serializer_class(
-        self.get_object(), data=request.data, partial=True
-    )
+    profile = self.get_object()
+    serializer = self.serializer_class(profile, data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
 
-    user = serializer.validated_data.get("user")
-    user.username = serializer.validated_data.get("username")
-    user.first_name = serializer.validated_data.get("name")
-    user.save()
-    serializer.save()
+    user = profile.user
+    user.username = serializer.validated_data.get("username", user.username)
+    user.first_name = serializer.validated_data.get("name", user.first_name) or ""
+    # A new picture's storage reference commits with the profile, or not at all
+    with transaction.atomic():
+        user.save()
+        serializer.save()
+
+    if "profile_picture" in serializer.validated_data:
+        scheduleRenditions(profile, "profile_picture")
     return Response("Profile has been updated.", status=status.HTTP_200_OK)
 
 
+def profileIdFor(value):
+    """
+    Resolves a username or profile ID to the ID of an active profile.
+
+    Args:
+        value (str): A username or a profile UUID.
+
+    Returns:
+        UUID: The profile ID, or None if no active profile matches.
+    """
+    profiles = models.Profile.objects.filter(deactivated_at__isnull=True)
+    try:
+        profiles = profiles.filter(pk=uuid.UUID(value))
+    except ValueError:
+        profiles = profiles.filter(username=value)
+    return profiles.values_list("pk", flat=True).first()
+
+
+def profilePosts(self, request):
+    """
+    Lists the posts of a profile, newest first.
+
+    The query filters on ``profile_id`` and orders by ``(created_at, id)``, so
+    every page is a range scan on the ``posts_profile_created_idx`` index.
+
+    Args:
+        self: The instance of the view.
+        request (Request): The HTTP request object.
+
+    Returns:
+        Response: A paginated response of the posts of the profile.
+    """
+    profile = self.get_object()
+    posts = Posts.objects.filter(profile_id=profile.pk)
+    page = self.paginate_queryset(posts)
+    serializer = PostsSeriliazer(
+        page, many=True, context=self.get_serializer_context()
+    )
+    return self.get_paginated_response(serializer.data)
+
+
 def deleteUserProfile(instance):
     """
-    Delete user profile and associated user.
+    Deactivate a user profile and schedule its deletion.
 
-    This function deletes the profile instance along with its associated user from the database.
+    The profile and its posts are hidden and the user can no longer log in as
+    soon as this returns; the profile, its user and every dependent row are
+    then purged in bounded chunks by the background worker in ``purge``.
 
     Args:
         instance: The profile instance to be deleted.
 
     Returns:
-        None
+        AccountDeletion: The deletion tracking the purge progress.
     """
     user = instance.user
-    user.delete()
-    instance.delete()
+    with transaction.atomic():
+        models.Profile.objects.filter(pk=instance.pk).update(
+            deactivated_at=timezone.now()
+        )
+        models.User.objects.filter(pk=user.pk).update(is_active=False)
+        revokeUserTokens(user)
+        deletion = models.AccountDeletion.objects.create(
+            profile=instance, username=instance.username
+        )
+
+    transaction.on_commit(lambda: purge.schedulePurge(deletion.pk))
+    return deletion
 
 
 # -----------------------------------------------------------------------------------------------------------
@@ -133,6 +243,40 @@ def deleteUserProfile(instance):
 # Following Viewset
 
 
+def adjustFollowCounts(follower_id, following_id, delta):
+    """
+    Applies a follow/unfollow to the denormalized counters of both profiles.
+
+    The counters are updated with F-expressions so concurrent follows never
+    overwrite each other.
+
+    Args:
+        follower_id (UUID): The profile that follows.
+        following_id (UUID): The profile being followed.
+        delta (int): 1 for a new relation, -1 for a removed one.
+    """
+    models.Profile.objects.filter(pk=follower_id).update(
+        following_count=F("following_count") + delta
+    )
+    models.Profile.objects.filter(pk=following_id).update(
+        followers_count=F("followers_count") + delta
+    )
+
+
+def removeRelation(relation):
+    """
+    Deletes a relation and keeps the follow counters in sync.
+
+    Args:
+        relation (Relation): The relation to delete.
+    """
+    with transaction.atomic():
+        deleted, _ = models.Relation.objects.filter(pk=relation.pk).delete()
+        if deleted:
+            adjustFollowCounts(relation.follower_id, relation.following_id, -1)
+            retractTimeline(relation.follower_id, relation.following_id)
+
+
 def follow(self, request):
     """
     Follows or unfollows a user based on the request data.
@@ -148,16 +292,23 @@ def follow(self, request):
     serializer.is_valid(raise_exception=True)
 
     follow_profile = request.data.get("following")
+    profile = request.user.Profile
+    following = serializer.validated_data.get("following")
 
-    is_following = self.get_queryset().filter(
-        follower=request.user.Profile, following=follow_profile
-    )
-
-    if is_following.exists() is not True:
-        serializer.save(follower=request.user.Profile)
-        return Response(
-            f"Following {follow_profile}",
-            status=status.HTTP_201_CREATED,
+    with transaction.atomic():
+        deleted, _ = (
+            self.get_queryset().filter(follower=profile, following=following).delete()
         )
-    is_following.delete()
+
+        if not deleted:
+            serializer.save(follower=profile)
+            adjustFollowCounts(profile.pk, following.pk, 1)
+            backfillTimeline(profile.pk, following.pk)
+            return Response(
+                f"Following {follow_profile}",
+                status=status.HTTP_201_CREATED,
+            )
+
+        adjustFollowCounts(profile.pk, following.pk, -1)
+        retractTimeline(profile.pk, following.pk)
     return Response(f"Unfollowed {follow_profile}", status=status.HTTP_201_CREATED)
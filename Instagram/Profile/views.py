@@ -1,11 +1,23 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import JsonResponse
+from django.views import View
 from rest_framework import viewsets, generics, status
+from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 
+from Instagram.mixins import ConditionalGetMixin
+from Instagram.pagination import UserIdCursorPagination
+
 from . import models
 from . import serializers
 from . import utils
+from .hashing import PoolSaturated, hashing_pool
 from .permissions import IsOwnerOrReadOnly
 
 # Create your views here.
@@ -22,6 +34,7 @@ class UserRegisterView(generics.ListCreateAPIView):
     Attributes:
         queryset (QuerySet): The queryset of User objects.
         serializer_class (Serializer): The serializer class for serializing User objects.
+        pagination_class (Pagination): Keyset pagination over the user id, in the order users joined.
         search_fields (list of str): The fields to search against.
 
     Methods:
@@ -39,6 +52,7 @@ class UserRegisterView(generics.ListCreateAPIView):
     permission_classes = [AllowAny]
     queryset = models.User.objects.all()
     serializer_class = serializers.UserSerializer
+    pagination_class = UserIdCursorPagination
     search_fields = ["username", "name"]
 
     def create(self, request, *args, **kwargs):
@@ -135,21 +149,181 @@ class UserLogoutView(generics.CreateAPIView):
         return utils.userLogout(request)
 
 
+# Async Credentials View
+class AsyncCredentialsView(View):
+    """
+    Base class for the async login and registration endpoints.
+
+    Password hashing is offloaded to the bounded ``hashing_pool`` so the event
+    loop is never blocked by PBKDF2. When the pool queue is full the request is
+    rejected with 503 instead of waiting behind the backlog.
+
+    Methods:
+        parse_body(self, request):
+            Reads the JSON or form encoded request body.
+
+        busy(self):
+            Returns the response sent when the hashing pool is saturated.
+    """
+
+    http_method_names = ["post", "options"]
+
+    def parse_body(self, request):
+        """
+        Reads the JSON or form encoded request body.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            dict: The submitted data.
+        """
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body or b"{}")
+            except ValueError:
+                return {}
+            return data if isinstance(data, dict) else {}
+        return request.POST.dict()
+
+    def busy(self):
+        """
+        Returns the response sent when the hashing pool is saturated.
+
+        Returns:
+            JsonResponse: A 503 response asking the client to retry.
+        """
+        response = JsonResponse(
+            "Too many login attempts, try again shortly.",
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            safe=False,
+        )
+        response["Retry-After"] = "1"
+        return response
+
+
+# Async User Register View
+class AsyncUserRegisterView(AsyncCredentialsView):
+    """
+    An async view for registering new users.
+
+    Methods:
+        post(self, request):
+            Handles the creation of a new user.
+            Args:
+                request (HttpRequest): The HTTP request object.
+            Returns:
+                JsonResponse: A response indicating the status of the user creation process.
+    """
+
+    async def post(self, request):
+        """
+        Handles the creation of a new user.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: A response indicating the status of the user creation process.
+        """
+        serializer = serializers.UserSerializer(data=self.parse_body(request))
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            password = await hashing_pool.run(
+                make_password, serializer.validated_data.get("password")
+            )
+        except PoolSaturated:
+            return self.busy()
+
+        await sync_to_async(utils.createUserProfile)(
+            username=serializer.validated_data.get("username"),
+            email=serializer.validated_data.get("email"),
+            password=password,
+        )
+        return JsonResponse(
+            "User Account Created Successfully",
+            status=status.HTTP_201_CREATED,
+            safe=False,
+        )
+
+
+# Async User Login View
+class AsyncUserLoginView(AsyncCredentialsView):
+    """
+    An async view for user authentication and login.
+
+    Methods:
+        post(self, request):
+            Handles the user login process.
+            Args:
+                request (HttpRequest): The HTTP request object.
+            Returns:
+                JsonResponse: A response indicating the status of the login process.
+    """
+
+    async def post(self, request):
+        """
+        Handles the user login process.
+
+        Unknown usernames still pay for one hash, like ``ModelBackend`` does,
+        so response times do not reveal which accounts exist.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: A response indicating the status of the login process.
+        """
+        data = self.parse_body(request)
+        username = str(data.get("username") or "").lower().replace(" ", "")
+        password = str(data.get("password") or "")
+
+        user = await models.User.objects.filter(username=username).afirst()
+        try:
+            if user is None:
+                await hashing_pool.run(make_password, password)
+                valid = False
+            else:
+                valid = await hashing_pool.run(check_password, password, user.password)
+        except PoolSaturated:
+            return self.busy()
+
+        if not valid or not user.is_active:
+            return JsonResponse(
+                "Invalid Username or Password.",
+                status=status.HTTP_401_UNAUTHORIZED,
+                safe=False,
+            )
+
+        await alogin(request, user, "django.contrib.auth.backends.ModelBackend")
+        token, created = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({"Token": f"Token {token.key}"}, status=status.HTTP_200_OK)
+
+
 # Profile Viewsets
-class ProfileViewsets(viewsets.ModelViewSet):
+class ProfileViewsets(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     A viewset for handling profile-related operations.
 
     Inherits from:
-        viewsets.ModelViewSet
+        ConditionalGetMixin, viewsets.ModelViewSet
 
     Attributes:
         queryset (QuerySet): The queryset of Profile objects.
         serializer_class (Serializer): The serializer class for serializing Profile objects.
         lookup_field (str): The field used to look up Profile objects.
         search_fields (list of str): The fields to search against.
+        etag_fields (tuple of str): The fields the conditional GET validators depend on.
+        query_budget (dict): The most queries each action may run.
 
     Methods:
+        get_queryset(self):
+            Retrieves the queryset of active profiles.
+            Returns:
+                QuerySet: The queryset of profiles.
+
         create(self, request, *args, **kwargs):
             Returns a method not allowed response since creation is not allowed via this viewset.
 
@@ -162,18 +336,58 @@ class ProfileViewsets(viewsets.ModelViewSet):
             Returns:
                 Response: A response indicating the status of the update process.
 
-        perform_destroy(self, instance):
-            Performs the deletion of a profile instance.
+        posts(self, request, username=None):
+            Lists the posts of the profile, newest first.
             Args:
-                instance: The profile instance to be deleted.
+                request (Request): The HTTP request object.
+                username (str): The username of the profile.
+            Returns:
+                Response: A paginated response of the posts.
+
+        destroy(self, request, *args, **kwargs):
+            Deactivates a profile and schedules its deletion in the background.
+            Args:
+                request (Request): The HTTP request object.
+                *args: Additional positional arguments.
+                **kwargs: Additional keyword arguments.
+            Returns:
+                Response: An accepted response with the deletion progress.
 
     """
 
     permission_classes = [IsOwnerOrReadOnly, IsAuthenticated]
-    queryset = models.Profile.objects.all()
+    queryset = models.Profile.objects.filter(deactivated_at__isnull=True)
     serializer_class = serializers.ProfileSerializer
     lookup_field = "username"
     search_fields = ["username", "name"]
+    etag_fields = (
+        "updated_at",
+        "followers_count",
+        "following_count",
+        "profile_picture_renditions",
+    )
+    query_budget = {
+        "list": 2,
+        "retrieve": 2,
+        "posts": 4,
+        "update": 7,
+        "partial_update": 7,
+        "destroy": 9,
+    }
+
+    def get_queryset(self):
+        """
+        Retrieves the queryset of active profiles.
+
+        Writes join the user, which updates and deactivation also change.
+
+        Returns:
+            QuerySet: The queryset of profiles.
+        """
+        queryset = super().get_queryset()
+        if self.action in ("update", "partial_update", "destroy"):
+            queryset = queryset.select_related("user")
+        return queryset
 
     def create(self, request, *args, **kwargs):
         """
@@ -203,14 +417,37 @@ class ProfileViewsets(viewsets.ModelViewSet):
         """
         return utils.updateProfile(self, request)
 
-    def perform_destroy(self, instance):
+    @action(detail=True, methods=["get"])
+    def posts(self, request, username=None):
         """
-        Performs the deletion of a profile instance.
+        Lists the posts of the profile, newest first.
 
         Args:
-            instance: The profile instance to be deleted.
+            request (Request): The HTTP request object.
+            username (str): The username of the profile.
+
+        Returns:
+            Response: A paginated response of the posts.
         """
-        return utils.deleteUserProfile(instance)
+        return utils.profilePosts(self, request)
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Deactivates a profile and schedules its deletion in the background.
+
+        Args:
+            request (Request): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: An accepted response with the deletion progress.
+        """
+        deletion = utils.deleteUserProfile(self.get_object())
+        return Response(
+            {"deletion": deletion.id, "status": deletion.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
 # Following View
@@ -325,6 +562,11 @@ class FollowersViewsets(viewsets.ModelViewSet):
 
         update(self, request, *args, **kwargs):
             Returns a method not allowed response since updating is not allowed via this viewset.
+
+        perform_destroy(self, instance):
+            Removes a follower and updates the follow counters.
+            Args:
+                instance: The relation to be deleted.
     """
 
     queryset = models.Relation.objects.all()
@@ -366,3 +608,12 @@ class FollowersViewsets(viewsets.ModelViewSet):
             Response: A method not allowed response.
         """
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def perform_destroy(self, instance):
+        """
+        Removes a follower and updates the follow counters.
+
+        Args:
+            instance: The relation to be deleted.
+        """
+        return utils.removeRelation(instance)
@@ -0,0 +1,26 @@
+# Gunicorn configuration for the ASGI application
+#
+# Runs next to the WSGI server from gunicorn_config.py. The front proxy sends
+# /api/async/ here so the async login and registration endpoints run on the
+# event loop, with password hashing on the bounded pool in Profile.hashing;
+# everything else stays on the sync workers. For example, with nginx:
+#
+#   location /api/async/ { proxy_pass http://127.0.0.1:8001; }
+#   location / { proxy_pass http://127.0.0.1:8000; }
+#
+# Start it with: gunicorn -c gunicorn_asgi_config.py
+bind = "0.0.0.0:8001"  # Next to the WSGI server on port 8000
+workers = 2  # One event loop per worker, each with its own hashing pool
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 30  # Adjust the timeout value as needed
+
+# Django specific settings
+pythonpath = "/home/yash/Desktop/InstagramApp/Instagram"  # Replace with the path to your Django project directory
+wsgi_app = "Instagram.asgi:application"
+
+
+def worker_exit(server, worker):
+    # Flush buffered like/comment counters before the worker goes away
+    from Posts.counters import engagement_counters
+
+    engagement_counters.flush()
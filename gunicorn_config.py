@@ -17,6 +17,14 @@ pythonpath = "/home/yash/Desktop/InstagramApp/Instagram"  # Replace with the pat
 # app = "Instagram.wsgi:application"
 # or
 # app = "Instagram.asgi:application"  # For ASGI applications
+# The async endpoints under /api/async/ are served by gunicorn_asgi_config.py
 app = (
     "Instagram.wsgi:application"  # Replace with your Django project's WSGI application
 )
+
+
+def worker_exit(server, worker):
+    # Flush buffered like/comment counters before the worker goes away
+    from Posts.counters import engagement_counters
+
+    engagement_counters.flush()